@@ -0,0 +1,57 @@
+"""Бенчмарк пакетного формирования отчетов по категориям: последовательные вызовы
+spending_by_category по DataFrame (даты разбираются в каждом вызове) против
+run_report_batch с разным числом процессов. Результат - задач в секунду.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_batch_reports --rows 500000 --jobs 200 --processes 1,2,4
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import CATEGORIES, make_operations_frame
+from src.batch_reports import run_report_batch
+from src.reports import spending_by_category
+from src.store import TransactionStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--processes", default="1,2,4")
+    parser.add_argument("--legacy-jobs", type=int, default=10, help="число задач для последовательного замера")
+    args = parser.parse_args()
+
+    frame = make_operations_frame(args.rows)
+    store = TransactionStore(frame)
+    rng = np.random.default_rng(42)
+    dates = frame["Дата операции"].str[:10].to_numpy()
+    jobs = [(CATEGORIES[rng.integers(len(CATEGORIES))][0], dates[rng.integers(len(dates))]) for _ in range(args.jobs)]
+    print(f"строк: {args.rows}, задач: {args.jobs}, ядер: {os.cpu_count()}")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        legacy_jobs = jobs[: args.legacy_jobs]
+        start = time.perf_counter()
+        for number, (category, date) in enumerate(legacy_jobs):
+            report = spending_by_category.__wrapped__(frame, category, date)
+            with open(os.path.join(output_dir, f"legacy_{number}.json"), "w", encoding="utf-8") as file:
+                json.dump(report.to_dict(orient="records"), file, ensure_ascii=False, indent=4)
+        elapsed = time.perf_counter() - start
+        print(f"spending_by_category последовательно: {len(legacy_jobs) / elapsed:8.1f} задач/с")
+
+        for processes in (int(value) for value in args.processes.split(",")):
+            start = time.perf_counter()
+            results = run_report_batch(store, jobs, output_dir, processes=processes)
+            elapsed = time.perf_counter() - start
+            assert all("error" not in result for result in results)
+            print(f"run_report_batch, процессов {processes}:    {len(jobs) / elapsed:8.1f} задач/с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Бенчмарк чтения операций: холодное чтение xlsx против чтения из колоночного кэша.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_cache --rows 50000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import src.cache
+from benchmarks.synthetic import make_operations_frame
+from src.cache import read_operations_frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        src.cache.CACHE_DIR = os.path.join(tmp_dir, "cache")
+        file_path = os.path.join(tmp_dir, "operations.xlsx")
+        make_operations_frame(args.rows).to_excel(file_path, index=False)
+
+        start = time.perf_counter()
+        read_operations_frame(file_path, use_cache=False)
+        excel_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_operations_frame(file_path)
+        cold_time = time.perf_counter() - start
+
+        warm_times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            read_operations_frame(file_path)
+            warm_times.append(time.perf_counter() - start)
+        warm_time = min(warm_times)
+
+    print(f"строк: {args.rows}")
+    print(f"pd.read_excel без кэша:       {excel_time:8.3f} c")
+    print(f"холодное чтение (+ запись):   {cold_time:8.3f} c")
+    print(f"теплое чтение из кэша:        {warm_time:8.3f} c  (x{excel_time / warm_time:.0f})")
+
+
+if __name__ == "__main__":
+    main()
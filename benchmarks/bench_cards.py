@@ -0,0 +1,46 @@
+"""Бенчмарк сводки по картам: filtered_by_card_number + get_card_info против
+однопроходной get_cards_summary - время и пиковая память (tracemalloc).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_cards --rows 200000
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.synthetic import make_operations_frame
+from src.utils import filtered_by_card_number, get_card_info, get_cards_summary
+
+
+def measure(func: Callable) -> tuple:
+    """Функция возвращает результат, время выполнения и пиковый прирост памяти.
+    Время и память замеряются в разных запусках: tracemalloc замедляет выполнение"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    transactions = make_operations_frame(args.rows).to_dict(orient="records")
+    legacy, legacy_time, legacy_peak = measure(lambda: get_card_info(filtered_by_card_number(transactions)))
+    summary, summary_time, summary_peak = measure(lambda: get_cards_summary(transactions))
+    assert summary == legacy
+
+    print(f"строк: {args.rows}, карт: {len(summary)}")
+    print(f"filtered_by_card_number + get_card_info: {legacy_time:7.3f} c, пик памяти {legacy_peak / 2**20:8.1f} МБ")
+    print(f"get_cards_summary:                       {summary_time:7.3f} c, пик памяти {summary_peak / 2**20:8.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
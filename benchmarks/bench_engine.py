@@ -0,0 +1,66 @@
+"""Бенчмарк движка агрегатов: группировка OperationsTable.aggregate по целым кодам
+(карта, категория, MCC, месяц) против groupby pandas по строковым колонкам
+с отбором операций по статусу. Таблица движка строится один раз на хранилище.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_engine --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_operations_frame
+from src.engine import OperationsTable, get_operations_table
+from src.store import TransactionStore
+
+GROUPINGS = [["card"], ["category"], ["mcc", "month"], ["card", "category", "month"]]
+COLUMNS = {"card": "Номер карты", "category": "Категория", "mcc": "MCC"}
+
+
+def pandas_aggregate(frame: pd.DataFrame, dates: np.ndarray, group_by: list) -> int:
+    """Функция считает расходы по группам groupby pandas по строковым колонкам и возвращает число групп"""
+    counted = (frame["Статус"] != "FAILED").to_numpy()
+    keys = {key: frame[column].to_numpy()[counted] for key, column in COLUMNS.items() if column in frame.columns}
+    keys["month"] = dates.astype("datetime64[M]")[counted]
+    amounts = frame["Сумма платежа"].to_numpy()[counted]
+    spent = pd.Series(np.where(amounts < 0, amounts, 0.0))
+    return len(spent.groupby([keys[key] for key in group_by], dropna=False).agg(["sum", "size"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    frame = make_operations_frame(args.rows)
+    store = TransactionStore(frame)
+    plain = store.take_frame(np.arange(len(store)))
+    print(f"операций: {args.rows}")
+
+    start = time.perf_counter()
+    table = get_operations_table(store)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    OperationsTable.from_frame(plain)
+    frame_time = time.perf_counter() - start
+    print(f"таблица движка: {build_time * 1000:9.1f} мс по хранилищу, {frame_time * 1000:.1f} мс по DataFrame")
+
+    for group_by in GROUPINGS:
+        start = time.perf_counter()
+        groups = table.aggregate(group_by)
+        engine_time = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = pandas_aggregate(plain, store.dates, group_by)
+        pandas_time = time.perf_counter() - start
+        assert len(groups) == expected
+        name = ", ".join(group_by)
+        print(
+            f"{name:25} {engine_time * 1000:9.1f} мс против {pandas_time * 1000:9.1f} мс (groupby), групп {expected}"
+        )
+
+
+if __name__ == "__main__":
+    main()
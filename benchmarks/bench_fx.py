@@ -0,0 +1,70 @@
+"""Бенчмарк пересчета сумм операций в основную валюту по историческим курсам:
+convert_amounts (поиск курса один раз на пару валюта-день, бинарный поиск as-of)
+против поиска курса для каждой строки отдельно, а также normalize_store
+(пересчет с построением хранилища) и его повторный вызов из кэша.
+Курсы - синтетические дневные курсы RUB и CNY к USD за весь период операций.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_fx --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_operations_frame
+from src.fx import RateTable, convert_amounts, normalize_store
+from src.store import TransactionStore
+
+# строк для замера построчного поиска; время на все строки экстраполируется
+ROW_BY_ROW_SAMPLE = 20000
+
+
+def make_rate_table() -> RateTable:
+    """Функция создает таблицу дневных курсов RUB и CNY к USD за 2017-2023 годы"""
+    table = RateTable("USD")
+    days = pd.date_range("2017-01-01", "2023-01-01")
+    rng = np.random.RandomState(1)
+    table.update("RUB", days, 1 / (60 + np.cumsum(rng.normal(0, 0.3, len(days))).clip(-20, 40)))
+    table.update("CNY", days, 0.15 + np.cumsum(rng.normal(0, 0.0005, len(days))).clip(-0.03, 0.03))
+    return table
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    frame = make_operations_frame(args.rows)
+    store = TransactionStore(frame)
+    table = make_rate_table()
+    amounts = frame["Сумма платежа"].to_numpy(dtype=np.float64)
+    currencies = frame["Валюта платежа"].astype(object).to_numpy()
+    days = store.dates.astype("datetime64[D]")
+    print(f"операций: {args.rows}, курсов в таблице: {len(table)}")
+
+    start = time.perf_counter()
+    converted = convert_amounts(amounts, currencies, store.dates, table)
+    vectorized = time.perf_counter() - start
+
+    sample = min(ROW_BY_ROW_SAMPLE, args.rows)
+    start = time.perf_counter()
+    row_by_row = [amounts[i] * table.rates_at(currencies[i], days[i : i + 1])[0] for i in range(sample)]
+    per_row = (time.perf_counter() - start) / sample
+    assert np.allclose(row_by_row, converted[:sample], equal_nan=True)
+    print(f"convert_amounts:        {vectorized * 1000:9.1f} мс")
+    print(f"поиск курса по строкам: {per_row * args.rows * 1000:9.1f} мс (оценка по {sample} строкам)")
+
+    start = time.perf_counter()
+    normalized = normalize_store(store, table)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    assert normalize_store(store, table) is normalized
+    cached = time.perf_counter() - start
+    print(f"normalize_store:        {first * 1000:9.1f} мс, повторно из кэша {cached * 1000:.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Бенчмарк загрузки дополненной выгрузки: ingest_frame (только новые строки, индексы
+и агрегаты дополняются на месте) против полной загрузки хранилища с построением индексов.
+Выгрузка - история плюс --delta новых операций с более поздними датами. Отдельно
+измеряется ingest_file по файлу csv: читается только начало выгрузки с новыми строками.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_ingest --sizes 100000,1000000 --delta 1000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable
+
+import pandas as pd
+
+from benchmarks.synthetic import make_operations_frame
+from src.ingest import ingest_file, ingest_frame
+from src.sqlite_store import SqliteStore
+from src.store import TransactionStore
+
+
+def timed(func: Callable) -> tuple:
+    """Функция возвращает результат и время выполнения func в секундах"""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def loaded_store(frame: pd.DataFrame) -> TransactionStore:
+    """Функция загружает хранилище и строит индексы и куб, как сервер при прогреве"""
+    store = TransactionStore(frame)
+    _ = store.search_index, store.phone_index, store.category_cube
+    return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000", help="размеры истории через запятую")
+    parser.add_argument("--delta", type=int, default=1000, help="число новых операций в выгрузке")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in map(int, args.sizes.split(",")):
+            history = make_operations_frame(rows, window=(0.0, 0.99))
+            # выгрузка банка отсортирована по убыванию даты: новые операции - в начале
+            export = pd.concat([make_operations_frame(args.delta, seed=7, window=(0.995, 1.0)), history])
+            export = export.reset_index(drop=True)
+            print(f"\nистория: {rows} строк, новых: {args.delta}")
+
+            store = loaded_store(history)
+            stats, ingest_time = timed(lambda: ingest_frame(store, export))
+            _, full_time = timed(lambda: loaded_store(export))
+            assert stats["rows_added"] == args.delta and len(store) == len(export)
+            print(f"TransactionStore: ingest {ingest_time * 1000:9.1f} мс, полная загрузка {full_time * 1000:9.1f} мс")
+
+            csv_path = os.path.join(tmp_dir, f"operations_{rows}.csv")
+            export.to_csv(csv_path, index=False)
+            store = loaded_store(history)
+            stats, ingest_time = timed(lambda: ingest_file(store, csv_path))
+            assert stats["rows_added"] == args.delta
+            print(f"ingest_file (csv): {ingest_time * 1000:8.1f} мс, прочитано строк {stats['rows_read']}")
+
+            db_path = os.path.join(tmp_dir, f"operations_{rows}.sqlite")
+            sqlite_store = SqliteStore.from_frame(history, db_path)
+            stats, ingest_time = timed(lambda: ingest_frame(sqlite_store, export))
+            sqlite_store.close()
+            _, full_time = timed(lambda: SqliteStore.from_frame(export, db_path).close())
+            assert stats["rows_added"] == args.delta
+            print(f"SqliteStore:      ingest {ingest_time * 1000:9.1f} мс, полный импорт {full_time * 1000:9.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Бенчмарк расчета инвесткопилки: investment_bank на хранилище (модель RoundUpSimulator,
+один векторный проход) против построчного расчета по списку словарей с math.ceil,
+а также перебор шагов округления и месяцев (investment_bank_sweep) по префиксным суммам.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_investment --rows 1000000 --steps 100
+"""
+
+import argparse
+import json
+import math
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_operations_frame
+from src.investment import investment_bank, investment_bank_sweep
+from src.store import TransactionStore, parse_operation_dates
+
+
+def row_by_row(transactions: list, step: int) -> float:
+    """Функция считает отложенную сумму построчно, как обычный цикл по транзакциям"""
+    saved = 0.0
+    for transaction in transactions:
+        amount = transaction["Сумма платежа"]
+        if amount < 0 and transaction["Статус"] != "FAILED":
+            saved += math.ceil(-amount / step) * step + amount
+    return round(saved, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--steps", type=int, default=100, help="число шагов округления для перебора")
+    args = parser.parse_args()
+
+    frame = make_operations_frame(args.rows)
+    store = TransactionStore(frame)
+    transactions = frame.to_dict(orient="records")
+    print(f"операций: {args.rows}")
+
+    start = time.perf_counter()
+    expected = row_by_row(transactions, 50)
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    result = json.loads(investment_bank(store, 50))
+    first_time = time.perf_counter() - start
+    start = time.perf_counter()
+    json.loads(investment_bank(store, 100))
+    cached_time = time.perf_counter() - start
+    assert abs(result["saved"] - expected) < 0.01
+    print(f"построчный цикл:        {loop_time * 1000:9.1f} мс")
+    print(f"investment_bank:        {first_time * 1000:9.1f} мс (с построением модели)")
+    print(f"другой шаг:             {cached_time * 1000:9.1f} мс")
+
+    dates = parse_operation_dates(frame["Дата операции"])
+    months = pd.date_range(pd.Timestamp(dates.min()).normalize().replace(day=1), pd.Timestamp(dates.max()), freq="MS")
+    periods = [(month, month + pd.offsets.MonthBegin()) for month in months]
+    steps = [10 * (i + 1) for i in range(args.steps)]
+    start = time.perf_counter()
+    sweep = json.loads(investment_bank_sweep(store, steps, periods))
+    sweep_time = time.perf_counter() - start
+    variants = f"{len(sweep)} ({args.steps} шагов x {len(periods)} месяцев)"
+    print(f"investment_bank_sweep:  {sweep_time * 1000:9.1f} мс, вариантов {variants}")
+    print(f"построчно (оценка):     {loop_time * args.steps * 1000:9.1f} мс - проход по операциям на каждый шаг")
+
+
+if __name__ == "__main__":
+    main()
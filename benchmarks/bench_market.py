@@ -0,0 +1,42 @@
+"""Бенчмарк загрузки курсов и котировок через локальную заглушку twelvedata с задержкой сети:
+последовательные одиночные запросы (как в исходных get_exchange_rate/get_stocks_rates)
+против параллельных одиночных и пакетных запросов MarketDataClient.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_market --symbols 20 --latency 0.05
+"""
+
+import argparse
+import time
+
+from benchmarks.twelvedata_stub import run_stub_server
+from src.market import MarketDataClient
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    stocks = [f"S{i:03d}" for i in range(args.symbols)]
+    currencies = [f"C{i:02d}" for i in range(args.symbols // 4 or 1)]
+
+    modes: list[tuple[str, dict]] = [
+        ("последовательно, по одному символу", {"batch_size": 1, "max_workers": 1}),
+        ("параллельно, по одному символу", {"batch_size": 1, "max_workers": 8}),
+        ("параллельно, пакетами по 8", {"batch_size": 8, "max_workers": 8}),
+    ]
+    with run_stub_server(latency=args.latency) as server:
+        print(f"символов: {len(stocks) + len(currencies)}, задержка ответа: {args.latency * 1000:.0f} мс")
+        for title, options in modes:
+            server.requests.clear()
+            with MarketDataClient(base_url=server.base_url, **options) as client:
+                start = time.perf_counter()
+                client.exchange_rates(currencies, "RUB")
+                client.stock_prices(stocks)
+                elapsed = time.perf_counter() - start
+            print(f"{title:<36} {elapsed:7.3f} c, HTTP-запросов: {len(server.requests)}")
+
+
+if __name__ == "__main__":
+    main()
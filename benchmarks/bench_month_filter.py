@@ -0,0 +1,63 @@
+"""Бенчмарк отбора транзакций за месяц: построчный strptime против векторизованного
+разбора списка и отбора по датам, разобранным в TransactionStore.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_month_filter --sizes 10000,100000,1000000
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import Callable
+
+from benchmarks.synthetic import make_operations_frame
+from src.store import TransactionStore
+from src.utils import filter_by_currency_month
+
+
+def legacy_filter_by_currency_month(transactions: list, act_date: str) -> list:
+    """Исходная реализация: strptime для каждой транзакции в цикле"""
+    end_date = datetime.strptime(act_date, "%d.%m.%Y")
+    start_date = end_date.replace(day=1)
+    filtered_by_month_transactions = []
+    for t in transactions:
+        t_date = datetime.strptime(t.get("Дата операции", "01.01.2000").split()[0], "%d.%m.%Y")
+        if start_date <= t_date <= end_date:
+            filtered_by_month_transactions.append(t)
+    return filtered_by_month_transactions
+
+
+def best_time(func: Callable, repeat: int) -> float:
+    """Функция возвращает лучшее время из нескольких запусков"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--date", default="15.06.2020")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'строк':>10} {'strptime-цикл':>14} {'список':>10} {'хранилище':>10} {'результат':>10}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        data_frame = make_operations_frame(size)
+        transactions = data_frame.to_dict(orient="records")
+        store = TransactionStore(data_frame)
+        expected = legacy_filter_by_currency_month(transactions, args.date)
+        assert filter_by_currency_month(transactions, args.date) == expected
+        assert len(filter_by_currency_month(store, args.date)) == len(expected)
+
+        legacy_time = best_time(lambda: legacy_filter_by_currency_month(transactions, args.date), args.repeat)
+        list_time = best_time(lambda: filter_by_currency_month(transactions, args.date), args.repeat)
+        store_time = best_time(lambda: filter_by_currency_month(store, args.date), args.repeat)
+        print(f"{size:>10} {legacy_time:>13.3f}c {list_time:>9.3f}c {store_time:>9.4f}c {len(expected):>10}")
+
+
+if __name__ == "__main__":
+    main()
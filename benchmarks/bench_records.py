@@ -0,0 +1,61 @@
+"""Бенчмарк памяти представлений транзакций: список словарей (как make_transactions)
+против списка компактных записей Transaction (__slots__, интернированные строки)
+и структуры массивов TransactionArrays (коды строк, суммы в копейках int64).
+Замеряется память, удерживаемая построенным представлением (tracemalloc), и время построения.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_records --rows 1000000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.synthetic import make_operations_frame
+from src.records import TransactionArrays, compact_transactions
+from src.utils import get_cards_summary
+
+
+def retained(build: Callable) -> tuple:
+    """Функция возвращает построенный объект, время построения и удерживаемую им память.
+    Время и память замеряются в разных запусках: tracemalloc замедляет выполнение"""
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    frame = make_operations_frame(args.rows)
+    representations = [
+        ("список словарей", lambda: frame.to_dict(orient="records")),
+        ("список Transaction", lambda: compact_transactions(frame)),
+        ("TransactionArrays", lambda: TransactionArrays(frame)),
+    ]
+    print(f"строк: {args.rows}")
+    summaries = []
+    for title, build in representations:
+        result, elapsed, size = retained(build)
+        if not isinstance(result, TransactionArrays):
+            summaries.append(get_cards_summary(result))
+        print(f"{title:<20} {size / 2**20:9.1f} МБ ({size / args.rows:6.0f} байт/строку), построение {elapsed:6.2f} c")
+        del result
+        gc.collect()
+    assert summaries[0] == summaries[1]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Бенчмарк холодного старта: время импорта модулей (python -X importtime) и время
+от запуска python main.py до первого запроса ввода. Каждый замер - отдельный процесс.
+С ключом --max-prompt-ms скрипт завершается с кодом 1, если медиана времени
+до первого запроса превышает порог (для проверки регрессий).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --max-prompt-ms 300
+"""
+
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import cast
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MODULES = ["main", "src.views", "src.services", "src.api"]
+PROMPT = "Введите дату".encode("utf-8")
+
+
+def import_time(module: str) -> tuple[float, list]:
+    """Функция импортирует модуль в отдельном процессе с -X importtime и возвращает
+    суммарное время импорта (мс) и самые тяжелые модули, импортированные первыми уровнями вложенности"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total, packages = 0.0, []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # вложенность импорта обозначается отступом имени модуля
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            total += int(cumulative) / 1000
+        elif depth == 1:
+            packages.append((int(cumulative) / 1000, name.strip()))
+    return total, sorted(packages, reverse=True)[:5]
+
+
+def time_to_prompt() -> float:
+    """Функция запускает python main.py и возвращает время (мс) до вывода первого запроса ввода"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=PROJECT_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+    stdout = cast(io.BufferedReader, process.stdout)
+    output = b""
+    try:
+        while PROMPT not in output:
+            chunk = stdout.read1(1024)
+            if not chunk:
+                raise RuntimeError("main.py завершился без запроса ввода")
+            output += chunk
+        return (time.perf_counter() - start) * 1000
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-prompt-ms", type=float, help="порог медианы времени до первого запроса, мс")
+    args = parser.parse_args()
+
+    for module in MODULES:
+        totals = []
+        for _ in range(args.repeat):
+            total, packages = import_time(module)
+            totals.append(total)
+        heaviest = ", ".join(f"{name} {ms:.0f}" for ms, name in packages)
+        print(f"import {module:<14} {statistics.median(totals):8.1f} мс  (тяжелее всего, мс: {heaviest})")
+
+    prompt_times = [time_to_prompt() for _ in range(args.repeat)]
+    median = statistics.median(prompt_times)
+    print(f"python main.py до первого запроса ввода: {median:.1f} мс (медиана из {args.repeat})")
+    if args.max_prompt_ms is not None and median > args.max_prompt_ms:
+        print(f"превышен порог {args.max_prompt_ms:.0f} мс")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Бенчмарк потокового чтения операций: загрузка всего файла в список словарей
+(как make_transactions) против генераторного конвейера по пакетам строк -
+время и пиковая память (tracemalloc) при отборе транзакций за месяц.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_streaming --rows 200000 --format csv
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+import pandas as pd
+
+from benchmarks.synthetic import make_operations_frame
+from src.streaming import iter_operation_batches, stream_filter_by_currency_month
+from src.utils import filter_by_currency_month
+
+
+def measure(func: Callable) -> tuple:
+    """Функция возвращает результат, время выполнения и пиковый прирост памяти.
+    Время и память замеряются в разных запусках: tracemalloc замедляет выполнение"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    frame = make_operations_frame(args.rows)
+    act_date = frame["Дата операции"].max()[:10]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, f"operations.{args.format}")
+        if args.format == "csv":
+            frame.to_csv(file_path, index=False)
+        else:
+            frame.to_excel(file_path, index=False)
+        del frame
+
+        def load_all() -> int:
+            reader = pd.read_csv if args.format == "csv" else pd.read_excel
+            transactions = reader(file_path).to_dict(orient="records")
+            return len(filter_by_currency_month(transactions, act_date))
+
+        def stream() -> int:
+            batches = iter_operation_batches(file_path, args.batch_size)
+            return sum(1 for _ in stream_filter_by_currency_month(batches, act_date))
+
+        loaded, load_time, load_peak = measure(load_all)
+        streamed, stream_time, stream_peak = measure(stream)
+    assert loaded == streamed
+
+    print(f"строк: {args.rows}, формат: {args.format}, пакет: {args.batch_size}, отобрано: {streamed}")
+    print(f"весь файл в список словарей: {load_time:7.3f} c, пик памяти {load_peak / 2**20:8.1f} МБ")
+    print(f"потоковый конвейер:          {stream_time:7.3f} c, пик памяти {stream_peak / 2**20:8.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
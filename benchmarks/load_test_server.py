@@ -0,0 +1,97 @@
+"""Нагрузочный тест HTTP-сервера приложения: несколько потоков-клиентов в течение заданного
+времени отправляют смесь запросов (Главная страница, поиск, телефоны, отчет по категории)
+и измеряют пропускную способность (запросов в секунду) и задержки (p50, p99).
+
+По умолчанию сервер запускается в том же процессе на реальном файле operations.xlsx,
+котировки берутся из локальной заглушки twelvedata (через кэш котировок).
+Для проверки отдельно запущенного сервера (python main.py --serve) укажите --url.
+
+Запуск из корня проекта:
+    python -m benchmarks.load_test_server --clients 8 --duration 10
+    python -m benchmarks.load_test_server --url http://127.0.0.1:8000
+"""
+
+import argparse
+import itertools
+import threading
+import time
+from contextlib import ExitStack
+
+import numpy as np
+import requests
+
+from benchmarks.twelvedata_stub import run_stub_server
+from src.market import MarketDataClient, QuoteCache
+from src.server import run_app_server
+
+REQUESTS = [
+    "/dashboard?datetime=15.03.2020%2012:00:00",
+    "/dashboard?datetime=20.12.2021%2009:30:00",
+    "/search?query=Колхоз%20ИЛИ%20Магнит",
+    "/search?query=кафе",
+    "/phones?phone=%2B7%20921%20111-22-33",
+    "/report?category=Супермаркеты&date=31.12.2021",
+]
+
+
+def run_clients(base_url: str, clients: int, duration: float) -> tuple[list, int]:
+    """Функция отправляет запросы из нескольких потоков и возвращает задержки (с) и число ошибок"""
+    latencies: list = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(number: int) -> None:
+        session = requests.Session()
+        local, local_errors = [], 0
+        for path in itertools.islice(itertools.cycle(REQUESTS), number, None):
+            if time.perf_counter() >= stop_at:
+                break
+            start = time.perf_counter()
+            response = session.get(base_url + path)
+            local.append(time.perf_counter() - start)
+            local_errors += response.status_code != 200
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="адрес уже запущенного сервера")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        if args.url is None:
+            stub_server = stack.enter_context(run_stub_server())
+            market_client = MarketDataClient(base_url=stub_server.base_url, cache=QuoteCache())
+            base_url = stack.enter_context(run_app_server(port=0, market_client=market_client)).base_url
+        else:
+            base_url = args.url
+        # прогрев: кэш главной страницы и котировок
+        for path in REQUESTS:
+            requests.get(base_url + path)
+        start = time.perf_counter()
+        latencies, errors = run_clients(base_url, args.clients, args.duration)
+        elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"клиентов: {args.clients}, длительность: {elapsed:.1f} c, запросов: {len(latencies)}, ошибок: {errors}")
+    print(f"пропускная способность: {len(latencies) / elapsed:.0f} запросов/с")
+    print(
+        f"задержка: p50 {np.percentile(latencies_ms, 50):.1f} мс, p90 {np.percentile(latencies_ms, 90):.1f} мс, "
+        f"p99 {np.percentile(latencies_ms, 99):.1f} мс, max {latencies_ms.max():.1f} мс"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Набор бенчмарков публичных функций на синтетических данных (benchmarks/synthetic.py)
+с сохранением результатов в JSON для сравнения между коммитами.
+
+Для каждого размера данных замеряются make_transactions (чтение xlsx без кэша и из кэша),
+filter_by_currency_month, get_top_transactions, filtered_by_card_number, get_card_info,
+search_by_target, search_by_phones, get_cards_summary и spending_by_category. Функции, принимающие
+и список словарей, и хранилище TransactionStore (или DataFrame), замеряются для каждого вида входа
+(--inputs); вход sqlite - хранилище SqliteStore (запросы к базе SQLite по индексам), импорт
+в базу в замер не входит. Для 10 млн строк список словарей не помещается в память обычной машины -
+используйте --inputs store. make_transactions замеряется до --max-xlsx-rows строк
+(по умолчанию 100 тыс.; ограничение самого формата xlsx - 1 048 575 строк).
+
+Запуск из корня проекта:
+    python -m benchmarks.suite --sizes 10k,100k --output benchmarks/results/current.json
+    python -m benchmarks.suite --sizes 1M --inputs store --compare benchmarks/results/current.json
+    python -m benchmarks.suite --sizes 1M --inputs store,sqlite
+    python -m benchmarks.suite --sizes 10M --inputs store --only filter_by_currency_month,search_by_target
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from collections.abc import Sized
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import XLSX_MAX_ROWS, iter_operations_frames, write_operations_file
+from src import cache
+from src.reports import spending_by_category
+from src.services import search_by_phones, search_by_target
+from src.sqlite_store import SqliteStore
+from src.store import TransactionStore
+from src.utils import (
+    filter_by_currency_month,
+    filtered_by_card_number,
+    get_card_info,
+    get_cards_summary,
+    get_top_transactions,
+    make_transactions,
+)
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_RESULTS_DIR = os.path.join(PROJECT_DIR, "benchmarks", "results")
+ACT_DATE = "20.06.2020"
+REPORT_DATE = "20.06.2020"
+# разбор xlsx без кэша на 1 млн строк занимает больше 10 минут - по умолчанию не замеряется
+DEFAULT_MAX_XLSX_ROWS = 100000
+
+
+def parse_size(value: str) -> int:
+    """Функция разбирает размер данных: 10000, 10k, 1M"""
+    value = value.strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(value[-1], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def time_call(func: Callable, repeat: int) -> dict:
+    """Функция выполняет func repeat раз и возвращает время (с) и размер результата"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "repeat": repeat,
+        "result_size": len(result) if isinstance(result, Sized) else None,
+    }
+
+
+def benchmark_cases(
+    rows: int, inputs: list, seed: int, data_dir: str, tmp_dir: str, max_xlsx_rows: int = DEFAULT_MAX_XLSX_ROWS
+) -> Iterator[tuple]:
+    """Функция-генератор возвращает случаи (функция, вид входа, вызов) для данных размера rows.
+    Подготовка данных (генерация, запись файла, построение хранилища) в замер не входит.
+    Сгенерированные xlsx-файлы сохраняются в data_dir и используются повторно"""
+    if rows > min(max_xlsx_rows, XLSX_MAX_ROWS):
+        print(f"make_transactions пропущена: больше {min(max_xlsx_rows, XLSX_MAX_ROWS)} строк в xlsx-файле")
+    else:
+        file_path = os.path.join(data_dir, f"operations_{rows}_{seed}.xlsx")
+        if not os.path.exists(file_path):
+            write_operations_file(file_path, rows, seed=seed)
+        make_transactions(file_path)
+        yield "make_transactions", "xlsx", lambda: make_transactions(file_path, use_cache=False)
+        yield "make_transactions", "xlsx-cache", lambda: make_transactions(file_path)
+
+    frame = pd.concat(iter_operations_frames(rows, seed=seed), ignore_index=True)
+    report_path = os.path.join(tmp_dir, "report.json")
+    data: dict = {}
+    if "store" in inputs:
+        store = TransactionStore(frame)
+        # индексы строятся один раз за сеанс - замеряются запросы к готовому хранилищу
+        _ = store.search_index, store.phone_index
+        data["store"] = store
+    if "sqlite" in inputs:
+        data["sqlite"] = SqliteStore.from_frame(frame, os.path.join(tmp_dir, f"operations_{rows}.sqlite"))
+    if "list" in inputs:
+        data["list"] = frame.to_dict(orient="records")
+        data["frame"] = frame
+    month = filter_by_currency_month(data["list"], ACT_DATE) if "list" in data else []
+
+    for kind, transactions in data.items():
+        if kind == "frame":
+            yield "spending_by_category", "frame", lambda t=transactions: spending_by_category(
+                t, "Супермаркеты", REPORT_DATE, report_filename=report_path
+            )
+            continue
+        yield "filter_by_currency_month", kind, lambda t=transactions: filter_by_currency_month(t, ACT_DATE)
+        yield "get_top_transactions", kind, lambda t=transactions: get_top_transactions(t)
+        yield "search_by_target", kind, lambda t=transactions: search_by_target(t, "Колхоз")
+        yield "search_by_target (ИЛИ)", kind, lambda t=transactions: search_by_target(t, ["такси", "аптека"], "or")
+        yield "search_by_phones", kind, lambda t=transactions: search_by_phones(t)
+        if kind in ("store", "sqlite"):
+            yield "get_cards_summary", kind, lambda t=transactions: get_cards_summary(t)
+            yield "spending_by_category", kind, lambda t=transactions: spending_by_category(
+                t, "Супермаркеты", REPORT_DATE, report_filename=report_path
+            )
+        else:
+            yield "filtered_by_card_number", kind, lambda: filtered_by_card_number(month)
+            yield "get_card_info", kind, lambda: get_card_info(filtered_by_card_number(month))
+
+
+def environment() -> dict:
+    """Функция возвращает описание окружения замера: коммит, версии, процессор"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results: list, baseline_path: str) -> None:
+    """Функция печатает отношение медиан текущего замера к замеру из файла baseline_path"""
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    previous = {(item["name"], item["input"], item["rows"]): item for item in baseline["results"]}
+    print(f"\nсравнение с {os.path.basename(baseline_path)} (коммит {baseline['environment'].get('commit')}):")
+    for item in results:
+        old = previous.get((item["name"], item["input"], item["rows"]))
+        if old is None:
+            continue
+        ratio = item["median"] / old["median"] if old["median"] else float("inf")
+        marker = "  медленнее" if ratio > 1.2 else ("  быстрее" if ratio < 0.8 else "")
+        print(f"{item['name']:<26} {item['input']:<10} {item['rows']:>9}  x{ratio:6.2f}{marker}")
+
+
+def main(argv: Optional[list] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10k,100k", help="размеры данных через запятую: 10k,100k,1M,10M")
+    parser.add_argument("--inputs", default="list,store", help="виды входа: list (и DataFrame), store, sqlite")
+    parser.add_argument("--only", help="замерять только перечисленные функции")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--max-xlsx-rows", type=int, default=DEFAULT_MAX_XLSX_ROWS, help="наибольший размер для make_transactions"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="файл результатов (по умолчанию benchmarks/results/<коммит>-<время>.json)")
+    parser.add_argument("--compare", metavar="FILE", help="файл результатов для сравнения")
+    args = parser.parse_args(argv)
+    inputs = [kind.strip() for kind in args.inputs.split(",")]
+    only = {name.strip() for name in args.only.split(",")} if args.only else None
+
+    report: dict = {"environment": environment(), "results": []}
+    data_dir = os.path.join(cache.CACHE_DIR, "benchmarks")
+    os.makedirs(data_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=data_dir) as tmp_dir:
+        for rows in map(parse_size, args.sizes.split(",")):
+            print(f"\nстрок: {rows}")
+            for name, kind, func in benchmark_cases(rows, inputs, args.seed, data_dir, tmp_dir, args.max_xlsx_rows):
+                if only is not None and name.split(" ")[0] not in only:
+                    continue
+                item = {"name": name, "input": kind, "rows": rows, **time_call(func, args.repeat)}
+                report["results"].append(item)
+                median, best = item["median"] * 1000, item["min"] * 1000
+                print(f"{name:<26} {kind:<10} медиана {median:10.1f} мс, мин {best:10.1f} мс")
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{report['environment']['commit'] or 'local'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"\nрезультаты сохранены: {output}")
+    if args.compare:
+        compare(report["results"], args.compare)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Детерминированный генератор синтетических данных об операциях
+в формате выгрузки operations.xlsx"""
+
+import os
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "Дата операции",
+    "Дата платежа",
+    "Номер карты",
+    "Статус",
+    "Сумма операции",
+    "Валюта операции",
+    "Сумма платежа",
+    "Валюта платежа",
+    "Кэшбэк",
+    "Категория",
+    "MCC",
+    "Описание",
+    "Бонусы (включая кэшбэк)",
+    "Округление на инвесткопилку",
+    "Сумма операции с округлением",
+]
+
+CATEGORIES = [
+    ("Супермаркеты", 5411, ["Колхоз", "Магнит", "Пятёрочка", "Перекрёсток", "SPAR"]),
+    ("Фастфуд", 5814, ["Mouse Tail", "Вкусно и точка", "Теремок"]),
+    ("Транспорт", 4111, ["Метро Санкт-Петербург", "Яндекс Такси", "Тройка"]),
+    ("Аптеки", 5912, ["Аптека Вита", "Ригла"]),
+    ("Каршеринг", 7512, ["Ситидрайв", "Делимобиль"]),
+    ("Мобильная связь", 4814, ["Тинькофф Мобайл +7 995 555-44-33", "МТС +7 921 11-22-33", "Билайн"]),
+    ("Переводы", 6012, ["Константин Л.", "Светлана Т.", "Перевод с карты на карту"]),
+    ("Пополнения", 6012, ["Пополнение через Газпромбанк", "Перевод с карты"]),
+    ("Различные товары", 5399, ["Ozon.ru", "Wildberries"]),
+    ("Рестораны", 5812, ["Чайхона", "Хачапури и вино"]),
+    ("Связь", 4899, ["Ростелеком"]),
+    ("Путешествия", 4722, ["Оплата отеля", "Авиабилеты"]),
+]
+CARDS = ["*7197", "*4556", "*5091", "*5441", "*1112", "*5507", "*6002"]
+PHONES = ["+7 921 111-22-33", "8 (912) 222-11-33", "+7-995-555-77-00", "89005553535"]
+# ограничение формата xlsx: 1 048 576 строк на лист вместе с заголовком
+XLSX_MAX_ROWS = 1048575
+CHUNK_ROWS = 1000000
+
+
+def make_operations_frame(
+    rows: int, seed: int = 42, years: int = 4, cards: int = 7, window: tuple = (0.0, 1.0)
+) -> pd.DataFrame:
+    """Функция генерирует DataFrame с заданным количеством операций.
+    Операции отсортированы по убыванию даты, как в банковской выгрузке.
+    window - доля периода (от, до), в которую попадают даты операций"""
+    rng = np.random.RandomState(seed)
+    start = np.datetime64("2018-01-01T00:00:00")
+    span = years * 365 * 86400
+    seconds = np.sort(rng.randint(int(window[0] * span), int(window[1] * span), size=rows))[::-1]
+    dates = pd.to_datetime(start + seconds.astype("timedelta64[s]"))
+
+    category_ids = rng.randint(0, len(CATEGORIES), size=rows)
+    category_names = np.array([name for name, _, _ in CATEGORIES], dtype=object)
+    mcc = np.array([code for _, code, _ in CATEGORIES], dtype=float)[category_ids]
+    descriptions = np.empty(rows, dtype=object)
+    for i, (_, _, names) in enumerate(CATEGORIES):
+        positions = np.flatnonzero(category_ids == i)
+        descriptions[positions] = np.array(names, dtype=object)[rng.randint(0, len(names), size=len(positions))]
+    with_phone = rng.rand(rows) < 0.05
+    phone_ids = rng.randint(0, len(PHONES), size=rows)
+    descriptions[with_phone] = [f"Перевод {PHONES[i]}" for i in phone_ids[with_phone]]
+
+    if cards <= len(CARDS):
+        card_pool = np.array(CARDS[:cards], dtype=object)
+    else:
+        card_pool = np.array([f"*{1000 + i}" for i in range(cards)], dtype=object)
+    card_numbers = card_pool[rng.randint(0, cards, size=rows)]
+    card_numbers[rng.rand(rows) < 0.1] = np.nan
+
+    amounts = -np.round(rng.lognormal(mean=5.5, sigma=1.2, size=rows), 2)
+    incoming = np.isin(category_ids, [7])
+    amounts[incoming] = np.abs(amounts[incoming])
+    status = np.where(rng.rand(rows) < 0.006, "FAILED", "OK").astype(object)
+    currency = np.where(rng.rand(rows) < 0.003, "CNY", "RUB").astype(object)
+    cashback = np.where(rng.rand(rows) < 0.2, np.round(np.abs(amounts) / 100, 0), np.nan)
+    category_values = category_names[category_ids]
+    category_values[rng.rand(rows) < 0.005] = np.nan
+
+    data_frame = pd.DataFrame(
+        {
+            "Дата операции": dates.strftime("%d.%m.%Y %H:%M:%S"),
+            "Дата платежа": dates.strftime("%d.%m.%Y"),
+            "Номер карты": card_numbers,
+            "Статус": status,
+            "Сумма операции": amounts,
+            "Валюта операции": currency,
+            "Сумма платежа": amounts,
+            "Валюта платежа": currency,
+            "Кэшбэк": cashback,
+            "Категория": category_values,
+            "MCC": mcc,
+            "Описание": descriptions,
+            "Бонусы (включая кэшбэк)": (np.abs(amounts) // 100).astype(np.int64),
+            "Округление на инвесткопилку": np.zeros(rows, dtype=np.int64),
+            "Сумма операции с округлением": np.abs(amounts),
+        },
+        columns=COLUMNS,
+    )
+    return data_frame
+
+
+def iter_operations_frames(
+    rows: int, seed: int = 42, years: int = 4, cards: int = 7, chunk_rows: int = CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """Функция-генератор выдает операции частями по chunk_rows строк, чтобы генерировать
+    и записывать большие объемы (10 млн строк и больше) без полной таблицы в памяти.
+    Часть с номером k генерируется с зерном seed + k и покрывает свой отрезок периода;
+    части идут от поздних дат к ранним, поэтому вместе отсортированы по убыванию даты"""
+    chunks = max(1, -(-rows // chunk_rows))
+    for k in range(chunks):
+        size = min(chunk_rows, rows - k * chunk_rows)
+        window = ((chunks - k - 1) / chunks, (chunks - k) / chunks)
+        yield make_operations_frame(size, seed=seed + k, years=years, cards=cards, window=window)
+
+
+def write_operations_file(file_path: str, rows: int, seed: int = 42, years: int = 4, cards: int = 7) -> str:
+    """Функция записывает синтетические операции в файл xlsx (не больше XLSX_MAX_ROWS строк)
+    или csv (частями, любой объем) и возвращает путь к файлу"""
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    if file_path.lower().endswith(".xlsx"):
+        if rows > XLSX_MAX_ROWS:
+            raise ValueError(f"в xlsx-файл помещается не больше {XLSX_MAX_ROWS} строк")
+        make_operations_frame(rows, seed=seed, years=years, cards=cards).to_excel(file_path, index=False)
+        return file_path
+    for number, chunk in enumerate(iter_operations_frames(rows, seed=seed, years=years, cards=cards)):
+        chunk.to_csv(file_path, mode="w" if number == 0 else "a", header=number == 0, index=False)
+    return file_path
@@ -0,0 +1,117 @@
+"""Локальная заглушка API twelvedata для тестов и бенчмарков: отвечает на запросы
+/price, /exchange_rate и /time_series (в том числе пакетные - symbol=AAPL,MSFT)
+детерминированными значениями и может имитировать задержку сети.
+
+Запуск отдельно от тестов:
+    python -m benchmarks.twelvedata_stub --port 8765 --latency 0.05
+"""
+
+import argparse
+import json
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+
+
+def stub_price(symbol: str) -> float:
+    """Функция возвращает детерминированную «цену» для символа"""
+    return 10 + zlib.crc32(symbol.encode("utf-8")) % 50000 / 100
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP-сервер заглушки со счетчиком запросов и настраиваемой задержкой ответа"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, unknown: tuple = ("UNKNOWN",)) -> None:
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.latency = latency
+        self.unknown = set(unknown)
+        self.requests: list = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def quote(self, endpoint: str, symbol: str, params: dict) -> dict:
+        """Метод формирует ответ API для одного символа"""
+        if symbol.split("/")[0] in self.unknown:
+            return {"code": 400, "message": f"**symbol** {symbol} not found", "status": "error"}
+        if endpoint == "time_series":
+            start, end = date.fromisoformat(params["start_date"][0]), date.fromisoformat(params["end_date"][0])
+            days = [end - timedelta(days=i) for i in range((end - start).days + 1)]
+            # как в API, значения идут от новых к старым; курс растет на 0.001 в день
+            values = [
+                {"datetime": day.isoformat(), "close": f"{stub_price(symbol) / 100 + (day - start).days / 1000:.5f}"}
+                for day in days
+            ]
+            return {"meta": {"symbol": symbol, "interval": "1day"}, "values": values, "status": "ok"}
+        if endpoint == "exchange_rate":
+            return {"symbol": symbol, "rate": round(stub_price(symbol) / 100, 4), "timestamp": 1746111240}
+        return {"price": f"{stub_price(symbol):.5f}"}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов заглушки"""
+
+    server: StubServer
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        endpoint = url.path.strip("/")
+        params = parse_qs(url.query)
+        symbols = [symbol for symbol in params.get("symbol", [""])[0].split(",") if symbol]
+        with self.server.lock:
+            self.server.requests.append((endpoint, symbols))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if endpoint not in ("price", "exchange_rate", "time_series"):
+            self.send_error(404)
+            return
+        if len(symbols) == 1:
+            body = self.server.quote(endpoint, symbols[0], params)
+        else:
+            body = {symbol: self.server.quote(endpoint, symbol, params) for symbol in symbols}
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@contextmanager
+def run_stub_server(latency: float = 0.0, port: int = 0) -> Iterator[StubServer]:
+    """Контекстный менеджер: запускает заглушку в фоновом потоке и останавливает ее на выходе"""
+    server = StubServer(port=port, latency=latency)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    server = StubServer(port=args.port, latency=args.latency)
+    print(f"заглушка twelvedata: {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
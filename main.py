@@ -1,16 +1,60 @@
-import pandas as pd
+import argparse
+import logging
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
 
-from src.reports import spending_by_category
-from src.services import search_by_phones, search_by_target
-from src.utils import make_transactions
-from src.views import main_views
+from src.logging_config import configure_logging
+from src.prompts import prompt_act_datetime
+
+# модули обработки данных (pandas, numpy, requests) импортируются внутри функций:
+# импорт main.py быстрый, а первый запрос ввода выводится до загрузки данных
+
+
+def _load_store() -> Any:
+    """Функция импортирует модули обработки данных и загружает хранилище транзакций.
+    Если файл с операциями не прочитан (нет файла, нет доступа), возвращает None"""
+    import src.reports  # noqa: F401
+    import src.services  # noqa: F401
+    import src.views  # noqa: F401
+    from src.store import get_store
+
+    try:
+        return get_store()
+    except OSError as e:
+        logging.getLogger("services_logger").error(f"Ошибка! Файл с операциями не прочитан: {e}")
+        return None
+
+
+def load_store_in_background() -> Future:
+    """Функция запускает импорт модулей и загрузку хранилища в фоновом потоке,
+    пока пользователь вводит дату"""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="store-loader")
+    future = executor.submit(_load_store)
+    executor.shutdown(wait=False)
+    return future
 
 
 def main() -> None:
     """Функция определяет главную логику проекта: в зависимости от ввода пользователя
     обращается к тем или иным модулям и возвращает данные в формате JSON"""
+    # загрузка хранилища транзакций - один раз на весь сеанс, в фоне, пока вводится дата
+    store_future = load_store_in_background()
+    act_datetime = prompt_act_datetime()
+    store = store_future.result()
+
+    from src.reports import category_spending_total, get_report_period, spending_by_category
+    from src.search import parse_search_query
+    from src.services import search_by_phone_number, search_by_phones, search_by_target
+    from src.views import main_views
+
+    if store is None:
+        # без файла с операциями Главная страница сообщает, что данных о транзакциях нет
+        print(main_views(None, act_datetime))
+        return
+
     # обработка и формирование информации для Главной страницы
-    print(main_views())
+    print(main_views(store, act_datetime))
 
     # запуск функционала поиска по ключевому слову
     search_by_target_check = bool(
@@ -25,10 +69,12 @@ def main() -> None:
         )
     )
     if search_by_target_check:
-        transactions: list = make_transactions()
-        input_target: str = input("Введите значение для поиска: ").strip()
+        input_target: str = input(
+            "Введите значение для поиска (несколько значений - через ИЛИ либо И): "
+        ).strip()
 
-        search_by_target_result = search_by_target(transactions, input_target)
+        keywords, operator = parse_search_query(input_target)
+        search_by_target_result = search_by_target(store, keywords, operator)
         print("Результаты поиска по заданным словам:")
         print(search_by_target_result)
 
@@ -45,10 +91,13 @@ def main() -> None:
         )
     )
     if search_by_phones_check:
-        transactions1: list = make_transactions()
-        search_by_phones_result = search_by_phones(transactions1)
+        search_by_phones_result = search_by_phones(store)
         print("Результаты поиска по номерам телефонов:")
         print(search_by_phones_result)
+        phone = input("Введите номер телефона для поиска по нему (Enter - пропустить): ").strip()
+        if phone:
+            print(f"Транзакции с номером {phone}:")
+            print(search_by_phone_number(store, phone))
 
     # запуск функционала по формированию отчета о тратах по выбранной категории
     spending_by_category_check = bool(
@@ -63,16 +112,94 @@ def main() -> None:
         )
     )
     if spending_by_category_check:
-        transactions_df = pd.DataFrame(make_transactions())
         category = input("Введите категорию для формирования отчета: ")
         date = input("Введите дату для формирования отчета в формате 'ДД.ММ.ГГГГ': ")
-        spending_by_category_result = spending_by_category(transactions_df, category, date)
-        total_amount = round(spending_by_category_result["Сумма платежа"].sum(), 2)
+        # дата проверяется один раз, дальше передается в проверенном формате
+        date = get_report_period(date)[1].strftime("%d.%m.%Y")
+        total_amount = category_spending_total(store, category, date)
+        spending_by_category(store, category, date)
         print(
             f"""Общая сумма расходов по категории '{category}' - {total_amount}
 Подробнее со списком транзакций можно ознакомиться в файле reports_data/report.json"""
         )
 
 
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    """Функция разбирает аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Анализ банковских операций")
+    parser.add_argument("--batch", metavar="FILE", help="файл запросов в формате JSON Lines (- для stdin)")
+    parser.add_argument("--output", metavar="FILE", help="файл для ответов (по умолчанию - stdout)")
+    parser.add_argument("--no-market", action="store_true", help="не запрашивать курсы валют и котировки")
+    parser.add_argument("--sqlite", action="store_true", help="выполнять запросы пакета к базе SQLite")
+    parser.add_argument(
+        "--fx-rates", metavar="FILE", help="пересчитать суммы пакета в основную валюту по историческим курсам из файла"
+    )
+    parser.add_argument(
+        "--ingest", nargs="?", const="", metavar="FILE", help="дополнить базу SQLite новыми строками файла"
+    )
+    parser.add_argument("--serve", action="store_true", help="запустить HTTP-сервер приложения")
+    parser.add_argument("--host", help="адрес HTTP-сервера (по умолчанию 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="порт HTTP-сервера (по умолчанию 8000)")
+    args = parser.parse_args(argv)
+    if args.fx_rates and args.sqlite:
+        parser.error("пересчет по курсам (--fx-rates) выполняется только для хранилища в памяти")
+    return args
+
+
+def batch_main(args: argparse.Namespace) -> None:
+    """Функция выполняет пакет запросов из файла JSON Lines на один раз загруженном хранилище"""
+    from src.api import Store, run_batch
+    from src.sqlite_store import get_sqlite_store
+    from src.store import get_store
+    from src.views import load_user_settings
+
+    store: Store
+    if args.sqlite:
+        store = get_sqlite_store()
+    elif args.fx_rates:
+        from src.fx import RateTable, normalize_store
+
+        rates = RateTable.from_file(load_user_settings()["user_main_currency"], args.fx_rates)
+        store = normalize_store(get_store(), rates)
+    else:
+        store = get_store()
+    settings = None if args.no_market else load_user_settings()
+    input_file = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+    output_file = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        stats = run_batch(input_file, output_file, store, settings)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(f"Обработано запросов: {stats['requests']}, ошибок: {stats['errors']}", file=sys.stderr)
+
+
+def ingest_main(args: argparse.Namespace) -> None:
+    """Функция дополняет базу SQLite новыми строками файла с операциями"""
+    from src.ingest import ingest_sqlite
+
+    stats = ingest_sqlite(args.ingest or None)
+    print(f"Прочитано строк: {stats['rows_read']}, добавлено: {stats['rows_added']}", file=sys.stderr)
+
+
+def serve_main(args: argparse.Namespace) -> None:
+    """Функция запускает HTTP-сервер приложения"""
+    from src.server import DEFAULT_HOST, DEFAULT_PORT, serve
+
+    serve(args.host or DEFAULT_HOST, args.port or DEFAULT_PORT)
+
+
 if __name__ == "__main__":
-    main()
+    arguments = parse_args()
+    # журнал настраивается один раз - в точке входа
+    configure_logging()
+    if arguments.batch:
+        batch_main(arguments)
+    elif arguments.ingest is not None:
+        ingest_main(arguments)
+    elif arguments.serve:
+        serve_main(arguments)
+    else:
+        main()
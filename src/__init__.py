@@ -0,0 +1,4 @@
+import logging
+
+# без настройки в точке входа (src.logging_config.configure_logging) записи журнала никуда не выводятся
+logging.getLogger("services_logger").addHandler(logging.NullHandler())
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# статусы операций, которые не учитываются в агрегатах (расходы, кешбэк, суммы по категориям)
+EXCLUDED_STATUSES = ("FAILED",)
+
+
+def to_kopecks(amounts: np.ndarray) -> np.ndarray:
+    """Функция переводит суммы в рублях в целые копейки, пропуски считаются нулем"""
+    return np.round(np.nan_to_num(np.asarray(amounts, dtype=np.float64)) * 100).astype(np.int64)
+
+
+def counted_mask(statuses: pd.Series) -> np.ndarray:
+    """Функция возвращает маску операций, учитываемых в агрегатах: статус не из EXCLUDED_STATUSES"""
+    counted: np.ndarray = ~pd.Series(statuses, dtype=object).isin(EXCLUDED_STATUSES).to_numpy()
+    return counted
+
+
+class CategoryDayCube:
+    """Куб агрегатов категория × день: сумма платежей (в копейках) и число операций.
+    Хранит префиксные суммы по дням, поэтому итог по категории за любой
+    период из целых дней считается за O(1)"""
+
+    def __init__(self, dates: np.ndarray, categories: pd.Series | pd.Categorical, amounts: np.ndarray) -> None:
+        categorical = pd.Categorical(categories)
+        self.categories = categorical.categories
+        codes = categorical.codes.astype(np.int64)
+        days = dates.astype("datetime64[D]")
+        valid = (codes >= 0) & ~np.isnat(days)
+        if valid.any():
+            self.first_day = days[valid].min()
+            self.days = int((days[valid].max() - self.first_day).astype(np.int64)) + 1
+        else:
+            self.first_day = np.datetime64("1970-01-01", "D")
+            self.days = 0
+        size = len(self.categories) * self.days
+        cells = codes[valid] * self.days + (days[valid] - self.first_day).astype(np.int64)
+        sums = np.bincount(cells, weights=to_kopecks(amounts)[valid], minlength=size).astype(np.int64)
+        counts = np.bincount(cells, minlength=size)
+        shape = (len(self.categories), self.days)
+        self.sum_prefix = np.zeros((shape[0], shape[1] + 1), dtype=np.int64)
+        self.count_prefix = np.zeros((shape[0], shape[1] + 1), dtype=np.int64)
+        np.cumsum(sums.reshape(shape), axis=1, out=self.sum_prefix[:, 1:])
+        np.cumsum(counts.reshape(shape), axis=1, out=self.count_prefix[:, 1:])
+
+    def add(self, dates: np.ndarray, categories: pd.Series | pd.Categorical, amounts: np.ndarray) -> None:
+        """Метод добавляет операции в куб на месте. Новые категории и дни добавляются
+        к префиксным суммам, а сами суммы пересчитываются только начиная с самого раннего
+        дня добавленных операций, поэтому для новых операций стоимость не зависит от истории"""
+        values = np.asarray(pd.Series(categories, dtype=object))
+        added = pd.Index(pd.unique(values[pd.notna(values)])).difference(self.categories)
+        if len(added):
+            self.categories = self.categories.append(added)
+            padding = np.zeros((len(added), self.days + 1), dtype=np.int64)
+            self.sum_prefix = np.vstack([self.sum_prefix, padding])
+            self.count_prefix = np.vstack([self.count_prefix, padding])
+        codes = self.categories.get_indexer(values).astype(np.int64)
+        days = np.asarray(dates).astype("datetime64[D]")
+        valid = (codes >= 0) & ~np.isnat(days)
+        if not valid.any():
+            return
+        codes, days = codes[valid], days[valid]
+        first_day, last_day = days.min(), days.max()
+        if self.days == 0:
+            self.first_day = first_day
+        if first_day < self.first_day:
+            # дни до начала куба: префиксные суммы на этих днях нулевые
+            shift = int((self.first_day - first_day).astype(np.int64))
+            padding = np.zeros((len(self.categories), shift), dtype=np.int64)
+            self.sum_prefix = np.hstack([padding, self.sum_prefix])
+            self.count_prefix = np.hstack([padding, self.count_prefix])
+            self.first_day, self.days = first_day, self.days + shift
+        extra = int((last_day - self.first_day).astype(np.int64)) + 1 - self.days
+        if extra > 0:
+            # новые дни в конце продолжают последнюю префиксную сумму
+            self.sum_prefix = np.hstack([self.sum_prefix, np.repeat(self.sum_prefix[:, -1:], extra, axis=1)])
+            self.count_prefix = np.hstack([self.count_prefix, np.repeat(self.count_prefix[:, -1:], extra, axis=1)])
+            self.days += extra
+        offsets = (days - self.first_day).astype(np.int64)
+        low = int(offsets.min())
+        span = self.days - low
+        cells = codes * span + (offsets - low)
+        size = len(self.categories) * span
+        sums = np.bincount(cells, weights=to_kopecks(amounts)[valid], minlength=size).astype(np.int64)
+        counts = np.bincount(cells, minlength=size)
+        self.sum_prefix[:, low + 1 :] += np.cumsum(sums.reshape(-1, span), axis=1)
+        self.count_prefix[:, low + 1 :] += np.cumsum(counts.reshape(-1, span), axis=1)
+
+    def _day_offset(self, day: np.datetime64) -> int:
+        offset = int((day.astype("datetime64[D]") - self.first_day).astype(np.int64))
+        return min(max(offset, 0), self.days)
+
+    def total(self, category: str, first_day: np.datetime64, stop_day: np.datetime64) -> tuple[int, int]:
+        """Метод возвращает сумму платежей в копейках и число операций по категории
+        за дни из полуинтервала [first_day, stop_day)"""
+        code = self.categories.get_indexer([category])[0]
+        low, high = self._day_offset(first_day), self._day_offset(stop_day)
+        if code < 0 or high <= low:
+            return 0, 0
+        amount = self.sum_prefix[code, high] - self.sum_prefix[code, low]
+        count = self.count_prefix[code, high] - self.count_prefix[code, low]
+        return int(amount), int(count)
@@ -0,0 +1,216 @@
+import json
+import logging
+import os
+import sys
+from typing import Callable, Iterable, Iterator, Optional, TextIO, cast
+
+from src.engine import aggregate_operations
+from src.investment import investment_bank, investment_bank_sweep
+from src.market import MarketDataClient
+from src.prompts import parse_act_datetime
+from src.records import to_serializable
+from src.reports import category_spending_total, parse_report_date, spending_by_category
+from src.search import parse_search_query
+from src.services import search_by_phone_number, search_by_phones, search_by_target
+from src.sqlite_store import SqliteStore
+from src.store import TransactionStore
+from src.views import build_dashboard
+
+api_logger = logging.getLogger("services_logger")
+
+# хранилища, на которых выполняются запросы
+Store = TransactionStore | SqliteStore
+
+
+class RequestError(ValueError):
+    """Ошибка в параметрах запроса: ответ содержит сообщение об ошибке, обработка пакета продолжается"""
+
+
+def _required(request: dict, field: str) -> str:
+    """Функция возвращает обязательное поле запроса"""
+    value = request.get(field)
+    if value is None or value == "":
+        raise RequestError(f"не задано поле {field}")
+    return cast(str, value)
+
+
+def _report_file_name(request: dict) -> Optional[str]:
+    """Функция возвращает имя файла отчета из запроса. Отчеты записываются только в папку reports_data,
+    поэтому абсолютные пути, разделители каталогов и '..' в имени запрещены"""
+    file_name = request.get("file")
+    if not file_name:
+        return None
+    separators = [separator for separator in ("/", os.sep, os.altsep) if separator]
+    if not isinstance(file_name, str) or os.path.isabs(file_name) or ".." in file_name:
+        raise RequestError(f"недопустимое имя файла отчета: {file_name}")
+    if any(separator in file_name for separator in separators):
+        raise RequestError(f"недопустимое имя файла отчета: {file_name}")
+    return file_name
+
+
+def handle_dashboard(
+    request: dict, store: Store, settings: Optional[dict], market_client: Optional[MarketDataClient]
+) -> dict:
+    """Функция обрабатывает запрос Главной страницы: {"type": "dashboard", "datetime": "ДД.ММ.ГГГГ ЧЧ:ММ:СС"}"""
+    act_date = _required(request, "datetime")
+    try:
+        act_datetime = parse_act_datetime(act_date)
+    except ValueError:
+        raise RequestError(f"неверный формат даты и времени: {act_date}") from None
+    return build_dashboard(act_datetime, store, settings, market_client)
+
+
+def handle_search(request: dict, store: Store, *_: object) -> list | dict:
+    """Функция обрабатывает поисковый запрос: {"type": "search", "query": "кафе ИЛИ такси"}
+    или {"type": "search", "keywords": ["кафе", "такси"], "operator": "or"}"""
+    if "keywords" in request:
+        keywords, operator = list(request["keywords"]), request.get("operator", "and")
+    else:
+        keywords, operator = parse_search_query(_required(request, "query").strip())
+    if operator not in ("and", "or"):
+        raise RequestError(f"неизвестный оператор поиска: {operator}")
+    return cast(list | dict, json.loads(search_by_target(store, keywords, operator)))
+
+
+def handle_phones(request: dict, store: Store, *_: object) -> list | dict:
+    """Функция обрабатывает поиск по телефонам: {"type": "phones"} - все транзакции с номерами,
+    {"type": "phones", "phone": "+7 921 111-22-33"} - транзакции с заданным номером"""
+    phone = request.get("phone")
+    if phone:
+        return cast(list | dict, json.loads(search_by_phone_number(store, phone)))
+    return cast(list | dict, json.loads(search_by_phones(store)))
+
+
+def handle_report(request: dict, store: Store, *_: object) -> dict:
+    """Функция обрабатывает запрос отчета по категории:
+    {"type": "report", "category": "Супермаркеты", "date": "ДД.ММ.ГГГГ", "file": "report.json"}.
+    Возвращает сумму и число транзакций; файл отчета записывается, только если задано поле file"""
+    category = _required(request, "category")
+    file_name = _report_file_name(request)
+    try:
+        date = parse_report_date(request.get("date")).strftime("%d.%m.%Y %H:%M:%S")
+    except ValueError:
+        raise RequestError(f"неверный формат даты: {request.get('date')}") from None
+    if file_name:
+        report = spending_by_category(store, category, date, report_filename=file_name)
+    else:
+        report = spending_by_category.__wrapped__(store, category, date)
+    return {
+        "category": category,
+        "total": category_spending_total(store, category, date),
+        "transactions": len(report),
+        "file": file_name,
+    }
+
+
+def handle_investment(request: dict, store: Store, *_: object) -> dict | list:
+    """Функция обрабатывает запрос расчета инвесткопилки:
+    {"type": "investment", "step": 50, "start": "ДД.ММ.ГГГГ", "stop": "ДД.ММ.ГГГГ"} - итог, по месяцам и картам,
+    {"type": "investment", "steps": [10, 50, 100], "periods": [["01.01.2021", "01.07.2021"]]} - сумма
+    для каждого сочетания шага и периода. Период - [start, stop), без дат - вся история"""
+    try:
+        if "steps" in request:
+            periods = [tuple(period) for period in request.get("periods") or [(None, None)]]
+            return cast(list, json.loads(investment_bank_sweep(store, list(request["steps"]), periods)))
+        step, start, stop = request.get("step", 50), request.get("start"), request.get("stop")
+        return cast(dict, json.loads(investment_bank(store, step, start, stop)))
+    except (ValueError, TypeError) as e:
+        raise RequestError(f"неверные параметры инвесткопилки: {e}") from None
+
+
+def handle_aggregate(request: dict, store: Store, *_: object) -> list:
+    """Функция обрабатывает запрос агрегатов операций:
+    {"type": "aggregate", "group_by": ["mcc", "month"], "start": "ДД.ММ.ГГГГ", "stop": "ДД.ММ.ГГГГ",
+    "cards": [...], "categories": [...], "mccs": [...], "statuses": [...]} - число операций, сумма,
+    расходы и кешбэк по группам. Ключи группировки: card, category, mcc, status, month, day"""
+    group_by = request.get("group_by") or []
+    filters = {name: request.get(name) for name in ("start", "stop", "cards", "categories", "mccs", "statuses")}
+    try:
+        if filters["mccs"] is not None:
+            filters["mccs"] = [float(mcc) for mcc in filters["mccs"]]
+        return aggregate_operations(store, [group_by] if isinstance(group_by, str) else group_by, **filters)
+    except (ValueError, TypeError) as e:
+        raise RequestError(f"неверные параметры агрегатов: {e}") from None
+
+
+HANDLERS: dict[str, Callable] = {
+    "dashboard": handle_dashboard,
+    "search": handle_search,
+    "phones": handle_phones,
+    "report": handle_report,
+    "investment": handle_investment,
+    "aggregate": handle_aggregate,
+}
+
+
+def handle_request(
+    request: dict,
+    store: Store,
+    settings: Optional[dict] = None,
+    market_client: Optional[MarketDataClient] = None,
+) -> dict:
+    """Функция выполняет один запрос к приложению без обращения к вводу пользователя.
+    Тип запроса задается полем type (dashboard, search, phones, report, investment, aggregate), поле id
+    переносится в ответ. Ответ содержит result или, при ошибке в запросе, error"""
+    response = {"id": request.get("id"), "type": request.get("type")}
+    request_type = request.get("type")
+    handler = HANDLERS.get(request_type) if isinstance(request_type, str) else None
+    try:
+        if "invalid_line" in request:
+            raise RequestError(f"строка {request['invalid_line']}: запрос должен быть объектом JSON")
+        if handler is None:
+            raise RequestError(f"неизвестный тип запроса: {request.get('type')}")
+        response["result"] = handler(request, store, settings, market_client)
+    except RequestError as e:
+        api_logger.warning(f"запрос {response['id']}: {e}")
+        response["error"] = str(e)
+    except Exception as e:
+        api_logger.error(f"запрос {response['id']}: ошибка обработки: {e}")
+        response["error"] = f"ошибка обработки запроса: {e}"
+    return response
+
+
+def process_requests(
+    requests: Iterable[dict],
+    store: Store,
+    settings: Optional[dict] = None,
+    market_client: Optional[MarketDataClient] = None,
+) -> Iterator[dict]:
+    """Функция-генератор выполняет запросы по очереди на одном загруженном хранилище"""
+    for request in requests:
+        yield handle_request(request, store, settings, market_client)
+
+
+def read_requests(lines: Iterable[str]) -> Iterator[dict]:
+    """Функция-генератор разбирает запросы в формате JSON Lines; пустые строки пропускаются,
+    строка с неверным JSON (или не объектом JSON) дает в ответе ошибку с номером строки"""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            request = None
+        yield request if isinstance(request, dict) else {"invalid_line": number}
+
+
+def run_batch(
+    input_file: TextIO,
+    output_file: Optional[TextIO],
+    store: Store,
+    settings: Optional[dict] = None,
+    market_client: Optional[MarketDataClient] = None,
+) -> dict:
+    """Функция выполняет пакет запросов из файла JSON Lines и записывает ответы
+    по одному на строку в output_file (по умолчанию - в стандартный вывод).
+    Возвращает число обработанных запросов и ошибок"""
+    output_file = output_file or sys.stdout
+    stats = {"requests": 0, "errors": 0}
+    api_logger.info("запуск пакетной обработки запросов")
+    for response in process_requests(read_requests(input_file), store, settings, market_client):
+        stats["requests"] += 1
+        stats["errors"] += "error" in response
+        output_file.write(json.dumps(response, ensure_ascii=False, default=to_serializable))
+        output_file.write("\n")
+    api_logger.info(f"пакет обработан: запросов {stats['requests']}, ошибок {stats['errors']}")
+    return stats
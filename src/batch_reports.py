@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src import cache
+from src.aggregates import counted_mask
+from src.report_writer import write_report
+from src.reports import parse_report_date
+from src.store import TransactionStore
+
+batch_logger = logging.getLogger("services_logger")
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "reports_data", "batch")
+
+# данные, открытые процессом-исполнителем: колонки снимка, отсортированные даты, порядок строк, категории
+_worker_data: Optional[dict] = None
+
+
+def write_snapshot(store: TransactionStore, snapshot_path: str) -> None:
+    """Функция сохраняет хранилище в папку снимка для процессов-исполнителей: колонки в формате
+    колоночного кэша (.npy), разобранные даты в порядке индекса дат и коды категорий
+    (у операций со статусом FAILED - -1).
+    Исполнители открывают файлы через mmap, DataFrame не сериализуется для каждой задачи"""
+    frame = store.take_frame(np.arange(len(store)))
+    if not cache.save_cached_frame(frame, os.path.join(snapshot_path, "columns")):
+        raise ValueError("данные содержат колонки, которые нельзя сохранить в колоночный снимок")
+    categories = pd.Categorical(store.column("Категория"))
+    category_codes = categories.codes.copy()
+    if "Статус" in store.frame.columns:
+        # как в spending_by_category: операции со статусом FAILED не попадают в отчеты
+        category_codes[~counted_mask(store.column("Статус"))] = -1
+    np.save(os.path.join(snapshot_path, "order.npy"), store.date_index.order, allow_pickle=False)
+    np.save(os.path.join(snapshot_path, "sorted_dates.npy"), store.date_index.sorted_dates, allow_pickle=False)
+    np.save(os.path.join(snapshot_path, "category_codes.npy"), category_codes, allow_pickle=False)
+    with open(os.path.join(snapshot_path, "categories.json"), "w", encoding="utf-8") as file:
+        json.dump([str(category) for category in categories.categories], file, ensure_ascii=False)
+
+
+def _init_worker(snapshot_path: str) -> None:
+    """Функция открывает снимок данных в процессе-исполнителе (один раз на процесс)"""
+    global _worker_data
+    with open(os.path.join(snapshot_path, "categories.json"), "r", encoding="utf-8") as file:
+        categories = json.load(file)
+    _worker_data = {
+        "columns": cache.load_cached_columns(os.path.join(snapshot_path, "columns"), mmap=True),
+        "order": np.load(os.path.join(snapshot_path, "order.npy"), mmap_mode="r"),
+        "sorted_dates": np.load(os.path.join(snapshot_path, "sorted_dates.npy"), mmap_mode="r"),
+        "category_codes": np.load(os.path.join(snapshot_path, "category_codes.npy"), mmap_mode="r"),
+        "categories": {category: code for code, category in enumerate(categories)},
+    }
+
+
+def report_file_name(number: int, category: str, end_date: pd.Timestamp) -> str:
+    """Функция формирует имя файла отчета для задачи пакета; дата берется из разобранной даты отчета,
+    поэтому разделители во введенной дате (например, 01/02/2018) не попадают в путь"""
+    safe_category = re.sub(r"[^\w\-]+", "_", category).strip("_") or "category"
+    return f"report_{number:04d}_{safe_category}_{end_date.strftime('%d-%m-%Y')}.json"
+
+
+def _run_job(job: tuple) -> dict:
+    """Функция выполняет одну задачу пакета в процессе-исполнителе и записывает отчет в файл.
+    Ошибка задачи возвращается в результате и не прерывает пакет"""
+    number, category, date, start, stop, file_path = job
+    try:
+        transactions = _write_job_report(category, start, stop, file_path)
+    except Exception as e:
+        batch_logger.error(f"задача {number}: ошибка при формировании отчета: {e}")
+        return {"number": number, "category": category, "date": date, "error": str(e)}
+    return {"number": number, "category": category, "date": date, "file": file_path, "transactions": transactions}
+
+
+def _write_job_report(category: str, start: np.datetime64, stop: np.datetime64, file_path: str) -> int:
+    """Функция отбирает операции категории за период [start, stop) из снимка процесса-исполнителя,
+    атомарно записывает отчет в файл (write_report) и возвращает число транзакций"""
+    data = _worker_data
+    if data is None:
+        raise RuntimeError("процесс-исполнитель не инициализирован")
+    low = int(np.searchsorted(data["sorted_dates"], start.astype("datetime64[ns]"), side="left"))
+    high = int(np.searchsorted(data["sorted_dates"], stop.astype("datetime64[ns]"), side="left"))
+    positions = np.sort(data["order"][low : max(low, high)])
+    code = data["categories"].get(category, -2)
+    positions = positions[data["category_codes"][positions] == code]
+    report = cache.frame_from_columns(data["columns"], positions)
+    write_report(report, file_path, "json")
+    return len(report)
+
+
+def run_report_batch(
+    store: TransactionStore, jobs: list, output_dir: Optional[str] = None, processes: Optional[int] = None
+) -> list:
+    """Функция формирует отчеты spending_by_category для списка задач (категория, дата)
+    в пуле процессов и записывает каждый отчет в отдельный файл папки output_dir.
+    Данные передаются исполнителям через memory-mapped снимок колонок, даты разбираются
+    один раз при загрузке хранилища. processes=1 - выполнение в текущем процессе.
+    Возвращает по каждой задаче словарь с файлом отчета и числом транзакций или с ошибкой"""
+    global _worker_data
+    output_dir = output_dir or DEFAULT_OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    results: list = [None] * len(jobs)
+    tasks = []
+    for number, (category, date) in enumerate(jobs):
+        date = date or ""
+        try:
+            # как в parse_report_period: без даты отчет строится на текущий момент
+            end_date = parse_report_date(date)
+        except ValueError:
+            batch_logger.error(f"задача {number}: неверный формат даты {date}")
+            results[number] = {"number": number, "category": category, "date": date, "error": "неверный формат даты"}
+            continue
+        start, stop = (end_date - pd.DateOffset(months=3)).to_datetime64(), (
+            end_date + pd.Timedelta(1)
+        ).to_datetime64()
+        file_path = os.path.join(output_dir, report_file_name(number, category, end_date))
+        tasks.append((number, category, date, start, stop, file_path))
+
+    batch_logger.info(f"пакет отчетов: задач {len(tasks)}, процессов {processes or os.cpu_count()}")
+    os.makedirs(cache.CACHE_DIR, exist_ok=True)
+    snapshot_path = tempfile.mkdtemp(dir=cache.CACHE_DIR, prefix="reports-")
+    try:
+        write_snapshot(store, snapshot_path)
+        if processes == 1:
+            _init_worker(snapshot_path)
+            done = [_run_job(task) for task in tasks]
+        else:
+            workers = processes or os.cpu_count() or 1
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snapshot_path,)) as pool:
+                done = list(pool.map(_run_job, tasks, chunksize=chunksize))
+    finally:
+        _worker_data = None
+        shutil.rmtree(snapshot_path, ignore_errors=True)
+    for result in done:
+        results[result["number"]] = result
+    batch_logger.info("пакет отчетов сформирован")
+    return results
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+cache_logger = logging.getLogger("services_logger")
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache")
+CACHE_FORMAT_VERSION = 1
+# типы колонок, которые numpy сохраняет в .npy без pickle
+NUMERIC_KINDS = "biufM"
+
+
+def source_version(file_path: str) -> tuple:
+    """Функция возвращает версию исходного файла: абсолютный путь, время изменения и размер.
+    Если файл не существует - выбрасывает FileNotFoundError"""
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+
+
+def cache_path_for(file_path: str) -> str:
+    """Функция возвращает путь к папке кэша для текущей версии файла"""
+    abs_path, mtime_ns, size = source_version(file_path)
+    stem = os.path.splitext(os.path.basename(abs_path))[0]
+    path_hash = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:8]
+    version_hash = hashlib.sha1(f"{mtime_ns}|{size}|{CACHE_FORMAT_VERSION}".encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"{stem}-{path_hash}-{version_hash}")
+
+
+def load_cached_columns(cache_path: str, mmap: bool = False) -> Optional[dict]:
+    """Функция читает колонки кэша без преобразования: {имя: (массив, маска пропусков или None)}.
+    Строковые колонки остаются массивами фиксированной ширины, поэтому при mmap=True
+    в память попадают только реально прочитанные строки. Если кэша нет или он поврежден - None"""
+    meta_path = os.path.join(cache_path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        columns = {}
+        for i, column in enumerate(meta["columns"]):
+            values = np.load(os.path.join(cache_path, f"{i}.npy"), mmap_mode="r" if mmap else None)
+            mask = None
+            if column["kind"] == "str":
+                mask = np.load(os.path.join(cache_path, f"{i}_mask.npy"), mmap_mode="r" if mmap else None)
+            columns[column["name"]] = (values, mask)
+        return columns
+    except (OSError, ValueError, KeyError) as e:
+        cache_logger.warning(f"кэш {cache_path} поврежден и будет пересоздан: {e}")
+        return None
+
+
+def frame_from_columns(columns: dict, positions: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Функция собирает DataFrame из колонок кэша (всех строк или только строк positions):
+    строковые колонки превращаются в object с NaN на месте пропусков"""
+    frame_columns = {}
+    for name, (values, mask) in columns.items():
+        if positions is not None:
+            values = values[positions]
+            mask = mask[positions] if mask is not None else None
+        if mask is not None:
+            values = values.astype(object)
+            values[mask] = np.nan
+        frame_columns[name] = values
+    return pd.DataFrame(frame_columns, columns=list(columns))
+
+
+def load_cached_frame(cache_path: str, mmap: bool = False) -> Optional[pd.DataFrame]:
+    """Функция читает DataFrame из колоночного кэша. Если кэша нет или он поврежден - возвращает None.
+    При mmap=True числовые колонки отображаются в память без копирования"""
+    columns = load_cached_columns(cache_path, mmap=mmap)
+    if columns is None:
+        return None
+    return frame_from_columns(columns)
+
+
+def save_cached_frame(data_frame: pd.DataFrame, cache_path: str) -> bool:
+    """Функция сохраняет DataFrame в колоночный кэш: по одному .npy-файлу на колонку.
+    Строковые колонки хранятся как массивы фиксированной ширины с маской пропусков.
+    Возвращает False, если DataFrame содержит колонки, которые нельзя сохранить без pickle"""
+    meta: dict = {"rows": len(data_frame), "columns": []}
+    arrays = []
+    for name, series in data_frame.items():
+        if series.dtype.kind in NUMERIC_KINDS:
+            meta["columns"].append({"name": str(name), "kind": "num"})
+            arrays.append((series.to_numpy(), None))
+            continue
+        mask = series.isna().to_numpy()
+        if not series[~mask].map(type).eq(str).all():
+            cache_logger.warning(f"колонка {name} содержит значения разных типов, кэш не создан")
+            return False
+        meta["columns"].append({"name": str(name), "kind": "str"})
+        arrays.append((series.where(~mask, "").to_numpy(dtype=str), mask))
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # пишем во временную папку и переименовываем, чтобы читатели не увидели недописанный кэш
+    tmp_path = tempfile.mkdtemp(dir=CACHE_DIR, prefix=".tmp-")
+    try:
+        for i, (values, mask) in enumerate(arrays):
+            np.save(os.path.join(tmp_path, f"{i}.npy"), values, allow_pickle=False)
+            if mask is not None:
+                np.save(os.path.join(tmp_path, f"{i}_mask.npy"), mask, allow_pickle=False)
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as file:
+            json.dump(meta, file, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not os.path.exists(os.path.join(cache_path, "meta.json")):
+            raise
+    return True
+
+
+def remove_stale_caches(cache_path: str) -> None:
+    """Функция удаляет кэши предыдущих версий того же исходного файла"""
+    prefix = os.path.basename(cache_path).rsplit("-", 1)[0] + "-"
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        if name.startswith(prefix) and path != cache_path:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def read_operations_frame(file_path: str, use_cache: bool = True) -> pd.DataFrame:
+    """Функция читает xlsx-файл с операциями в DataFrame. При первом чтении файл
+    конвертируется в колоночный кэш, последующие чтения той же версии файла
+    (путь, время изменения, размер) обслуживаются из кэша без разбора Excel"""
+    if not use_cache:
+        return pd.read_excel(file_path)
+    cache_path = cache_path_for(file_path)
+    data_frame = load_cached_frame(cache_path)
+    if data_frame is not None:
+        cache_logger.info(f"данные прочитаны из кэша {os.path.basename(cache_path)}")
+        return data_frame
+    cache_logger.info("кэш не найден, чтение xlsx-файла")
+    data_frame = pd.read_excel(file_path)
+    try:
+        if save_cached_frame(data_frame, cache_path):
+            remove_stale_caches(cache_path)
+            cache_logger.info(f"создан кэш {os.path.basename(cache_path)}")
+    except OSError as e:
+        cache_logger.warning(f"не удалось сохранить кэш: {e}")
+    return data_frame
@@ -0,0 +1,55 @@
+import copy
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable
+
+from src.store import TransactionStore
+
+DEFAULT_MAX_SIZE = 128
+
+
+def dashboard_key(store: TransactionStore, act_date: datetime) -> tuple:
+    """Функция возвращает ключ кэша главной страницы: версия данных месяца act_date и сама дата.
+    Добавление операций другого месяца ключ не меняет"""
+    return store.month_version(act_date.year, act_date.month), act_date.strftime("%d.%m.%Y")
+
+
+class DashboardCache:
+    """LRU-кэш разделов главной страницы, вычисляемых по транзакциям (cards, top_transactions).
+    Курсы валют и котировки сюда не попадают - у них свой кэш с временем жизни (src.market).
+    Значения возвращаются копиями, поэтому изменение ответа не портит кэш"""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], dict]) -> dict:
+        """Метод возвращает разделы по ключу, при промахе вычисляет их функцией compute"""
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self.entries[key])
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return copy.deepcopy(value)
+
+    def clear(self) -> None:
+        """Метод очищает кэш"""
+        with self._lock:
+            self.entries.clear()
+
+
+dashboard_cache = DashboardCache()
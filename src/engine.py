@@ -0,0 +1,255 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, cast
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import EXCLUDED_STATUSES, to_kopecks
+from src.sqlite_store import SqliteStore
+from src.store import DateIndex, TransactionStore, parse_operation_dates
+
+engine_logger = logging.getLogger("services_logger")
+
+# ключи отбора и группировки - колонки операций, кодируемые словарем
+KEY_COLUMNS = {"card": "Номер карты", "category": "Категория", "mcc": "MCC", "status": "Статус"}
+# ключи группировки по дате операции
+DATE_KEYS = {"month": "M", "day": "D"}
+ENGINE_COLUMNS = ["Дата операции", *KEY_COLUMNS.values(), "Сумма платежа", "Кэшбэк"]
+# число сочетаний ключей, до которого группы считаются np.bincount по всем сочетаниям
+MAX_DENSE_GROUPS = 1 << 22
+MAX_TABLES = 4
+
+
+def encode_column(values: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    """Функция кодирует колонку словарем: возвращает целые коды (пропуск - -1) и словарь значений.
+    Для колонки category используются ее коды, строки не перебираются"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy().astype(np.int32), pd.Index(values.cat.categories)
+    codes, uniques = pd.factorize(values.to_numpy(dtype=object), sort=True)
+    return codes.astype(np.int32), pd.Index(uniques)
+
+
+def _moment(value: object, default: str) -> np.datetime64:
+    """Функция переводит границу периода в datetime64[ns]; строки разбираются в формате ДД.ММ.ГГГГ"""
+    if value is None or value == "":
+        return np.datetime64(default, "ns")
+    moment = pd.to_datetime(value, dayfirst=True) if isinstance(value, str) else pd.Timestamp(value)
+    if pd.isna(moment):
+        raise ValueError(f"неверный формат даты: {value}")
+    return cast(np.datetime64, moment.to_datetime64().astype("datetime64[ns]"))
+
+
+def _key_value(key: str, value: Any) -> object:
+    """Функция переводит значение ключа группировки в тип JSON"""
+    if key == "mcc":
+        return int(value)
+    if key in DATE_KEYS:
+        return str(value)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class OperationsTable:
+    """Движок агрегатов по таблице операций. Карта, категория, MCC и статус закодированы
+    словарем в целые коды, суммы хранятся в копейках (int64). Отбор по ключу - выборка
+    из таблицы допустимых кодов, группировка - np.bincount по составному целому ключу
+    (при большом числе сочетаний - по отсортированным сегментам np.unique), поэтому строки
+    не хешируются при каждом запросе. Операции со статусами EXCLUDED_STATUSES не учитываются,
+    если отбор по статусу не задан явно"""
+
+    def __init__(self, frame: pd.DataFrame, dates: np.ndarray, date_index: Optional[DateIndex] = None) -> None:
+        self.dates = dates
+        # индекс дат хранилища (метод positions), без него период отбирается сравнением дат
+        self.date_index = date_index
+        self.codes: dict = {}
+        self.values: dict = {}
+        for key, column in KEY_COLUMNS.items():
+            if column in frame.columns:
+                self.codes[key], self.values[key] = encode_column(frame[column])
+            else:
+                self.codes[key], self.values[key] = np.full(len(frame), -1, dtype=np.int32), pd.Index([])
+        missing = pd.Series(np.nan, index=frame.index)
+        self.amounts = to_kopecks(pd.to_numeric(frame.get("Сумма платежа", missing), errors="coerce"))
+        self.cashback = to_kopecks(pd.to_numeric(frame.get("Кэшбэк", missing), errors="coerce"))
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "OperationsTable":
+        """Метод создает таблицу по DataFrame операций (формат make_transactions)"""
+        if "Дата операции" in frame.columns:
+            dates = parse_operation_dates(frame["Дата операции"])
+        else:
+            dates = np.full(len(frame), np.datetime64("NaT"), dtype="datetime64[ns]")
+        return cls(frame, dates)
+
+    @classmethod
+    def from_records(cls, transactions: Iterable) -> "OperationsTable":
+        """Метод создает таблицу по списку словарей; читаются только колонки движка"""
+        transactions = list(transactions)
+        columns = {
+            column: [transaction.get(column) for transaction in transactions]
+            for column in ENGINE_COLUMNS
+            if any(column in transaction for transaction in transactions)
+        }
+        return cls.from_frame(pd.DataFrame(columns, index=pd.RangeIndex(len(transactions))))
+
+    def _allowed(self, key: str, values: Iterable) -> np.ndarray:
+        """Метод возвращает таблицу допустимых кодов ключа: элемент code + 1 истинен для кодов
+        из values (нулевой элемент - для пропуска, если в values есть None)"""
+        values = [values] if isinstance(values, str) else list(values)
+        allowed = np.zeros(len(self.values[key]) + 1, dtype=bool)
+        present = [value for value in values if value is not None and value == value]
+        codes = self.values[key].get_indexer(pd.Index(present)) if present else []
+        allowed[np.asarray(codes, dtype=np.intp)[np.asarray(codes) >= 0] + 1] = True
+        allowed[0] = len(present) < len(values)
+        return allowed
+
+    def select(
+        self,
+        start: object = None,
+        stop: object = None,
+        cards: Optional[Iterable] = None,
+        categories: Optional[Iterable] = None,
+        mccs: Optional[Iterable] = None,
+        statuses: Optional[Iterable] = None,
+    ) -> np.ndarray:
+        """Метод возвращает номера строк (по возрастанию), удовлетворяющих условиям:
+        дата операции в [start, stop), карта, категория, MCC и статус из заданных списков
+        (None - без условия; None в списке - пропуск значения). Без statuses операции
+        со статусами EXCLUDED_STATUSES исключаются"""
+        if start is None and stop is None:
+            positions = np.arange(len(self))
+        else:
+            low, high = _moment(start, "1678-01-01"), _moment(stop, "2262-01-01")
+            if self.date_index is not None:
+                positions = self.date_index.positions(low, high)
+            else:
+                positions = np.flatnonzero((self.dates >= low) & (self.dates < high))
+        conditions = {"card": cards, "category": categories, "mcc": mccs, "status": statuses}
+        for key, values in conditions.items():
+            if values is not None:
+                positions = positions[self._allowed(key, values)[self.codes[key][positions] + 1]]
+        if statuses is None:
+            positions = positions[~self._allowed("status", EXCLUDED_STATUSES)[self.codes["status"][positions] + 1]]
+        return positions
+
+    def _group_codes(self, key: str, positions: np.ndarray) -> tuple[np.ndarray, int, Any]:
+        """Метод возвращает коды ключа группировки для строк (0 - пропуск), число кодов
+        и данные для расшифровки кода"""
+        if key in KEY_COLUMNS:
+            return self.codes[key][positions].astype(np.int64) + 1, len(self.values[key]) + 1, self.values[key]
+        if key not in DATE_KEYS:
+            raise ValueError(f"неизвестный ключ группировки: {key}")
+        units = self.dates[positions].astype(f"datetime64[{DATE_KEYS[key]}]")
+        valid = ~np.isnat(units)
+        numbers = units.astype(np.int64)
+        first = int(numbers[valid].min()) if valid.any() else 0
+        codes = np.where(valid, numbers - first + 1, 0)
+        return codes, int(codes.max(initial=0)) + 1, (first, DATE_KEYS[key])
+
+    def aggregate(self, group_by: Iterable[str] = (), **filters: Any) -> list:
+        """Метод считает по строкам, отобранным select(**filters), число операций (operations),
+        сумму платежей (amount), расходы - модуль суммы отрицательных платежей (spent) и кешбэк
+        (cashback) в разрезе ключей group_by: card, category, mcc, status, month, day.
+        Возвращает список групп, упорядоченный по значениям ключей (пропуски - None, в конце);
+        без ключей - одну группу с итогами"""
+        group_by = list(group_by)
+        positions = self.select(**filters)
+        combined = np.zeros(len(positions), dtype=np.int64)
+        sizes: list[int] = []
+        decoders: list[Any] = []
+        for key in group_by:
+            codes, size, decoder = self._group_codes(key, positions)
+            combined = combined * size + codes
+            sizes.append(size)
+            decoders.append(decoder)
+        amounts = self.amounts[positions]
+        weights = {
+            "amount": amounts,
+            "spent": np.where(amounts < 0, -amounts, 0),
+            "cashback": self.cashback[positions],
+        }
+        total_size = int(np.prod(sizes, dtype=np.float64)) if sizes else 1
+        if total_size <= MAX_DENSE_GROUPS:
+            counts = np.bincount(combined, minlength=total_size)
+            groups = np.flatnonzero(counts) if group_by else np.zeros(1, dtype=np.int64)
+            inverse, size = combined, total_size
+        else:
+            groups, inverse = np.unique(combined, return_inverse=True)
+            counts, size = np.bincount(inverse, minlength=len(groups)), len(groups)
+        sums = {name: np.bincount(inverse, weights=values, minlength=size) for name, values in weights.items()}
+        selected = groups if total_size <= MAX_DENSE_GROUPS else np.arange(len(groups))
+        key_codes = np.unravel_index(groups, sizes) if group_by else ()
+        result = []
+        for i, group in enumerate(selected):
+            item: dict = {}
+            for key, codes, decoder in zip(group_by, key_codes, decoders):
+                code = int(codes[i])
+                if code == 0:
+                    item[key] = None
+                elif key in DATE_KEYS:
+                    item[key] = _key_value(key, np.datetime64(decoder[0] + code - 1, decoder[1]))
+                else:
+                    item[key] = _key_value(key, decoder[code - 1])
+            item["operations"] = int(counts[group])
+            for name, values in sums.items():
+                item[name] = int(np.rint(values[group])) / 100
+            result.append(item)
+        return sorted(
+            result,
+            key=lambda item: [(item[key] is None, item[key] if item[key] is not None else 0) for key in group_by],
+        )
+
+
+_tables: OrderedDict[tuple, OperationsTable] = OrderedDict()
+# кэш таблиц используется потоками HTTP-сервера
+_tables_lock = threading.Lock()
+
+
+def get_operations_table(
+    transactions: Iterable | pd.DataFrame | TransactionStore | SqliteStore,
+) -> OperationsTable:
+    """Функция возвращает таблицу движка агрегатов для транзакций. Для хранилищ таблица
+    кэшируется до изменения данных; для TransactionStore переиспользуются коды колонок category,
+    разобранные даты и индекс дат хранилища"""
+    if isinstance(transactions, pd.DataFrame):
+        return OperationsTable.from_frame(transactions)
+    key: tuple
+    if isinstance(transactions, TransactionStore):
+        key = ("store", transactions.data_key, len(transactions), tuple(sorted(transactions.month_versions.items())))
+    elif isinstance(transactions, SqliteStore):
+        key = ("sqlite", transactions.db_path, transactions.version, transactions.period_bounds, len(transactions))
+    else:
+        return OperationsTable.from_records(transactions)
+    with _tables_lock:
+        if key in _tables:
+            _tables.move_to_end(key)
+            return _tables[key]
+    if isinstance(transactions, TransactionStore):
+        table = OperationsTable(transactions.frame, transactions.dates, transactions.date_index)
+    else:
+        table = OperationsTable.from_frame(transactions.columns_frame(ENGINE_COLUMNS))
+    with _tables_lock:
+        _tables[key] = table
+        _tables.move_to_end(key)
+        while len(_tables) > MAX_TABLES:
+            _tables.popitem(last=False)
+    return table
+
+
+def aggregate_operations(
+    transactions: Iterable | pd.DataFrame | TransactionStore | SqliteStore,
+    group_by: Iterable[str] = (),
+    **filters: Any,
+) -> list:
+    """Функция считает агрегаты операций (число, сумма платежей, расходы, кешбэк) в разрезе
+    ключей group_by (card, category, mcc, status, month, day) по операциям, отобранным
+    фильтрами start, stop, cards, categories, mccs, statuses (см. OperationsTable.select)"""
+    group_by = list(group_by)
+    engine_logger.info(f"расчет агрегатов операций в разрезе {', '.join(group_by) or 'итогов'}")
+    result = get_operations_table(transactions).aggregate(group_by, **filters)
+    engine_logger.info(f"агрегаты операций рассчитаны: групп {len(result)}")
+    return result
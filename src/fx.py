@@ -0,0 +1,209 @@
+import itertools
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.market import MarketDataClient, is_valid_quote
+from src.store import TransactionStore, parse_operation_dates
+
+fx_logger = logging.getLogger("services_logger")
+
+DEFAULT_RATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "fx_rates.csv")
+RATE_COLUMNS = ["date", "currency", "base", "rate"]
+# колонки с суммами в валюте платежа, пересчитываемые в основную валюту
+CONVERTED_COLUMNS = ["Сумма платежа", "Кэшбэк"]
+MAX_NORMALIZED_STORES = 4
+
+_table_versions = itertools.count(1)
+
+
+class RateTable:
+    """Таблица исторических курсов валют к базовой валюте (курс - цена единицы валюты в базовой).
+    Курсы каждой валюты хранятся отсортированными массивами дней и значений; курс на дату -
+    последний известный курс не позже этой даты (as-of), поиск бинарный. Курсы на один день
+    запрашиваются один раз: повторяющиеся дни операций схлопываются перед поиском,
+    одиночные запросы rate кэшируются"""
+
+    def __init__(self, base: str) -> None:
+        self.base = base
+        self._series: dict = {}
+        self._memo: dict[tuple, float] = {}
+        # версия меняется при каждом изменении курсов - ключ для кэшей пересчитанных данных
+        self.version = next(_table_versions)
+
+    def __len__(self) -> int:
+        return sum(len(days) for days, _ in self._series.values())
+
+    @property
+    def currencies(self) -> list:
+        return sorted(self._series)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, base: str) -> "RateTable":
+        """Метод создает таблицу из DataFrame с колонками date, currency, base, rate.
+        Используются курсы к base и обратные им курсы base к другим валютам"""
+        table = cls(base)
+        direct = frame[frame["base"] == base]
+        inverse = frame[(frame["currency"] == base) & (frame["base"] != base)]
+        for currency, rows in direct.groupby("currency"):
+            table.update(str(currency), rows["date"], rows["rate"])
+        for currency, rows in inverse.groupby("base"):
+            if str(currency) not in table._series:
+                table.update(str(currency), rows["date"], 1 / rows["rate"].astype(float))
+        return table
+
+    @classmethod
+    def from_file(cls, base: str, file_path: Optional[str] = None) -> "RateTable":
+        """Метод читает таблицу курсов из CSV-файла (колонки date, currency, base, rate).
+        Если файла нет, возвращается пустая таблица"""
+        file_path = file_path or DEFAULT_RATES_PATH
+        if not os.path.exists(file_path):
+            fx_logger.warning(f"файл курсов валют {file_path} не найден")
+            return cls(base)
+        return cls.from_frame(pd.read_csv(file_path, dtype={"currency": str, "base": str}), base)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Метод возвращает курсы в виде DataFrame с колонками date, currency, base, rate"""
+        frames = [
+            pd.DataFrame({"date": days.astype(str), "currency": currency, "base": self.base, "rate": rates})
+            for currency, (days, rates) in sorted(self._series.items())
+        ]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RATE_COLUMNS)
+
+    def save(self, file_path: Optional[str] = None) -> None:
+        """Метод атомарно сохраняет курсы в CSV-файл (через временный файл и переименование)"""
+        file_path = file_path or DEFAULT_RATES_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        self.to_frame().to_csv(tmp_path, index=False)
+        os.replace(tmp_path, file_path)
+
+    def update(self, currency: str, dates: object, rates: object) -> None:
+        """Метод добавляет курсы валюты на даты; курсы на уже известные даты заменяются"""
+        days = pd.to_datetime(pd.Series(dates, dtype=object)).to_numpy().astype("datetime64[D]")
+        values = np.broadcast_to(np.asarray(rates, dtype=np.float64), days.shape).copy()
+        if currency in self._series:
+            old_days, old_rates = self._series[currency]
+            days, values = np.concatenate([days, old_days]), np.concatenate([values, old_rates])
+        valid = ~np.isnat(days) & np.isfinite(values) & (values > 0)
+        # при повторе дня остается первое значение - новое
+        unique_days, first = np.unique(days[valid], return_index=True)
+        self._series[currency] = (unique_days, values[valid][first])
+        self._memo.clear()
+        self.version = next(_table_versions)
+
+    def rates_at(self, currency: str, days: np.ndarray) -> np.ndarray:
+        """Метод возвращает курсы валюты на дни days (as-of): последний курс не позже дня.
+        Для базовой валюты курс 1; для дней раньше первого курса, NaT и неизвестной валюты - NaN"""
+        days = np.asarray(days, dtype="datetime64[D]")
+        if currency == self.base:
+            return np.where(np.isnat(days), np.nan, 1.0)
+        if currency not in self._series:
+            return np.full(len(days), np.nan)
+        known_days, rates = self._series[currency]
+        positions = np.searchsorted(known_days, days, side="right") - 1
+        result = rates[np.maximum(positions, 0)] if len(rates) else np.full(len(days), np.nan)
+        return np.where((positions < 0) | np.isnat(days), np.nan, result)
+
+    def rate(self, currency: str, moment: date | datetime | str) -> float:
+        """Метод возвращает курс валюты на дату (as-of); результаты запросов кэшируются"""
+        day = np.datetime64(pd.Timestamp(moment).date(), "D")
+        key = (currency, day)
+        if key not in self._memo:
+            self._memo[key] = float(self.rates_at(currency, np.array([day]))[0])
+        return self._memo[key]
+
+    def backfill(self, client: MarketDataClient, currencies: list, start_date: str, end_date: str) -> dict:
+        """Метод загружает дневные курсы валют к базовой за период (даты - ГГГГ-ММ-ДД) одним
+        пакетом запросов time_series клиента twelvedata (курс дня - цена закрытия).
+        Возвращает число загруженных курсов по валютам"""
+        currencies = [currency for currency in dict.fromkeys(currencies) if currency != self.base]
+        data = client.time_series([f"{currency}/{self.base}" for currency in currencies], start_date, end_date)
+        loaded = {}
+        for currency in currencies:
+            series = data.get(f"{currency}/{self.base}")
+            if series is None or not is_valid_quote(series) or not series.get("values"):
+                fx_logger.warning(f"нет исторических курсов {currency}/{self.base}: {series}")
+                loaded[currency] = 0
+                continue
+            values = series["values"]
+            self.update(currency, [item["datetime"] for item in values], [item["close"] for item in values])
+            loaded[currency] = len(values)
+        fx_logger.info(f"загружены исторические курсы к {self.base}: {loaded}")
+        return loaded
+
+
+def convert_amounts(amounts: np.ndarray, currencies: object, dates: np.ndarray, table: RateTable) -> np.ndarray:
+    """Функция пересчитывает суммы в базовую валюту таблицы курсов по курсу на дату каждой операции.
+    Поиск курса выполняется один раз на пару (валюта, день): строки группируются по валюте,
+    дни внутри валюты схлопываются. Суммы без валюты, даты или курса становятся NaN"""
+    amounts = np.asarray(amounts, dtype=np.float64)
+    codes, uniques = pd.factorize(pd.Series(currencies, dtype=object))
+    days = np.asarray(dates).astype("datetime64[D]")
+    converted = np.full(len(amounts), np.nan)
+    for code, currency in enumerate(uniques):
+        positions = np.flatnonzero(codes == code)
+        unique_days, inverse = np.unique(days[positions], return_inverse=True)
+        converted[positions] = amounts[positions] * table.rates_at(str(currency), unique_days)[inverse]
+    missing = int((np.isnan(converted) & ~np.isnan(amounts)).sum())
+    if missing:
+        fx_logger.warning(f"нет курса к {table.base} для операций: {missing}")
+    return converted
+
+
+def normalize_frame(data_frame: pd.DataFrame, table: RateTable, dates: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Функция возвращает копию таблицы операций, в которой суммы в валюте платежа (сумма платежа
+    и кэшбэк) пересчитаны в базовую валюту таблицы курсов по курсу на дату операции,
+    а валюта платежа заменена базовой. Сумма и валюта операции не меняются"""
+    frame = data_frame.copy()
+    if "Валюта платежа" not in frame.columns:
+        return frame
+    if dates is None:
+        dates = parse_operation_dates(frame["Дата операции"])
+    for column in CONVERTED_COLUMNS:
+        if column in frame.columns:
+            amounts = pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=np.float64)
+            frame[column] = convert_amounts(amounts, frame["Валюта платежа"].astype(object), dates, table).round(2)
+    frame["Валюта платежа"] = table.base
+    return frame
+
+
+_normalized_stores: OrderedDict[tuple, TransactionStore] = OrderedDict()
+_normalized_stores_lock = threading.Lock()
+
+
+def normalize_store(store: TransactionStore, table: RateTable) -> TransactionStore:
+    """Функция возвращает хранилище с суммами, пересчитанными в базовую валюту таблицы курсов
+    (см. normalize_frame). Результат кэшируется до изменения хранилища или таблицы курсов"""
+    key = (store.data_key, len(store), tuple(sorted(store.month_versions.items())), table.base, table.version)
+    with _normalized_stores_lock:
+        if key in _normalized_stores:
+            _normalized_stores.move_to_end(key)
+            return _normalized_stores[key]
+    normalized = TransactionStore(normalize_frame(store.frame, table, store.dates))
+    with _normalized_stores_lock:
+        _normalized_stores[key] = normalized
+        _normalized_stores.move_to_end(key)
+        while len(_normalized_stores) > MAX_NORMALIZED_STORES:
+            _normalized_stores.popitem(last=False)
+    fx_logger.info(f"суммы операций пересчитаны в {table.base}: {len(store)}")
+    return normalized
+
+
+def normalize_transactions(
+    transactions: list | pd.DataFrame | TransactionStore, table: RateTable
+) -> list | pd.DataFrame | TransactionStore:
+    """Функция пересчитывает суммы транзакций в базовую валюту таблицы курсов и возвращает
+    данные того же вида: список словарей, DataFrame или хранилище"""
+    if isinstance(transactions, TransactionStore):
+        return normalize_store(transactions, table)
+    if isinstance(transactions, pd.DataFrame):
+        return normalize_frame(transactions, table)
+    frame = normalize_frame(pd.DataFrame(transactions), table)
+    return frame.to_dict(orient="records")
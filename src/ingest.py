@@ -0,0 +1,152 @@
+import logging
+from collections import Counter
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.cache import read_operations_frame, source_version
+from src.sqlite_store import SqliteStore, sqlite_path_for
+from src.store import DEFAULT_FILE_PATH, TransactionStore, parse_operation_dates
+from src.streaming import DEFAULT_BATCH_SIZE, iter_operation_batches
+
+ingest_logger = logging.getLogger("services_logger")
+
+
+def row_key(transaction: dict, columns: Iterable[str]) -> tuple:
+    """Функция возвращает ключ строки - значения колонок columns (пропуски - None).
+    Одинаковые операции дают одинаковый ключ независимо от того, прочитаны они из файла
+    или из хранилища"""
+    values = (transaction.get(column) for column in columns)
+    return tuple(None if value is None or value != value else value for value in values)
+
+
+def new_row_positions(store: TransactionStore | SqliteStore, frame: pd.DataFrame, complete: bool = True) -> np.ndarray:
+    """Функция возвращает номера строк frame, которых еще нет в хранилище. Выгрузки банка
+    только дополняются, поэтому новыми считаются строки с датой операции позже наибольшей
+    даты хранилища (high-water mark). Строки с этой датой и строки без даты сравниваются
+    с хранилищем по ключу строки с учетом повторов.
+    Для полной выгрузки (complete=True) число уже известных строк должно совпасть с размером
+    хранилища, для начала выгрузки - в ней должны найтись все строки хранилища с наибольшей датой;
+    иначе файл не продолжает загруженные данные - ValueError"""
+    if "Дата операции" in frame.columns:
+        dates = parse_operation_dates(frame["Дата операции"])
+    else:
+        dates = np.full(len(frame), np.datetime64("NaT"), dtype="datetime64[ns]")
+    high_water_mark = store.high_water_mark()
+    undated = np.isnat(dates)
+    boundaries: list[tuple[Optional[np.datetime64], np.ndarray]]
+    if high_water_mark is None:
+        is_new = ~undated
+        boundaries = [(None, undated)]
+    else:
+        is_new = dates > high_water_mark
+        boundaries = [(high_water_mark, dates == high_water_mark), (None, undated)]
+    columns = [str(column) for column in frame.columns]
+    for moment, mask in boundaries:
+        positions = np.flatnonzero(mask)
+        # для начала выгрузки строки с наибольшей датой проверяются и при отсутствии их в файле
+        if not len(positions) and (complete or moment is None):
+            continue
+        seen = Counter(row_key(transaction, columns) for transaction in store.records_at(moment))
+        for position, transaction in zip(positions, frame.iloc[positions].to_dict(orient="records")):
+            key = row_key(transaction, columns)
+            if seen[key] > 0:
+                seen[key] -= 1
+            else:
+                is_new[position] = True
+        if not complete and moment is not None and any(seen.values()):
+            raise ValueError(f"файл не продолжает загруженные данные: нет операций от {moment}")
+    known = len(frame) - int(is_new.sum())
+    if complete and known != len(store):
+        raise ValueError(f"файл не продолжает загруженные данные: известных строк {known}, в хранилище {len(store)}")
+    return np.flatnonzero(is_new)
+
+
+def read_export_head(
+    file_path: str, high_water_mark: np.datetime64, batch_size: int = DEFAULT_BATCH_SIZE
+) -> pd.DataFrame:
+    """Функция потоково читает начало выгрузки - строки до первой операции раньше high_water_mark.
+    Выгрузка банка отсортирована по убыванию даты, поэтому остальная часть файла уже есть
+    в хранилище и не читается: время чтения зависит от числа новых строк, а не от всей истории"""
+    batches = []
+    for batch in iter_operation_batches(file_path, batch_size):
+        older = np.flatnonzero(parse_operation_dates(batch["Дата операции"]) < high_water_mark)
+        if len(older):
+            batches.append(batch.iloc[: older[0]])
+            break
+        batches.append(batch)
+    return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+
+
+def ingest_frame(store: TransactionStore | SqliteStore, frame: pd.DataFrame, complete: bool = True) -> dict:
+    """Функция добавляет в хранилище только новые строки выгрузки (см. new_row_positions).
+    Производные данные хранилища (индексы, агрегаты) дополняются по новым строкам.
+    Возвращает число прочитанных и добавленных строк"""
+    positions = new_row_positions(store, frame, complete)
+    if len(positions):
+        store.append(frame.iloc[positions])
+    ingest_logger.info(f"загрузка выгрузки: прочитано строк {len(frame)}, новых {len(positions)}")
+    return {"rows_read": len(frame), "rows_added": len(positions)}
+
+
+def ingest_file(
+    store: TransactionStore | SqliteStore,
+    file_path: Optional[str] = None,
+    use_cache: bool = True,
+    newest_first: bool = True,
+) -> dict:
+    """Функция дополняет хранилище новыми строками файла с операциями и запоминает версию файла.
+    Выгрузка, отсортированная по убыванию даты (newest_first=True, как у банка), читается
+    потоково только до уже загруженных операций; иначе файл читается целиком.
+    Если файл не продолжает загруженные данные, хранилище не изменяется и вызывается ValueError"""
+    file_path = file_path or DEFAULT_FILE_PATH
+    version = source_version(file_path)
+    high_water_mark = store.high_water_mark()
+    if newest_first and high_water_mark is not None:
+        stats = ingest_frame(store, read_export_head(file_path, high_water_mark), complete=False)
+    else:
+        stats = ingest_frame(store, read_operations_frame(file_path, use_cache=use_cache))
+    if isinstance(store, SqliteStore):
+        store.mark_version(version)
+    else:
+        store.version = version
+    return stats
+
+
+def refresh_store(
+    store: TransactionStore | SqliteStore, file_path: Optional[str] = None
+) -> TransactionStore | SqliteStore:
+    """Функция возвращает хранилище, соответствующее текущей версии файла с операциями.
+    Неизменившийся файл не читается; дополненный файл добавляет в хранилище только новые строки;
+    файл, не продолжающий загруженные данные, загружается заново целиком"""
+    file_path = file_path or DEFAULT_FILE_PATH
+    if store.version == source_version(file_path):
+        return store
+    try:
+        ingest_file(store, file_path)
+        return store
+    except ValueError as e:
+        ingest_logger.warning(f"{e}; файл загружается заново")
+        return type(store).from_file(file_path)
+
+
+def ingest_sqlite(file_path: Optional[str] = None) -> dict:
+    """Функция дополняет базу SQLite файла с операциями новыми строками файла.
+    Если базы нет (или файл не продолжает ее данные), файл импортируется целиком"""
+    file_path = file_path or DEFAULT_FILE_PATH
+    db_path = sqlite_path_for(file_path)
+    if SqliteStore.stored_version(db_path) is None:
+        store = SqliteStore.from_file(file_path, db_path)
+        return {"rows_read": len(store), "rows_added": len(store)}
+    store = SqliteStore(db_path)
+    try:
+        if store.version == source_version(file_path):
+            return {"rows_read": 0, "rows_added": 0}
+        return ingest_file(store, file_path)
+    except ValueError as e:
+        ingest_logger.warning(f"{e}; файл импортируется заново")
+        rows = len(SqliteStore.from_file(file_path, db_path))
+        return {"rows_read": rows, "rows_added": rows}
+    finally:
+        store.close()
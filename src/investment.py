@@ -0,0 +1,206 @@
+import itertools
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import counted_mask, to_kopecks
+from src.sqlite_store import SqliteStore
+from src.store import TransactionStore, parse_operation_dates
+
+investment_logger = logging.getLogger("services_logger")
+
+SIMULATOR_COLUMNS = ["Дата операции", "Номер карты", "Сумма платежа", "Статус"]
+MAX_SIMULATORS = 4
+
+
+def _bounds(start: object = None, stop: object = None) -> tuple[np.datetime64, np.datetime64]:
+    """Функция переводит границы периода [start, stop) в datetime64[ns]; строки разбираются
+    в формате ДД.ММ.ГГГГ, пропущенная граница - без ограничения"""
+    low, high = np.datetime64("1678-01-01", "ns"), np.datetime64("2262-01-01", "ns")
+    values = []
+    for value, default in ((start, low), (stop, high)):
+        if value is None or value == "":
+            values.append(default)
+            continue
+        moment = pd.to_datetime(value, dayfirst=True) if isinstance(value, str) else pd.Timestamp(value)
+        if pd.isna(moment):
+            raise ValueError(f"неверный формат даты: {value}")
+        values.append(moment.to_datetime64().astype("datetime64[ns]"))
+    return values[0], values[1]
+
+
+def _step_kopecks(step: float) -> int:
+    """Функция переводит шаг округления в рублях в целые копейки"""
+    kopecks = int(round(float(step) * 100))
+    if kopecks <= 0:
+        raise ValueError(f"шаг округления должен быть положительным: {step}")
+    return kopecks
+
+
+class RoundUpSimulator:
+    """Модель инвесткопилки: каждая покупка округляется вверх до кратного шагу, разница
+    откладывается. Учитываются успешные списания (сумма платежа меньше нуля, статус не FAILED).
+    Суммы списаний хранятся в копейках (int64) в порядке дат, поэтому отложенная сумма
+    по шагу - один векторный проход (остаток от деления), период - срез по бинарному поиску.
+    Префиксные суммы по шагу строятся один раз, после чего перебор шагов и периодов
+    (sweep) не проходит по операциям повторно"""
+
+    def __init__(
+        self, dates: np.ndarray, cards: Iterable, amounts: np.ndarray, statuses: Optional[Iterable] = None
+    ) -> None:
+        amounts = np.asarray(amounts, dtype=np.float64)
+        eligible = (amounts < 0) & ~np.isnat(dates)
+        if statuses is not None:
+            eligible &= counted_mask(statuses)
+        positions = np.flatnonzero(eligible)
+        order = positions[np.argsort(dates[positions], kind="stable")]
+        self.dates = dates[order]
+        self.spent = to_kopecks(-amounts[order])
+        card_numbers = pd.Series(cards, dtype=object).iloc[order].fillna("----").astype(str)
+        self.card_codes, self.cards = pd.factorize(card_numbers, sort=True)
+        self.months = self.dates.astype("datetime64[M]").astype(np.int64)
+        self._prefix: dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.spent)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, dates: Optional[np.ndarray] = None) -> "RoundUpSimulator":
+        """Метод создает модель по таблице операций (даты можно передать уже разобранными)"""
+        if dates is None:
+            dates = parse_operation_dates(frame["Дата операции"]) if "Дата операции" in frame.columns else None
+        if dates is None:
+            dates = np.full(len(frame), np.datetime64("NaT"), dtype="datetime64[ns]")
+        missing = pd.Series(np.nan, index=frame.index)
+        amounts = pd.to_numeric(frame.get("Сумма платежа", missing), errors="coerce").to_numpy(dtype=np.float64)
+        statuses = frame["Статус"].astype(object) if "Статус" in frame.columns else None
+        return cls(dates, frame.get("Номер карты", missing).astype(object), amounts, statuses)
+
+    def _slice(self, start: object = None, stop: object = None) -> slice:
+        """Метод возвращает срез операций периода [start, stop)"""
+        low, high = _bounds(start, stop)
+        first = int(np.searchsorted(self.dates, low, side="left"))
+        return slice(first, max(first, int(np.searchsorted(self.dates, high, side="left"))))
+
+    def prefix(self, step: float) -> np.ndarray:
+        """Метод возвращает префиксные суммы отложенных копеек по шагу (длина - операций + 1)"""
+        step_kopecks = _step_kopecks(step)
+        if step_kopecks not in self._prefix:
+            prefix = np.zeros(len(self.spent) + 1, dtype=np.int64)
+            np.cumsum(np.mod(-self.spent, step_kopecks), out=prefix[1:])
+            self._prefix[step_kopecks] = prefix
+        return self._prefix[step_kopecks]
+
+    def savings(self, step: float, start: object = None, stop: object = None) -> dict:
+        """Метод считает отложенную сумму за период [start, stop) при шаге округления step рублей:
+        итог, по месяцам и по картам"""
+        period = self._slice(start, stop)
+        saved = np.mod(-self.spent[period], _step_kopecks(step))
+        months = self.months[period]
+        first_month = int(months[0]) if len(months) else 0
+        month_saved = np.bincount(months - first_month, weights=saved)
+        month_counts = np.bincount(months - first_month)
+        card_saved = np.bincount(self.card_codes[period], weights=saved, minlength=len(self.cards))
+        card_counts = np.bincount(self.card_codes[period], minlength=len(self.cards))
+        return {
+            "step": step,
+            "saved": int(saved.sum()) / 100,
+            "operations": len(saved),
+            "months": [
+                {
+                    "month": str(np.datetime64(first_month + i, "M")),
+                    "saved": month_saved[i] / 100,
+                    "operations": int(n),
+                }
+                for i, n in enumerate(month_counts)
+                if n
+            ],
+            "cards": [
+                {"last_digits": card[1:], "saved": card_saved[i] / 100, "operations": int(card_counts[i])}
+                for i, card in enumerate(self.cards)
+                if card_counts[i]
+            ],
+        }
+
+    def sweep(self, steps: Iterable[float], periods: Optional[Iterable[tuple]] = None) -> list:
+        """Метод считает отложенные суммы для всех сочетаний шагов и периодов (start, stop)
+        (без periods - за всю историю). Для каждого шага нужен один проход по операциям,
+        каждый период - разность префиксных сумм"""
+        periods = list(periods or [(None, None)])
+        bounds = [_bounds(start, stop) for start, stop in periods]
+        lows = np.searchsorted(self.dates, np.array([low for low, _ in bounds], dtype="datetime64[ns]"), side="left")
+        highs = np.searchsorted(self.dates, np.array([high for _, high in bounds], dtype="datetime64[ns]"))
+        highs = np.maximum(lows, highs)
+        results = []
+        for step, (i, (start, stop)) in itertools.product(steps, enumerate(periods)):
+            prefix = self.prefix(step)
+            results.append(
+                {
+                    "step": step,
+                    "start": start,
+                    "stop": stop,
+                    "saved": int(prefix[highs[i]] - prefix[lows[i]]) / 100,
+                    "operations": int(highs[i] - lows[i]),
+                }
+            )
+        return results
+
+
+_simulators: OrderedDict[tuple, RoundUpSimulator] = OrderedDict()
+# кэш моделей используется потоками HTTP-сервера
+_simulators_lock = threading.Lock()
+
+
+def get_round_up_simulator(transactions: list | TransactionStore | SqliteStore) -> RoundUpSimulator:
+    """Функция возвращает модель инвесткопилки для транзакций. Для хранилищ модель кэшируется
+    до изменения данных, поэтому повторные запросы с другими шагами и периодами не читают
+    операции заново"""
+    key: tuple
+    if isinstance(transactions, TransactionStore):
+        key = ("store", transactions.data_key, len(transactions), tuple(sorted(transactions.month_versions.items())))
+    elif isinstance(transactions, SqliteStore):
+        key = ("sqlite", transactions.db_path, transactions.version, transactions.period_bounds, len(transactions))
+    else:
+        return RoundUpSimulator.from_frame(pd.DataFrame(transactions))
+    with _simulators_lock:
+        if key in _simulators:
+            _simulators.move_to_end(key)
+            return _simulators[key]
+    if isinstance(transactions, TransactionStore):
+        simulator = RoundUpSimulator.from_frame(transactions.frame, transactions.dates)
+    else:
+        simulator = RoundUpSimulator.from_frame(transactions.columns_frame(SIMULATOR_COLUMNS))
+    with _simulators_lock:
+        _simulators[key] = simulator
+        _simulators.move_to_end(key)
+        while len(_simulators) > MAX_SIMULATORS:
+            _simulators.popitem(last=False)
+    return simulator
+
+
+def investment_bank(
+    transactions: list | TransactionStore | SqliteStore, step: float = 50, start: object = None, stop: object = None
+) -> str:
+    """Функция возвращает JSON с суммой, которую отложила бы инвесткопилка за период [start, stop)
+    при округлении покупок вверх до кратного step рублей (10, 50, 100): итог, по месяцам и по картам.
+    Даты - строки ДД.ММ.ГГГГ или datetime; без дат - вся история"""
+    investment_logger.info(f"расчет инвесткопилки: шаг {step}, период {start} - {stop}")
+    result = get_round_up_simulator(transactions).savings(step, start, stop)
+    investment_logger.info("расчет инвесткопилки выполнен успешно")
+    return json.dumps(result, ensure_ascii=False)
+
+
+def investment_bank_sweep(
+    transactions: list | TransactionStore | SqliteStore, steps: Iterable[float], periods: Optional[list] = None
+) -> str:
+    """Функция возвращает JSON с суммами инвесткопилки для всех сочетаний шагов округления
+    и периодов [(start, stop), ...] (без periods - за всю историю)"""
+    investment_logger.info("расчет инвесткопилки для набора шагов и периодов")
+    result = get_round_up_simulator(transactions).sweep(steps, periods)
+    investment_logger.info(f"расчет инвесткопилки выполнен успешно: вариантов {len(result)}")
+    return json.dumps(result, ensure_ascii=False, default=str)
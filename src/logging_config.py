@@ -0,0 +1,47 @@
+import logging
+import os
+from typing import Optional
+
+LOGGER_NAME = "services_logger"
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "logs")
+LOG_FORMAT = "%(asctime)s %(filename)s %(levelname)s: %(message)s"
+
+
+class ModuleFileHandler(logging.Handler):
+    """Обработчик журнала, который пишет записи каждого модуля в свой файл <модуль>_logs.log
+    (views_logs.log, utils_logs.log, ...). Файл модуля открывается и очищается
+    при первой записи этого модуля, поэтому неиспользованные модули файлов не трогают"""
+
+    def __init__(self, log_dir: str) -> None:
+        super().__init__()
+        self.log_dir = log_dir
+        self.handlers: dict = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        handler = self.handlers.get(record.module)
+        if handler is None:
+            file_path = os.path.join(self.log_dir, f"{record.module}_logs.log")
+            handler = logging.FileHandler(file_path, mode="w", encoding="utf-8")
+            handler.setFormatter(self.formatter)
+            self.handlers[record.module] = handler
+        handler.emit(record)
+
+    def close(self) -> None:
+        for handler in self.handlers.values():
+            handler.close()
+        super().close()
+
+
+def configure_logging(log_dir: Optional[str] = None, level: int = logging.DEBUG) -> None:
+    """Функция настраивает журнал приложения: вызывается один раз в точке входа (main.py),
+    при импорте модулей журнал не настраивается и файлы не создаются.
+    Повторный вызов ничего не меняет"""
+    logger = logging.getLogger(LOGGER_NAME)
+    if any(isinstance(handler, ModuleFileHandler) for handler in logger.handlers):
+        return
+    log_dir = log_dir or LOG_DIR
+    os.makedirs(log_dir, exist_ok=True)
+    handler = ModuleFileHandler(log_dir)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(handler)
+    logger.setLevel(level)
@@ -0,0 +1,294 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+market_logger = logging.getLogger("services_logger")
+
+BASE_URL = "https://api.twelvedata.com"
+NO_DATA = "Данные отсутствуют"
+
+_env_loaded = False
+
+
+def get_api_key() -> Optional[str]:
+    """Функция возвращает ключ API twelvedata из переменной окружения API_KEY_STOCKS.
+    Файл .env читается при первом обращении, а не при импорте модуля"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _env_loaded = True
+    return os.getenv("API_KEY_STOCKS")
+
+
+class QuoteCache:
+    """Кэш ответов API по символам с ограниченным размером (вытеснение давно не использованных)
+    и временем жизни записей. Свежая запись (моложе ttl) отдается как есть, устаревшая
+    (моложе ttl + stale_ttl) - отдается сразу, но требует обновления в фоне.
+    Время жизни можно задать отдельно для символа через ttls. При указании path
+    кэш сохраняется на диск в JSON и читается при создании"""
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        stale_ttl: float = 3600.0,
+        max_size: int = 256,
+        ttls: Optional[dict] = None,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max(max_size, 1)
+        self.ttls: dict[str, float] = ttls or {}
+        self.path = path
+        self.clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, symbol: str) -> float:
+        """Метод возвращает время жизни записи для символа"""
+        return self.ttls.get(symbol, self.ttl)
+
+    def lookup(self, endpoint: str, symbol: str) -> tuple[Any, Optional[str]]:
+        """Метод возвращает значение и его состояние: "fresh", "stale" или None, если записи нет
+        или она устарела сверх stale_ttl"""
+        key = f"{endpoint}:{symbol}"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            value, fetched_at = entry
+            age = self.clock() - fetched_at
+            ttl = self.ttl_for(symbol)
+            if age > ttl + self.stale_ttl:
+                del self._entries[key]
+                return None, None
+            self._entries.move_to_end(key)
+            return value, "fresh" if age <= ttl else "stale"
+
+    def store(self, endpoint: str, symbol: str, value: Any) -> None:
+        """Метод сохраняет значение; при превышении размера вытесняется самая давняя запись"""
+        key = f"{endpoint}:{symbol}"
+        with self._lock:
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        """Метод атомарно сохраняет кэш в файл path (через временный файл и переименование)"""
+        if not self.path:
+            return
+        with self._lock:
+            entries = [[key, value, fetched_at] for key, (value, fetched_at) in self._entries.items()]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(entries, file, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> None:
+        """Метод читает кэш из файла path; поврежденный файл игнорируется"""
+        try:
+            with open(str(self.path), "r", encoding="utf-8") as file:
+                entries = json.load(file)
+            with self._lock:
+                for key, value, fetched_at in entries[-self.max_size :]:
+                    self._entries[key] = (value, float(fetched_at))
+        except (OSError, ValueError, TypeError) as e:
+            market_logger.warning(f"не удалось прочитать кэш котировок {self.path}: {e}")
+
+
+def is_valid_quote(data: Any) -> bool:
+    """Функция проверяет, что ответ API по символу содержит данные, а не ошибку"""
+    return isinstance(data, dict) and bool(data) and data.get("status") != "error"
+
+
+class MarketDataClient:
+    """Клиент API twelvedata для курсов валют и котировок акций.
+    Использует общий пул соединений, объединяет символы в пакетные запросы
+    (symbol=AAPL,MSFT) и отправляет пакеты параллельно в пуле потоков.
+    С кэшем QuoteCache свежие значения не запрашиваются повторно, а устаревшие
+    отдаются сразу и обновляются в фоне"""
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        api_key: Optional[str] = None,
+        batch_size: int = 8,
+        max_workers: int = 8,
+        timeout: float = 10.0,
+        cache: Optional[QuoteCache] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.batch_size = max(batch_size, 1)
+        self.max_workers = max(max_workers, 1)
+        self.timeout = timeout
+        # requests импортируется при создании клиента, а не при импорте модуля
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.cache = cache
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._refreshing: dict = {}
+        self._refresh_lock = threading.Lock()
+
+    def __enter__(self) -> "MarketDataClient":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Метод дожидается фоновых обновлений, закрывает пул потоков и соединения"""
+        self.wait_for_refresh()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.session.close()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Пул потоков клиента, создается при первом обращении"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="market")
+        return self._executor
+
+    def _fetch_batch(self, endpoint: str, symbols: list, extra_params: Optional[dict] = None) -> dict:
+        """Метод запрашивает данные по пакету символов и возвращает словарь {символ: ответ}.
+        Для одного символа API возвращает ответ без вложенности по символам"""
+        params = {"symbol": ",".join(symbols), "apikey": self.api_key or get_api_key(), **(extra_params or {})}
+        response = self.session.get(f"{self.base_url}/{endpoint}", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if len(symbols) == 1:
+            return {symbols[0]: data}
+        return {symbol: data.get(symbol) if isinstance(data.get(symbol), dict) else {} for symbol in symbols}
+
+    def _fetch_symbols(self, endpoint: str, symbols: list, parallel: bool = True) -> dict:
+        """Метод запрашивает символы у API пакетами по batch_size и сохраняет ответы в кэш"""
+        batches = [symbols[i : i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+        market_logger.info(f"запрос {endpoint}: символов {len(symbols)}, запросов {len(batches)}")
+        if len(batches) <= 1 or not parallel:
+            results = [self._fetch_batch(endpoint, batch) for batch in batches]
+        else:
+            results = list(self.executor.map(lambda batch: self._fetch_batch(endpoint, batch), batches))
+        merged: dict = {}
+        for result in results:
+            merged.update(result)
+        if self.cache is not None:
+            for symbol, data in merged.items():
+                if is_valid_quote(data):
+                    self.cache.store(endpoint, symbol, data)
+            self.cache.save()
+        return merged
+
+    def _refresh(self, endpoint: str, symbols: list) -> None:
+        """Метод запускает фоновое обновление устаревших записей кэша (без повторного запуска
+        для символов, обновление которых уже идет)"""
+        with self._refresh_lock:
+            symbols = [symbol for symbol in symbols if (endpoint, symbol) not in self._refreshing]
+            if not symbols:
+                return
+            # внутри пула пакеты запрашиваются последовательно, чтобы не ждать свободных потоков пула
+            future = self.executor.submit(self._fetch_symbols, endpoint, symbols, False)
+            for symbol in symbols:
+                self._refreshing[(endpoint, symbol)] = future
+
+        def done(finished: Future) -> None:
+            with self._refresh_lock:
+                for symbol in symbols:
+                    self._refreshing.pop((endpoint, symbol), None)
+            if finished.exception() is not None:
+                market_logger.error(f"ошибка фонового обновления {endpoint}: {finished.exception()}")
+
+        future.add_done_callback(done)
+
+    def wait_for_refresh(self, timeout: Optional[float] = None) -> None:
+        """Метод дожидается завершения фоновых обновлений кэша"""
+        with self._refresh_lock:
+            futures = set(self._refreshing.values())
+        wait(futures, timeout=timeout)
+
+    def fetch(self, endpoint: str, symbols: list) -> dict:
+        """Метод возвращает данные по всем символам: из кэша, если он есть, остальное -
+        пакетными запросами к API, пакеты - параллельно"""
+        unique_symbols = list(dict.fromkeys(symbols))
+        if self.cache is None:
+            return self._fetch_symbols(endpoint, unique_symbols)
+        merged: dict = {}
+        missing, stale = [], []
+        for symbol in unique_symbols:
+            value, state = self.cache.lookup(endpoint, symbol)
+            if state is None:
+                missing.append(symbol)
+                continue
+            merged[symbol] = value
+            if state == "stale":
+                stale.append(symbol)
+        if stale:
+            market_logger.info(f"устаревшие данные {endpoint} отданы из кэша, обновление в фоне: {len(stale)}")
+            self._refresh(endpoint, stale)
+        if missing:
+            merged.update(self._fetch_symbols(endpoint, missing))
+        return merged
+
+    def exchange_rates(self, currency_op: list, currency_main: str) -> list:
+        """Метод возвращает курсы валют к валюте счета в формате get_exchange_rate"""
+        data = self.fetch("exchange_rate", [f"{item}/{currency_main}" for item in currency_op])
+        return [
+            {"currency": item, "rate": data.get(f"{item}/{currency_main}", {}).get("rate", NO_DATA)}
+            for item in currency_op
+        ]
+
+    def time_series(self, symbols: list, start_date: str, end_date: str, interval: str = "1day") -> dict:
+        """Метод возвращает исторические значения символов за период (даты - ГГГГ-ММ-ДД) в виде
+        {символ: ответ API time_series}. Пакеты запрашиваются параллельно, кэш не используется:
+        исторические данные сохраняются вызывающим кодом (см. src.fx.RateTable.backfill)"""
+        params = {"interval": interval, "start_date": start_date, "end_date": end_date, "outputsize": 5000}
+        unique_symbols = list(dict.fromkeys(symbols))
+        batches = [unique_symbols[i : i + self.batch_size] for i in range(0, len(unique_symbols), self.batch_size)]
+        market_logger.info(f"запрос time_series: символов {len(unique_symbols)}, запросов {len(batches)}")
+        merged: dict = {}
+        for result in self.executor.map(lambda batch: self._fetch_batch("time_series", batch, params), batches):
+            merged.update(result)
+        return merged
+
+    def stock_prices(self, stocks: list) -> list:
+        """Метод возвращает котировки акций в формате get_stocks_rates"""
+        data = self.fetch("price", stocks)
+        stocks_rates = []
+        for item in stocks:
+            price = data.get(item, {}).get("price", NO_DATA)
+            if price != NO_DATA:
+                price = str(round(float(price), 2))
+            stocks_rates.append({"stock": item, "price": price})
+        return stocks_rates
+
+
+_default_client: Optional[MarketDataClient] = None
+
+
+def get_market_client() -> MarketDataClient:
+    """Функция возвращает общий для процесса клиент API twelvedata с кэшем котировок в памяти"""
+    global _default_client
+    if _default_client is None:
+        _default_client = MarketDataClient(cache=QuoteCache())
+    return _default_client
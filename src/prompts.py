@@ -0,0 +1,27 @@
+import logging
+from datetime import datetime
+
+# модуль не импортирует pandas и другие тяжелые зависимости: первый запрос ввода
+# выводится сразу, пока данные загружаются в фоне (см. main.py)
+prompts_logger = logging.getLogger("services_logger")
+
+
+def parse_act_datetime(act_date: str) -> datetime:
+    """Функция разбирает строку с датой и временем в формате ДД.ММ.ГГГГ ЧЧ:ММ:СС
+    (для приветствия используется только час). При неверном формате вызывает ValueError"""
+    date = datetime.strptime(act_date[:10], "%d.%m.%Y")
+    return date.replace(hour=int(act_date[11:13]))
+
+
+def prompt_act_datetime() -> datetime:
+    """Функция запрашивает у пользователя дату и время для Главной страницы,
+    пока не будет введена строка в формате ДД.ММ.ГГГГ ЧЧ:ММ:СС"""
+    prompts_logger.info("запрос даты и времени для обработки")
+    while True:
+        prompts_logger.info("запрос даты для анализа данных")
+        act_date = input("Введите дату и время в формате ДД.ММ.ГГГГ ЧЧ:ММ:СС: ")
+        try:
+            return parse_act_datetime(act_date)
+        except ValueError:
+            prompts_logger.error("ошибка: получены некорректные данные")
+            print("Формат данных не соответствует запросу!")
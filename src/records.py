@@ -0,0 +1,169 @@
+import sys
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator, Optional, cast
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import to_kopecks
+
+# колонка выгрузки -> имя атрибута компактной записи
+FIELDS = {
+    "Дата операции": "date",
+    "Дата платежа": "payment_date",
+    "Номер карты": "card",
+    "Статус": "status",
+    "Сумма операции": "operation_amount",
+    "Валюта операции": "operation_currency",
+    "Сумма платежа": "amount",
+    "Валюта платежа": "currency",
+    "Кэшбэк": "cashback",
+    "Категория": "category",
+    "MCC": "mcc",
+    "Описание": "description",
+    "Бонусы (включая кэшбэк)": "bonuses",
+    "Округление на инвесткопилку": "rounding",
+    "Сумма операции с округлением": "rounded_amount",
+}
+# повторяющиеся строковые значения хранятся в единственном экземпляре
+INTERNED_COLUMNS = {"Дата платежа", "Номер карты", "Статус", "Валюта операции", "Валюта платежа", "Категория"}
+KOPECK_COLUMNS = ["Сумма операции", "Сумма платежа", "Кэшбэк", "Сумма операции с округлением"]
+
+
+class Transaction(Mapping):
+    """Компактная запись о транзакции: значения хранятся в слотах (__slots__), а не в словаре.
+    Ведет себя как словарь make_transactions только для чтения (transaction["Сумма платежа"],
+    transaction.get("Кэшбэк")), поэтому список таких записей можно передавать в функции
+    src.utils и src.services вместо списка словарей. Колонки вне FIELDS хранятся в extra"""
+
+    __slots__ = tuple(FIELDS.values()) + ("extra",)
+
+    def __init__(self, values: Optional[Mapping] = None, **kwargs: Any) -> None:
+        self.extra: Optional[dict] = None
+        for column, value in {**(values or {}), **kwargs}.items():
+            field = FIELDS.get(column)
+            if field is None:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[column] = value
+                continue
+            if column in INTERNED_COLUMNS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, field, value)
+
+    def __getitem__(self, column: str) -> Any:
+        field = FIELDS.get(column)
+        if field is None:
+            if self.extra is not None and column in self.extra:
+                return self.extra[column]
+            raise KeyError(column)
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(column) from None
+
+    def __iter__(self) -> Iterator[str]:
+        for column, field in FIELDS.items():
+            if hasattr(self, field):
+                yield column
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Transaction({self.to_dict()!r})"
+
+    def to_dict(self) -> dict:
+        """Метод возвращает транзакцию в виде обычного словаря (формат make_transactions)"""
+        return dict(self.items())
+
+
+def to_serializable(value: Any) -> Any:
+    """Функция для аргумента default у json.dumps: компактные записи сохраняются как словари"""
+    if isinstance(value, Transaction):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def compact_transactions(transactions: Iterable[Mapping] | pd.DataFrame) -> list:
+    """Функция преобразует список словарей (или DataFrame) в список компактных записей"""
+    if isinstance(transactions, pd.DataFrame):
+        columns = list(transactions.columns)
+        return [Transaction(dict(zip(columns, row))) for row in transactions.itertuples(index=False, name=None)]
+    return [Transaction(transaction) for transaction in transactions]
+
+
+class TransactionArrays:
+    """Представление транзакций «структура массивов»: по одному массиву numpy на колонку.
+    Строковые колонки хранятся кодами int32 и словарем уникальных значений,
+    суммы - целыми копейками int64 с маской пропусков, остальные колонки - как есть.
+    Из массивов восстанавливаются исходные записи (records, transaction)"""
+
+    def __init__(self, data_frame: pd.DataFrame) -> None:
+        self.size = len(data_frame)
+        self.columns = list(data_frame.columns)
+        self.codes: dict[str, np.ndarray] = {}
+        self.uniques: dict[str, np.ndarray] = {}
+        self.kopecks: dict[str, np.ndarray] = {}
+        self.missing: dict[str, np.ndarray] = {}
+        self.raw: dict[str, np.ndarray] = {}
+        for column in self.columns:
+            values = data_frame[column]
+            if column in KOPECK_COLUMNS and values.dtype.kind in "iuf":
+                self.kopecks[column] = to_kopecks(values.to_numpy())
+                self.missing[column] = values.isna().to_numpy()
+            elif values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype):
+                codes, uniques = pd.factorize(values)
+                self.codes[column] = codes.astype(np.int32)
+                self.uniques[column] = np.asarray(uniques, dtype=object)
+            else:
+                self.raw[column] = values.to_numpy()
+
+    @classmethod
+    def from_records(cls, transactions: list) -> "TransactionArrays":
+        """Метод строит массивы из списка словарей (формат make_transactions)"""
+        return cls(pd.DataFrame(transactions))
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        """Объем памяти массивов в байтах (включая словари уникальных строк)"""
+        parts = (self.codes, self.kopecks, self.missing, self.raw)
+        total = sum(array.nbytes for part in parts for array in part.values())
+        for uniques in self.uniques.values():
+            total += uniques.nbytes + sum(sys.getsizeof(value) for value in uniques)
+        return total
+
+    def column(self, column: str) -> np.ndarray:
+        """Метод восстанавливает колонку в исходном виде: строки, суммы в рублях, NaN для пропусков"""
+        if column in self.codes:
+            values = np.append(self.uniques[column], np.nan)
+            return cast(np.ndarray, values[self.codes[column]])
+        if column in self.kopecks:
+            values = self.kopecks[column] / 100
+            values[self.missing[column]] = np.nan
+            return values
+        return self.raw[column]
+
+    def records(self) -> list:
+        """Метод возвращает транзакции в виде списка словарей, как make_transactions"""
+        frame = pd.DataFrame({column: self.column(column) for column in self.columns})
+        return cast(list, frame.to_dict(orient="records"))
+
+    def transaction(self, position: int) -> Transaction:
+        """Метод возвращает одну транзакцию в виде компактной записи"""
+        values = {}
+        for column in self.columns:
+            if column in self.codes:
+                code = self.codes[column][position]
+                values[column] = self.uniques[column][code] if code >= 0 else np.nan
+            elif column in self.kopecks:
+                missing = self.missing[column][position]
+                values[column] = np.nan if missing else int(self.kopecks[column][position]) / 100
+            else:
+                values[column] = self.raw[column][position].item()
+        return Transaction(values)
@@ -0,0 +1,129 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+from typing import Iterator, Optional
+
+import pandas as pd
+
+writer_logger = logging.getLogger("services_logger")
+
+CHUNK_ROWS = 5000
+
+
+def _file_mode() -> int:
+    """Функция возвращает права нового файла с учетом umask процесса (как у open(..., "w")):
+    tempfile.mkstemp создает файл с правами 0600"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# права файлов отчетов; umask читается один раз при импорте, os.umask меняет его для всего процесса
+REPORT_FILE_MODE = _file_mode()
+
+
+def report_format(file_path: str) -> str:
+    """Функция определяет формат отчета по расширению файла: .jsonl - JSON Lines, иначе - JSON-массив"""
+    return "jsonl" if file_path.lower().endswith(".jsonl") else "json"
+
+
+def iter_report_rows(data_frame: pd.DataFrame, chunk_rows: int = CHUNK_ROWS) -> Iterator[dict]:
+    """Функция возвращает строки DataFrame словарями, преобразуя по chunk_rows строк за раз,
+    чтобы не строить список словарей для всего отчета"""
+    for start in range(0, len(data_frame), chunk_rows):
+        yield from data_frame.iloc[start : start + chunk_rows].to_dict(orient="records")
+
+
+def write_report(data_frame: pd.DataFrame, file_path: str, fmt: Optional[str] = None) -> None:
+    """Функция потоково записывает отчет в файл: JSON-массив с отступом 4 (как json.dump(..., indent=4))
+    или JSON Lines. Запись идет во временный файл той же папки, который затем атомарно
+    переименовывается, поэтому читатели не видят недописанный отчет. При ошибке файл не изменяется"""
+    fmt = fmt or report_format(file_path)
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, tmp_path = tempfile.mkstemp(dir=directory, prefix=".report-", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            if fmt == "jsonl":
+                for row in iter_report_rows(data_frame):
+                    file.write(json.dumps(row, ensure_ascii=False))
+                    file.write("\n")
+            else:
+                separator = "[\n"
+                for row in iter_report_rows(data_frame):
+                    file.write(separator)
+                    file.write("    " + json.dumps(row, ensure_ascii=False, indent=4).replace("\n", "\n    "))
+                    separator = ",\n"
+                file.write("[]" if separator == "[\n" else "\n]")
+        os.chmod(tmp_path, REPORT_FILE_MODE)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ReportWriter:
+    """Фоновая запись отчетов: задания попадают в ограниченную очередь и записываются
+    отдельным потоком, поэтому вызывающий код не ждет диска. Если очередь заполнена,
+    submit ждет освобождения места. Ошибки записи логируются и сохраняются в errors"""
+
+    def __init__(self, max_queue: int = 16) -> None:
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.errors: list = []
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _run(self) -> None:
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                data_frame, file_path, fmt = job
+                try:
+                    write_report(data_frame, file_path, fmt)
+                    writer_logger.info(f"отчет записан в файл {os.path.basename(file_path)}")
+                except Exception as e:
+                    writer_logger.error(f"ошибка при сохранении отчета {os.path.basename(file_path)}: {e}")
+                    self.errors.append((file_path, e))
+            finally:
+                self.queue.task_done()
+
+    def submit(self, data_frame: pd.DataFrame, file_path: str, fmt: Optional[str] = None) -> None:
+        """Метод ставит отчет в очередь на запись. DataFrame не копируется - его нельзя изменять
+        до окончания записи"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="report-writer", daemon=True)
+                self._thread.start()
+        self.queue.put((data_frame, file_path, fmt))
+
+    def flush(self) -> None:
+        """Метод дожидается записи всех поставленных в очередь отчетов"""
+        self.queue.join()
+
+    def close(self) -> None:
+        """Метод дописывает очередь и останавливает поток записи"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self.queue.put(None)
+            thread.join()
+
+
+_default_writer: Optional[ReportWriter] = None
+
+
+def get_report_writer() -> ReportWriter:
+    """Функция возвращает общий для процесса фоновый писатель отчетов;
+    при завершении программы очередь дописывается"""
+    global _default_writer
+    if _default_writer is None:
+        _default_writer = ReportWriter()
+        atexit.register(_default_writer.close)
+    return _default_writer
@@ -1,4 +1,3 @@
-import json
 import logging
 import os
 from datetime import datetime
@@ -7,37 +6,39 @@ from typing import Any, Callable, Optional
 
 import pandas as pd
 
+from src.engine import get_operations_table
+from src.report_writer import get_report_writer, write_report
+from src.sqlite_store import SqliteStore
+from src.store import DATE_FORMAT, TransactionStore
 
-log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "logs")
-os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, "reports_logs.log")
 reports_logger = logging.getLogger("services_logger")
-reports_logger.setLevel(logging.DEBUG)
-file_handler = logging.FileHandler(log_file, mode="w", encoding="utf-8")
-file_formatter = logging.Formatter("%(asctime)s %(filename)s %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-reports_logger.addHandler(file_handler)
 
 
-def report_log(filename: str = "report.json") -> Any:
+def report_log(filename: str = "report.json", background: bool = False) -> Any:
     """Декоратор, который записывает результаты формирования отчетов в файл.
     Можно передать в аргумент декоратора название для файла с отчетами, по умолчанию -
-    report.txt"""
+    report.json; файл с расширением .jsonl записывается в формате JSON Lines.
+    Имя файла можно задать и для отдельного вызова аргументом report_filename.
+    Строки отчета записываются потоково, через временный файл с атомарным переименованием.
+    При background=True запись выполняет фоновый поток (см. src.report_writer)"""
 
     def decorator1(func: Callable) -> Callable:
         @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> Any:
+        def wrapper(*args: Any, report_filename: Optional[str] = None, **kwargs: Any) -> Any:
             reports_logger.info("запрос на создание отчета о транзакциях по категории")
             result = func(*args, **kwargs)
             if isinstance(result, pd.DataFrame):
                 dir_path = os.path.dirname(os.path.abspath(__file__))
                 reports_data_dir = os.path.join(dir_path, "..", "reports_data")
-                os.makedirs(reports_data_dir, exist_ok=True)
-                file_path = os.path.join(reports_data_dir, filename)
+                report_name = report_filename or filename
+                file_path = os.path.join(reports_data_dir, report_name)
+                if background:
+                    reports_logger.info(f"отчет о транзакциях по категории поставлен в очередь записи: {report_name}")
+                    get_report_writer().submit(result, file_path)
+                    return result
                 try:
-                    with open(file_path, "w", encoding="utf-8") as file:
-                        reports_logger.info(f"запись отчета о транзакциях по категории в файл {filename}")
-                        json.dump(result.to_dict(orient="records"), file, ensure_ascii=False, indent=4)
+                    reports_logger.info(f"запись отчета о транзакциях по категории в файл {report_name}")
+                    write_report(result, file_path)
                     reports_logger.info("отчет о транзакциях по категории успешно сохранен")
                 except Exception as e:
                     reports_logger.error("ошибка при сохранении отчета")
@@ -49,36 +50,84 @@ def report_log(filename: str = "report.json") -> Any:
     return decorator1
 
 
-@report_log()
-def spending_by_category(transactions_df: pd.DataFrame, category: str, date: Optional[str] = None) -> pd.DataFrame:
-    """Функция получает список транзакций (DF), категорию и дату (по умолчанию - текущую)
-    и возвращает траты по заданной категории за последние три месяца (от переданной даты)."""
-    reports_logger.info(f"получение данных о периоде для отчета о транзакциях по категории {category}")
+def parse_report_date(date: Optional[str] = None) -> pd.Timestamp:
+    """Функция разбирает дату отчета в формате ДД.ММ.ГГГГ (без даты - текущий момент).
+    При неверном формате вызывает ValueError, ввод пользователя не запрашивается"""
+    if not date:
+        return pd.to_datetime(datetime.now())
+    end_date = pd.to_datetime(date, dayfirst=True)
+    if pd.isna(end_date):
+        raise ValueError(f"неверный формат даты: {date}")
+    return end_date
 
-    if date:
-        end_date = None
-        while not end_date:
-            try:
-                end_date = pd.to_datetime(date, dayfirst=True)
-            except ValueError as e:
-                reports_logger.error(f"Ошибка в формате даты: {date}. Ошибка: {str(e)}")
-                print(f"Неверный формат даты - {date}! Используйте формат ДД.ММ.ГГГГ")
-                date = input("Введите дату для формирования отчета в формате 'ДД.ММ.ГГГГ': ")
 
-    else:
-        end_date = pd.to_datetime(datetime.now())
+def parse_report_period(date: Optional[str] = None) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """Функция возвращает границы трехмесячного периода отчета, заканчивающегося
+    переданной датой (по умолчанию - текущей). При неверном формате даты вызывает ValueError,
+    ввод пользователя не запрашивается"""
+    end_date = parse_report_date(date)
+    return end_date - pd.DateOffset(months=3), end_date
+
 
-    start_date = end_date - pd.DateOffset(months=3)
-    transactions_df["Дата операции"] = pd.to_datetime(transactions_df["Дата операции"], dayfirst=True)
+def get_report_period(date: Optional[str] = None) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """Функция возвращает границы трехмесячного периода отчета, заканчивающегося
+    переданной датой (по умолчанию - текущей). При неверном формате даты запрашивает ее повторно;
+    используется только в интерактивном режиме"""
+    while True:
+        try:
+            return parse_report_period(date)
+        except ValueError as e:
+            reports_logger.error(f"Ошибка в формате даты: {date}. Ошибка: {str(e)}")
+            print(f"Неверный формат даты - {date}! Используйте формат ДД.ММ.ГГГГ")
+            date = input("Введите дату для формирования отчета в формате 'ДД.ММ.ГГГГ': ")
+
+
+@report_log()
+def spending_by_category(
+    transactions_df: pd.DataFrame | TransactionStore | SqliteStore, category: str, date: Optional[str] = None
+) -> pd.DataFrame:
+    """Функция получает список транзакций (DF, хранилище TransactionStore или SqliteStore), категорию
+    и дату (по умолчанию - текущую) и возвращает траты по заданной категории
+    за последние три месяца (от переданной даты). Неверная дата вызывает ValueError.
+    Операции со статусом FAILED не учитываются; строки отбираются движком агрегатов (src.engine)
+    по кодам категорий и статусов."""
+    reports_logger.info(f"получение данных о периоде для отчета о транзакциях по категории {category}")
+    start_date, end_date = parse_report_period(date)
     reports_logger.info(f"формирование отчета о транзакциях по категории {category}")
-    filtered_transactions_df = transactions_df[
-        (transactions_df["Дата операции"] >= start_date)
-        & (transactions_df["Дата операции"] <= end_date)
-        & (transactions_df["Категория"] == category)
-    ]
-    filtered_transactions_df = filtered_transactions_df.copy()
-    filtered_transactions_df["Дата операции"] = filtered_transactions_df["Дата операции"].dt.strftime(
-        "%d.%m.%Y %H:%M:%S"
-    )
+
+    stop_date = end_date + pd.Timedelta(1)
+    if isinstance(transactions_df, SqliteStore):
+        # строки выбираются по индексу (категория, дата)
+        return transactions_df.between_frame(start_date, stop_date, category, counted=True)
+    table = get_operations_table(transactions_df)
+    positions = table.select(start_date, stop_date, categories=[category])
+    if isinstance(transactions_df, TransactionStore):
+        return transactions_df.take_frame(positions)
+
+    # даты разобраны движком, DataFrame вызывающего кода не изменяется
+    filtered_transactions_df = transactions_df.iloc[positions].copy()
+    filtered_transactions_df["Дата операции"] = pd.Series(table.dates[positions]).dt.strftime(DATE_FORMAT).to_numpy()
 
     return filtered_transactions_df
+
+
+def category_spending_total(store: TransactionStore | SqliteStore, category: str, date: Optional[str] = None) -> float:
+    """Функция возвращает общую сумму платежей по категории за три месяца до переданной даты
+    (без операций со статусом FAILED), не выбирая сами транзакции: целые дни периода берутся
+    из куба сумм по категориям и дням, неполные граничные дни досчитываются движком агрегатов
+    по индексу дат. Для SqliteStore сумма считается агрегатным запросом к базе"""
+    start_date, end_date = parse_report_period(date)
+    reports_logger.info(f"расчет суммы платежей по категории {category}")
+    stop_date = end_date + pd.Timedelta(1)
+    if isinstance(store, SqliteStore):
+        return store.category_total(category, start_date, stop_date)
+    first_full_day, stop_full_day = start_date.ceil("D"), end_date.floor("D")
+    if first_full_day < stop_full_day:
+        kopecks, _ = store.category_cube.total(category, first_full_day.to_datetime64(), stop_full_day.to_datetime64())
+        edges = [(start_date, first_full_day), (stop_full_day, stop_date)]
+    else:
+        kopecks, edges = 0, [(start_date, stop_date)]
+    table = get_operations_table(store)
+    for edge_start, edge_stop in edges:
+        kopecks += int(table.amounts[table.select(edge_start, edge_stop, categories=[category])].sum())
+    return kopecks / 100
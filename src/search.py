@@ -0,0 +1,178 @@
+import re
+from collections import defaultdict
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+SEARCH_COLUMNS = ("Описание", "Категория")
+# мобильный номер отдельным словом: +7 или 8, затем 10 цифр с необязательными пробелами, дефисами и скобками
+PHONE_PATTERN = re.compile(r"(?:^|(?<=\s))((?:\+7|8)[\s\-]?\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{2}[\s\-]?\d{2})(?=$|\s)")
+OPERATORS = {" ИЛИ ": "or", " OR ": "or", " И ": "and", " AND ": "and"}
+
+
+def tokenize(text: object) -> list:
+    """Функция разбивает текст на слова по пробельным символам без учета регистра"""
+    return str(text).lower().split()
+
+
+def keyword_pattern(keyword: str) -> re.Pattern:
+    """Функция возвращает регулярное выражение для поиска ключевого слова (или фразы)
+    целиком, между пробельными символами или границами строки, без учета регистра"""
+    return re.compile(rf"(?:^|\s){re.escape(keyword)}(?:$|\s)", flags=re.IGNORECASE)
+
+
+def parse_search_query(query: str) -> tuple[list, str]:
+    """Функция разбирает строку запроса на ключевые слова и оператор их объединения:
+    "кафе ИЛИ такси" - любое из слов, "перевод И сбербанк" - все слова одновременно"""
+    for separator, operator in OPERATORS.items():
+        if separator in query:
+            keywords = [keyword.strip() for keyword in query.split(separator) if keyword.strip()]
+            return keywords, operator
+    return [query], "and"
+
+
+class SearchIndex:
+    """Инвертированный индекс для поиска по описанию и категории транзакций.
+    Текст каждого уникального значения колонки разбивается на слова один раз,
+    индекс хранит для слова номера уникальных значений, а для значения - номера строк.
+    Запрос из нескольких слов или ключевых слов сводится к пересечению (И)
+    или объединению (ИЛИ) множеств строк. Добавленные строки индексируются
+    отдельными сегментами (метод extend), уже построенные сегменты не меняются"""
+
+    def __init__(self, columns: Iterable[pd.Series]) -> None:
+        # сегменты: (номер первой строки, колонки сегмента)
+        self.segments: list = []
+        self.extend(columns, 0)
+
+    @staticmethod
+    def _index_column(values: pd.Series) -> tuple:
+        """Метод строит индекс одной колонки: уникальные тексты, порядок строк по значениям,
+        границы строк каждого значения и словарь слово -> номера значений"""
+        codes, uniques = pd.factorize(values.astype(str))
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        postings = defaultdict(list)
+        for value_id, text in enumerate(uniques):
+            for token in set(tokenize(text)):
+                postings[token].append(value_id)
+        texts = np.asarray(uniques, dtype=object)
+        value_postings = {token: np.array(ids, dtype=np.intp) for token, ids in postings.items()}
+        return texts, order, bounds, value_postings
+
+    def extend(self, columns: Iterable[pd.Series], offset: int) -> None:
+        """Метод добавляет в индекс строки с номерами начиная с offset отдельным сегментом"""
+        self.segments.append((offset, [self._index_column(values) for values in columns]))
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "SearchIndex":
+        """Метод строит индекс по колонкам "Описание" и "Категория" (отсутствующие колонки пропускаются)"""
+        return cls(frame[column] for column in SEARCH_COLUMNS if column in frame.columns)
+
+    def extend_frame(self, frame: pd.DataFrame, offset: int) -> None:
+        """Метод добавляет в индекс строки DataFrame, первая из которых имеет номер offset"""
+        self.extend((frame[column] for column in SEARCH_COLUMNS if column in frame.columns), offset)
+
+    def _matched_values(self, keyword: str, texts: np.ndarray, value_postings: dict[str, np.ndarray]) -> np.ndarray:
+        """Метод возвращает номера уникальных значений колонки, содержащих ключевое слово"""
+        tokens = tokenize(keyword)
+        if tokens:
+            candidates = value_postings.get(tokens[0], np.array([], dtype=np.intp))
+            for token in tokens[1:]:
+                candidates = np.intersect1d(candidates, value_postings.get(token, []), assume_unique=True)
+        else:
+            candidates = np.arange(len(texts))
+        # одно слово без окружающих пробелов совпадает с элементом индекса точно,
+        # фраза проверяется регулярным выражением только на отобранных значениях
+        if keyword.split() == [keyword]:
+            return candidates
+        pattern = keyword_pattern(keyword)
+        return np.array([value_id for value_id in candidates if pattern.search(texts[value_id])], dtype=np.intp)
+
+    def keyword_rows(self, keyword: str) -> np.ndarray:
+        """Метод возвращает отсортированные номера строк, содержащих ключевое слово
+        в описании или категории"""
+        parts = []
+        for offset, columns in self.segments:
+            for texts, order, bounds, value_postings in columns:
+                for value_id in self._matched_values(keyword, texts, value_postings):
+                    parts.append(order[bounds[value_id] : bounds[value_id + 1]] + offset)
+        if not parts:
+            return np.array([], dtype=np.intp)
+        return np.unique(np.concatenate(parts))
+
+    def search(self, keywords: list, operator: str = "and") -> np.ndarray:
+        """Метод возвращает отсортированные номера строк, содержащих все (operator="and")
+        или хотя бы одно (operator="or") из ключевых слов"""
+        if operator not in ("and", "or"):
+            raise ValueError(f"неизвестный оператор поиска: {operator}")
+        result = None
+        for keyword in keywords:
+            rows = self.keyword_rows(keyword)
+            if result is None:
+                result = rows
+            elif operator == "and":
+                result = np.intersect1d(result, rows, assume_unique=True)
+            else:
+                result = np.union1d(result, rows)
+        return result if result is not None else np.array([], dtype=np.intp)
+
+
+def matches_keywords(texts: Iterable, patterns: list, operator: str = "and") -> bool:
+    """Функция проверяет, что хотя бы один из текстов содержит все (или одно из) ключевые слова"""
+    texts = [str(text) for text in texts]
+    found = (any(pattern.search(text) for text in texts) for pattern in patterns)
+    return all(found) if operator == "and" else any(found)
+
+
+def normalize_phone(phone: str) -> Optional[str]:
+    """Функция приводит российский мобильный номер к формату E.164 (+79161234567).
+    Возвращает None, если строка не похожа на номер"""
+    digits = re.sub(r"\D", "", str(phone))
+    if len(digits) == 11 and digits[0] in "78":
+        digits = digits[1:]
+    if len(digits) != 10:
+        return None
+    return f"+7{digits}"
+
+
+class PhoneIndex:
+    """Индекс номеров телефонов в описаниях транзакций. Номера извлекаются векторно
+    (str.extractall) один раз для каждого уникального описания и приводятся к E.164.
+    Хранит производную колонку phones (первый номер строки или NaN) и словарь
+    номер -> строки для поиска по конкретному номеру"""
+
+    def __init__(self, descriptions: pd.Series) -> None:
+        codes, uniques = pd.factorize(descriptions.astype(object))
+        found = pd.Series(uniques, dtype=object).str.extractall(PHONE_PATTERN)[0].map(normalize_phone).dropna()
+        value_ids = found.index.get_level_values(0).to_numpy(dtype=np.intp)
+        first_phones = np.full(len(uniques) + 1, np.nan, dtype=object)
+        first_phones[value_ids[::-1]] = found.to_numpy()[::-1]
+        # код -1 (пропуск) указывает на последний элемент - NaN
+        self.phones = pd.Series(first_phones[codes], index=descriptions.index, name="Телефон")
+        self.rows = np.flatnonzero(self.phones.notna().to_numpy())
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self.by_phone: dict[str, np.ndarray] = {}
+        for phone, ids in pd.Series(value_ids).groupby(found.to_numpy()):
+            parts = [order[bounds[value_id] : bounds[value_id + 1]] for value_id in np.unique(ids)]
+            self.by_phone[phone] = np.sort(np.concatenate(parts))
+
+    def extend(self, descriptions: pd.Series, offset: int) -> None:
+        """Метод добавляет в индекс описания строк с номерами начиная с offset.
+        Номера извлекаются только из новых описаний"""
+        added = PhoneIndex(descriptions.reset_index(drop=True))
+        added.phones.index = pd.RangeIndex(offset, offset + len(descriptions))
+        self.phones = pd.concat([self.phones, added.phones])
+        self.rows = np.concatenate([self.rows, added.rows + offset])
+        for phone, rows in added.by_phone.items():
+            existing = self.by_phone.get(phone)
+            self.by_phone[phone] = rows + offset if existing is None else np.concatenate([existing, rows + offset])
+
+    def lookup(self, phone: str) -> np.ndarray:
+        """Метод возвращает отсортированные номера строк, в описании которых есть номер телефона
+        (в любом формате записи)"""
+        normalized = normalize_phone(phone)
+        if normalized is None:
+            return np.array([], dtype=np.intp)
+        return self.by_phone.get(normalized, np.array([], dtype=np.intp))
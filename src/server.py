@@ -0,0 +1,148 @@
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator, Optional
+from urllib.parse import parse_qs, urlparse
+
+from src.api import HANDLERS, handle_request
+from src.market import MarketDataClient, get_market_client
+from src.records import to_serializable
+from src.store import DEFAULT_FILE_PATH, TransactionStore, get_store
+from src.views import load_user_settings
+
+server_logger = logging.getLogger("services_logger")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+MAX_BODY_SIZE = 1024 * 1024
+# параметры GET-запроса, которые могут повторяться и передаются списком
+LIST_PARAMETERS = ("keywords", "steps", "group_by", "cards", "categories", "mccs", "statuses")
+
+
+class AppServer(ThreadingHTTPServer):
+    """Долгоживущий HTTP-сервер приложения. Хранилище транзакций и кэш котировок
+    остаются в памяти между запросами; файл с операциями перечитывается,
+    только когда меняются его время изменения или размер (см. get_store)"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        file_path: Optional[str] = None,
+        settings: Optional[dict] = None,
+        market_client: Optional[MarketDataClient] = None,
+    ) -> None:
+        super().__init__((host, port), AppHandler)
+        self.file_path = file_path or DEFAULT_FILE_PATH
+        self.settings = settings
+        self.market_client = market_client
+        self._store_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def current_store(self) -> TransactionStore:
+        """Метод возвращает загруженное хранилище; при изменении файла загрузка выполняется один раз,
+        параллельные запросы ждут ее окончания"""
+        with self._store_lock:
+            return get_store(self.file_path)
+
+    def warm_up(self) -> None:
+        """Метод заранее загружает хранилище, индексы поиска и настройки пользователя"""
+        store = self.current_store()
+        # индексы строятся при первом обращении - обращаемся к ним до первого запроса
+        for index in (store.search_index, store.phone_index, store.category_cube):
+            server_logger.debug(f"индекс построен: {type(index).__name__}")
+        if self.settings is None:
+            self.settings = load_user_settings()
+        if self.market_client is None:
+            self.market_client = get_market_client()
+        server_logger.info(f"сервер готов: {len(store)} транзакций в памяти")
+
+
+class AppHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов: GET /dashboard, /search, /phones, /report с параметрами запроса
+    (как поля запроса src.api), POST / с JSON-запросом в теле и GET /health"""
+
+    server: AppServer
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status: int, body: object) -> None:
+        payload = json.dumps(body, ensure_ascii=False, default=to_serializable).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _respond(self, request: dict) -> None:
+        """Метод выполняет запрос к приложению и отправляет ответ: 200 - результат, 400 - ошибка"""
+        # котировки запрашиваются только для Главной страницы и если не переданы market=0
+        settings = self.server.settings if request.pop("market", "1") not in ("0", False) else None
+        response = handle_request(request, self.server.current_store(), settings, self.server.market_client)
+        self._send_json(400 if "error" in response else 200, response)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        endpoint = url.path.strip("/")
+        if endpoint == "health":
+            self._send_json(200, {"status": "ok", "transactions": len(self.server.current_store())})
+            return
+        if endpoint not in HANDLERS:
+            self._send_json(404, {"error": f"неизвестный адрес: {url.path}"})
+            return
+        request: dict = {"type": endpoint}
+        for name, values in parse_qs(url.query).items():
+            request[name] = values if name in LIST_PARAMETERS else values[-1]
+        self._respond(request)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_SIZE:
+            self._send_json(413, {"error": "слишком большой запрос"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b"null")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            request = None
+        if not isinstance(request, dict):
+            self._send_json(400, {"error": "запрос должен быть объектом JSON"})
+            return
+        self._respond(request)
+
+    def log_message(self, format: str, *args: object) -> None:
+        server_logger.debug(f"{self.address_string()} {format % args}")
+
+
+@contextmanager
+def run_app_server(**options: Any) -> Iterator[AppServer]:
+    """Контекстный менеджер: запускает сервер приложения в фоновом потоке и останавливает его на выходе"""
+    server = AppServer(**options)
+    server.warm_up()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, file_path: Optional[str] = None) -> None:
+    """Функция запускает сервер приложения и обслуживает запросы до прерывания (Ctrl+C)"""
+    server = AppServer(host, port, file_path)
+    server.warm_up()
+    print(f"Сервер запущен: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -1,62 +1,82 @@
 import json
 import logging
-import os
-import re
-from typing import Optional
 
-from src.utils import make_transactions
+import pandas as pd
+
+from src.records import to_serializable
+from src.search import PhoneIndex, keyword_pattern, matches_keywords, normalize_phone
+from src.sqlite_store import SqliteStore
+from src.store import TransactionStore
 
-log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "logs")
-os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, "services_logs.log")
 services_logger = logging.getLogger("services_logger")
-services_logger.setLevel(logging.DEBUG)
-file_handler = logging.FileHandler(log_file, mode="w", encoding="utf-8")
-file_formatter = logging.Formatter("%(asctime)s %(filename)s %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-services_logger.addHandler(file_handler)
 
 
-def search_by_target(transactions: list, input_target: str) -> str:
+def search_by_target(
+    transactions: list | TransactionStore | SqliteStore, input_target: str | list, operator: str = "and"
+) -> str:
     """Функция возвращает JSON со всеми транзакциями,
-    содержащими в описании или категории строку, заданную пользователем"""
+    содержащими в описании или категории строку, заданную пользователем.
+    Можно передать список ключевых слов: operator="and" - нужны все слова, "or" - любое из них"""
     services_logger.info("получение списка транзакций и ключевого слова для поиска")
-
-    target = re.compile(rf"(?:^|\s){input_target}(?:$|\s)", flags=re.IGNORECASE)
-    print(target)
-    matched_transactions = []
-    for transaction in transactions:
-        description = transaction.get("Описание", "")
-        category = transaction.get("Категория", "")
-        if re.search(target, str(description)) or re.search(target, str(category)):
-            matched_transactions.append(transaction)
+    keywords = [input_target] if isinstance(input_target, str) else list(input_target)
+    if operator not in ("and", "or"):
+        raise ValueError(f"неизвестный оператор поиска: {operator}")
+    if isinstance(transactions, TransactionStore):
+        matched_transactions = transactions.take(transactions.search_index.search(keywords, operator))
+    elif isinstance(transactions, SqliteStore):
+        matched_transactions = transactions.take(transactions.search_rows(keywords, operator))
+    else:
+        patterns = [keyword_pattern(keyword) for keyword in keywords]
+        matched_transactions = []
+        for transaction in transactions:
+            texts = (transaction.get("Описание", ""), transaction.get("Категория", ""))
+            if patterns and matches_keywords(texts, patterns, operator):
+                matched_transactions.append(transaction)
     if len(matched_transactions) != 0:
         services_logger.info("поиск произведен успешно")
-        return json.dumps(matched_transactions, ensure_ascii=False)
+        return json.dumps(matched_transactions, ensure_ascii=False, default=to_serializable)
     else:
         services_logger.warning("поиск не дал результатов")
         return json.dumps({"Результаты поиска": "Ничего не нашлось"}, ensure_ascii=False)
 
 
-def search_by_phones(transactions: list) -> str:
+def search_by_phones(transactions: list | TransactionStore | SqliteStore) -> str:
     """Функция возвращает JSON со всеми транзакциями,
     содержащими в описании мобильные номера"""
     services_logger.info("получение списка транзакций")
-    if not transactions:
-        transactions = make_transactions()
-    phones_transactions = []
-    for transaction in transactions:
-        if re.search(
-            r"(?:^|\s)(?:\+7|8)[\s\-]?\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{2}[\s\-]?\d{2}(?:$|\s)",
-            transaction.get("Описание", ""),
-        ):
-            phones_transactions.append(transaction)
+    if isinstance(transactions, TransactionStore):
+        phones_transactions = transactions.take(transactions.phone_index.rows)
+    elif isinstance(transactions, SqliteStore):
+        phones_transactions = transactions.take(transactions.phone_rows())
+    else:
+        phone_index = PhoneIndex(pd.Series([transaction.get("Описание", "") for transaction in transactions]))
+        phones_transactions = [transactions[position] for position in phone_index.rows]
     services_logger.info("формирование ответа")
     if len(phones_transactions) != 0:
         services_logger.info("поиск произведен успешно")
-        return json.dumps(phones_transactions, ensure_ascii=False)
+        return json.dumps(phones_transactions, ensure_ascii=False, default=to_serializable)
     else:
         services_logger.warning("поиск не дал результатов")
         return json.dumps({"Результаты поиска": "Ничего не нашлось"}, ensure_ascii=False)
 
-print(search_by_phones(make_transactions()))
\ No newline at end of file
+
+def search_by_phone_number(transactions: list | TransactionStore | SqliteStore, phone: str) -> str:
+    """Функция возвращает JSON со всеми транзакциями, в описании которых указан
+    заданный номер телефона (номер можно записать в любом формате: +7 921 111-22-33, 89211112233)"""
+    services_logger.info("поиск транзакций по номеру телефона")
+    if normalize_phone(phone) is None:
+        services_logger.warning("неверный формат номера телефона")
+        return json.dumps({"Результаты поиска": "Неверный формат номера телефона"}, ensure_ascii=False)
+    if isinstance(transactions, TransactionStore):
+        phones_transactions = transactions.take(transactions.phone_index.lookup(phone))
+    elif isinstance(transactions, SqliteStore):
+        phones_transactions = transactions.take(transactions.phone_rows(phone))
+    else:
+        phone_index = PhoneIndex(pd.Series([transaction.get("Описание", "") for transaction in transactions]))
+        phones_transactions = [transactions[position] for position in phone_index.lookup(phone)]
+    if len(phones_transactions) != 0:
+        services_logger.info("поиск произведен успешно")
+        return json.dumps(phones_transactions, ensure_ascii=False, default=to_serializable)
+    else:
+        services_logger.warning("поиск не дал результатов")
+        return json.dumps({"Результаты поиска": "Ничего не нашлось"}, ensure_ascii=False)
@@ -0,0 +1,479 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src import cache
+from src.aggregates import EXCLUDED_STATUSES
+from src.cache import read_operations_frame, source_version
+from src.search import PhoneIndex, keyword_pattern, normalize_phone
+from src.store import DEFAULT_FILE_PATH, parse_operation_dates
+
+sqlite_logger = logging.getLogger("services_logger")
+
+SQLITE_FORMAT_VERSION = 3
+IMPORT_CHUNK_ROWS = 50000
+# колонки, по которым строятся индексы (если колонка есть в файле)
+INDEXED_COLUMNS = {
+    "Номер карты": 'CREATE INDEX ix_card ON operations("Номер карты")',
+    "Категория": 'CREATE INDEX ix_category ON operations("Категория", _date)',
+    "MCC": 'CREATE INDEX ix_mcc ON operations("MCC")',
+    # ТОП-N по модулю суммы читается из индекса без сортировки таблицы
+    "Сумма платежа": 'CREATE INDEX ix_amount ON operations(abs("Сумма платежа") DESC, _row)',
+}
+# слово для полнотекстового индекса: буквы и цифры (как у токенизатора unicode61)
+FTS_TOKEN = re.compile(r"[^\W_]+")
+
+
+def _quote(name: str) -> str:
+    """Функция возвращает имя колонки в кавычках для запроса SQL"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _seconds(value: object) -> int:
+    """Функция переводит момент времени в целые секунды эпохи с округлением вверх:
+    для целых секунд t условие t >= value равносильно t >= _seconds(value)"""
+    nanoseconds = int(np.asarray(value, dtype="datetime64[ns]").astype(np.int64))
+    return -(-nanoseconds // 10**9)
+
+
+def _column_type(dtype: object) -> str:
+    """Функция возвращает тип колонки SQLite для типа колонки pandas. Строковые колонки
+    объявляются без типа, чтобы значения сохранялись без преобразования"""
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return ""
+
+
+def _column_values(series: pd.Series) -> list:
+    """Функция возвращает значения колонки как объекты Python, пропуски - None"""
+    return [None if value is None or value != value else value for value in series.tolist()]
+
+
+def sqlite_path_for(file_path: str) -> str:
+    """Функция возвращает путь к базе SQLite для файла с операциями (в папке кэша)"""
+    abs_path = os.path.abspath(file_path)
+    stem = os.path.splitext(os.path.basename(abs_path))[0]
+    path_hash = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(cache.CACHE_DIR, f"{stem}-{path_hash}.sqlite")
+
+
+def _parse_version(value: Optional[str]) -> Optional[tuple]:
+    """Функция разбирает версию исходного файла, сохраненную в базе в формате JSON"""
+    version = json.loads(value) if value else None
+    return tuple(version) if version else None
+
+
+def _counted_condition(columns: list) -> str:
+    """Функция возвращает условие SQL для операций, учитываемых в агрегатах:
+    статус не из EXCLUDED_STATUSES (без колонки статуса - все операции)"""
+    if "Статус" not in columns:
+        return "1"
+    statuses = ", ".join("'" + status.replace("'", "''") + "'" for status in EXCLUDED_STATUSES)
+    return f'coalesce("Статус", \'\') NOT IN ({statuses})'
+
+
+def _card_expressions(columns: list) -> tuple[str, str, str]:
+    """Функция возвращает выражения SQL для номера карты, расходов и кешбэка в копейках
+    (отсутствующие в таблице колонки заменяются константами)"""
+    card = "coalesce(CAST(\"Номер карты\" AS TEXT), '----')" if "Номер карты" in columns else "'----'"
+    spent = "0"
+    if "Сумма платежа" in columns:
+        spent = 'CASE WHEN "Сумма платежа" < 0 THEN CAST(round("Сумма платежа" * 100) AS INTEGER) ELSE 0 END'
+    cashback = 'CAST(round(coalesce("Кэшбэк", 0) * 100) AS INTEGER)' if "Кэшбэк" in columns else "0"
+    return card, spent, cashback
+
+
+def _insert_rows(connection: sqlite3.Connection, frame: pd.DataFrame, columns: list, first_row: int) -> None:
+    """Функция добавляет строки frame в таблицу операций с номерами начиная с first_row
+    и дополняет по ним производные таблицы: полнотекстовый индекс описаний, номера телефонов
+    и итоги по картам за месяц. Стоимость пропорциональна числу новых строк"""
+    frame = frame.reset_index(drop=True).reindex(columns=columns)
+    placeholders = ", ".join("?" for _ in range(len(columns) + 2))
+    insert = f"INSERT INTO operations VALUES ({placeholders})"
+    for start in range(0, len(frame), IMPORT_CHUNK_ROWS):
+        chunk = frame.iloc[start : start + IMPORT_CHUNK_ROWS]
+        if "Дата операции" in chunk.columns:
+            dates = parse_operation_dates(chunk["Дата операции"])
+            seconds = [None if np.isnat(date) else _seconds(date) for date in dates]
+        else:
+            seconds = [None] * len(chunk)
+        values = [_column_values(chunk[name]) for name in columns]
+        rows = range(first_row + start, first_row + start + len(chunk))
+        connection.executemany(insert, zip(rows, seconds, *values))
+    if "Описание" in columns:
+        connection.execute(
+            'INSERT INTO descriptions(rowid, text) SELECT _row, "Описание" FROM operations '
+            'WHERE _row >= ? AND "Описание" IS NOT NULL',
+            (first_row,),
+        )
+        phone_index = PhoneIndex(frame["Описание"])
+        connection.executemany(
+            "INSERT INTO phones VALUES (?, ?)",
+            ((phone, first_row + int(row)) for phone, rows in phone_index.by_phone.items() for row in rows),
+        )
+    card, spent, cashback = _card_expressions(columns)
+    connection.execute(
+        f"INSERT INTO card_months SELECT {card}, coalesce(strftime('%Y-%m', _date, 'unixepoch'), ''), "
+        f"sum({spent}), sum({cashback}), count(*) FROM operations WHERE _row >= ? AND {_counted_condition(columns)} "
+        "GROUP BY 1, 2 "
+        "ON CONFLICT (card, month) DO UPDATE SET spent = spent + excluded.spent, "
+        "cashback = cashback + excluded.cashback, operations = operations + excluded.operations",
+        (first_row,),
+    )
+
+
+def import_frame(frame: pd.DataFrame, db_path: str, version: Optional[tuple] = None) -> None:
+    """Функция записывает операции в новую базу SQLite db_path: таблица operations
+    (номер строки файла _row, дата операции в секундах _date и исходные колонки),
+    индексы по дате, карте, категории, MCC и модулю суммы, полнотекстовый индекс FTS5
+    по описанию, таблица номеров телефонов и итоги по картам за месяц (card_months).
+    База собирается во временном файле и заменяет прежнюю целиком"""
+    tmp_path = f"{db_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    columns = [str(name) for name in frame.columns]
+    definitions = ", ".join(f"{_quote(name)} {_column_type(frame[name].dtype)}".rstrip() for name in columns)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.execute(f"CREATE TABLE operations (_row INTEGER PRIMARY KEY, _date INTEGER, {definitions})")
+        connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        connection.execute("CREATE TABLE phones (phone TEXT NOT NULL, _row INTEGER NOT NULL)")
+        connection.execute("CREATE VIRTUAL TABLE descriptions USING fts5(text, content='', tokenize='unicode61')")
+        # итоги по карте за месяц в копейках: расходы, кешбэк и число операций (без FAILED)
+        connection.execute(
+            "CREATE TABLE card_months (card TEXT NOT NULL, month TEXT NOT NULL, spent INTEGER NOT NULL, "
+            "cashback INTEGER NOT NULL, operations INTEGER NOT NULL, PRIMARY KEY (card, month))"
+        )
+        _insert_rows(connection, frame, columns, 0)
+        connection.execute("CREATE INDEX ix_date ON operations(_date)")
+        for name, statement in INDEXED_COLUMNS.items():
+            if name in columns:
+                connection.execute(statement)
+        connection.execute("CREATE INDEX ix_phone ON phones(phone, _row)")
+        connection.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [("format", str(SQLITE_FORMAT_VERSION)), ("version", json.dumps(version and list(version)))],
+        )
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(tmp_path, db_path)
+    sqlite_logger.info(f"операции записаны в базу SQLite {os.path.basename(db_path)}: {len(frame)} строк")
+
+
+class SqliteStore:
+    """Хранилище транзакций в базе SQLite: запросы выполняются по индексам базы,
+    в память читаются только строки результата. Функции utils, services и reports
+    принимают его так же, как TransactionStore. Метод period возвращает хранилище,
+    ограниченное полуинтервалом дат [start, stop): все запросы к нему учитывают период"""
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self.period_bounds: Optional[tuple] = None
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.columns = [row[1] for row in self._query("PRAGMA table_info(operations)")][2:]
+        self.version = _parse_version(dict(self._query("SELECT key, value FROM meta")).get("version"))
+
+    @classmethod
+    def from_file(cls, file_path: Optional[str] = None, db_path: Optional[str] = None) -> "SqliteStore":
+        """Метод открывает базу для xlsx-файла с операциями. Файл импортируется в базу
+        один раз; повторный импорт - только при изменении версии файла"""
+        file_path = file_path or DEFAULT_FILE_PATH
+        db_path = db_path or sqlite_path_for(file_path)
+        version = source_version(file_path)
+        if not os.path.exists(db_path) or cls.stored_version(db_path) != version:
+            sqlite_logger.info("импорт операций в базу SQLite")
+            import_frame(read_operations_frame(file_path), db_path, version)
+        return cls(db_path)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, db_path: str) -> "SqliteStore":
+        """Метод создает базу из DataFrame (формат make_transactions) и открывает ее"""
+        import_frame(frame, db_path)
+        return cls(db_path)
+
+    @staticmethod
+    def stored_version(db_path: str) -> Optional[tuple]:
+        """Метод возвращает версию файла, из которой построена база (None - база другого формата)"""
+        try:
+            connection = sqlite3.connect(db_path)
+            try:
+                meta = dict(connection.execute("SELECT key, value FROM meta").fetchall())
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return None
+        if meta.get("format") != str(SQLITE_FORMAT_VERSION):
+            return None
+        return _parse_version(meta.get("version"))
+
+    def close(self) -> None:
+        """Метод закрывает соединение с базой"""
+        self._connection.close()
+
+    def _query(self, sql: str, parameters: Iterable = ()) -> list:
+        """Метод выполняет запрос и возвращает все строки результата"""
+        with self._lock:
+            return self._connection.execute(sql, tuple(parameters)).fetchall()
+
+    def _iter_query(self, sql: str, parameters: Iterable = (), size: int = 10000) -> Iterator[tuple]:
+        """Метод-генератор выполняет запрос и читает строки результата порциями"""
+        with self._lock:
+            cursor = self._connection.execute(sql, tuple(parameters))
+            rows = cursor.fetchmany(size)
+        while rows:
+            yield from rows
+            with self._lock:
+                rows = cursor.fetchmany(size)
+
+    def _where(self, *conditions: str) -> tuple[str, list]:
+        """Метод собирает условие WHERE с учетом периода хранилища (граница None - без ограничения)"""
+        conditions_list, parameters = list(conditions), []
+        if self.period_bounds is not None:
+            start, stop = self.period_bounds
+            if start is not None:
+                conditions_list.append("_date >= ?")
+                parameters.append(_seconds(start))
+            if stop is not None:
+                conditions_list.append("_date < ?")
+                parameters.append(_seconds(stop))
+        return (" WHERE " + " AND ".join(conditions_list)) if conditions_list else "", parameters
+
+    def __len__(self) -> int:
+        where, parameters = self._where()
+        return int(self._query(f"SELECT count(*) FROM operations{where}", parameters)[0][0])
+
+    def period(self, start: object, stop: object) -> "SqliteStore":
+        """Метод возвращает хранилище той же базы (и того же соединения), ограниченное
+        датами операций [start, stop); граница None не ограничивает период"""
+        store = copy.copy(self)
+        store.period_bounds = (start, stop)
+        return store
+
+    def has_column(self, name: str) -> bool:
+        """Метод проверяет, есть ли колонка в таблице операций"""
+        return name in self.columns
+
+    def _select(self, where: str = "", order: str = "_row", limit: Optional[int] = None) -> str:
+        """Метод формирует запрос строк операций в исходных колонках"""
+        columns = ", ".join(["_row"] + [_quote(name) for name in self.columns])
+        sql = f"SELECT {columns} FROM operations{where} ORDER BY {order}"
+        return sql if limit is None else f"{sql} LIMIT {int(limit)}"
+
+    def _records(self, rows: Iterable[tuple]) -> list:
+        """Метод преобразует строки запроса в словари транзакций; пропуски - NaN, как в make_transactions"""
+        return [
+            {name: np.nan if value is None else value for name, value in zip(self.columns, row[1:])} for row in rows
+        ]
+
+    def records(self) -> list:
+        """Метод возвращает все транзакции (периода) в виде списка словарей, в порядке файла"""
+        where, parameters = self._where()
+        return self._records(self._iter_query(self._select(where), parameters))
+
+    def columns_frame(self, columns: list) -> pd.DataFrame:
+        """Метод возвращает колонки columns транзакций (периода) в виде DataFrame в порядке файла;
+        колонки, которых нет в базе, заполняются пропусками"""
+        present = [column for column in columns if self.has_column(column)]
+        where, parameters = self._where()
+        select = ", ".join(_quote(column) for column in present) or "NULL"
+        rows = self._query(f"SELECT {select} FROM operations{where} ORDER BY _row", parameters)
+        frame = pd.DataFrame.from_records(rows, columns=present or None, coerce_float=True)
+        return frame.reindex(columns=columns) if len(frame) else pd.DataFrame(columns=columns)
+
+    def take(self, rows: Iterable) -> list:
+        """Метод возвращает транзакции с заданными номерами строк файла в порядке файла"""
+        rows = sorted({int(row) for row in rows})
+        records = []
+        for start in range(0, len(rows), 500):
+            part = rows[start : start + 500]
+            sql = self._select(f" WHERE _row IN ({', '.join('?' for _ in part)})")
+            records.extend(self._records(self._query(sql, part)))
+        return records
+
+    def between_frame(
+        self, start: object, stop: object, category: Optional[str] = None, counted: bool = False
+    ) -> pd.DataFrame:
+        """Метод возвращает транзакции периода [start, stop) (и категории) в виде DataFrame
+        с номерами строк файла в качестве индекса; при counted=True - без операций со статусом FAILED"""
+        store = self.period(start, stop)
+        conditions = ['"Категория" = ?'] if category is not None else []
+        if counted:
+            conditions.append(_counted_condition(self.columns))
+        where, parameters = store._where(*conditions)
+        if category is not None:
+            parameters = [category] + parameters
+        rows = store._query(store._select(where), parameters)
+        return pd.DataFrame(
+            self._records(rows), columns=self.columns, index=pd.Index([row[0] for row in rows], dtype=np.int64)
+        )
+
+    def top_records(self, n: int = 5) -> list:
+        """Метод возвращает ТОП-N транзакций по модулю суммы платежа; при равных суммах -
+        в порядке файла, транзакции без суммы - в конце"""
+        if n <= 0:
+            return []
+        where, parameters = self._where()
+        order = "_row" if not self.has_column("Сумма платежа") else 'abs("Сумма платежа") DESC, _row'
+        return self._records(self._query(self._select(where, order, limit=n), parameters))
+
+    def cards_summary(self, with_count: bool = False) -> list:
+        """Метод считает по каждой карте сумму расходов (модуль суммы отрицательных платежей),
+        кешбэк и число транзакций - в формате get_cards_summary, без операций со статусом FAILED.
+        Суммы считаются в копейках;
+        без периода итоги берутся из таблицы card_months, за период - агрегатным запросом по индексу дат"""
+        if self.period_bounds is None:
+            rows = self._query(
+                "SELECT card, sum(spent), sum(cashback), sum(operations) FROM card_months GROUP BY card ORDER BY card"
+            )
+        else:
+            card, spent, cashback = _card_expressions(self.columns)
+            where, parameters = self._where(_counted_condition(self.columns))
+            rows = self._query(
+                f"SELECT {card}, sum({spent}), sum({cashback}), count(*) FROM operations{where} GROUP BY 1 ORDER BY 1",
+                parameters,
+            )
+        summary = []
+        for card_number, spent_kopecks, cashback_kopecks, count in rows:
+            item = {
+                "last_digits": card_number[1:],
+                "total_spent": -int(spent_kopecks) / 100,
+                "cashback": int(cashback_kopecks) / 100,
+            }
+            if with_count:
+                item["transactions"] = int(count)
+            summary.append(item)
+        return summary
+
+    def high_water_mark(self) -> Optional[np.datetime64]:
+        """Метод возвращает наибольшую дату операции в базе (None, если дат нет)"""
+        seconds = self._query("SELECT max(_date) FROM operations")[0][0]
+        return None if seconds is None else np.datetime64(seconds, "s").astype("datetime64[ns]")
+
+    def records_at(self, moment: Optional[np.datetime64]) -> list:
+        """Метод возвращает транзакции с датой операции, равной moment; при moment=None - без даты"""
+        if moment is None:
+            return self._records(self._query(self._select(" WHERE _date IS NULL")))
+        return self._records(self._query(self._select(" WHERE _date = ?"), [_seconds(moment)]))
+
+    def append(self, transactions: list | pd.DataFrame) -> np.ndarray:
+        """Метод добавляет новые транзакции в конец базы и возвращает их номера строк.
+        Индексы таблицы, полнотекстовый индекс, номера телефонов и итоги по картам
+        дополняются по новым строкам в одной транзакции базы. Колонки, которых нет
+        в таблице, не сохраняются"""
+        frame = pd.DataFrame(transactions).reset_index(drop=True)
+        if frame.empty:
+            return np.array([], dtype=np.intp)
+        ignored = [str(name) for name in frame.columns if name not in self.columns]
+        if ignored:
+            sqlite_logger.warning(f"колонки отсутствуют в базе и не сохраняются: {', '.join(ignored)}")
+        with self._lock:
+            first_row = self._connection.execute("SELECT coalesce(max(_row), -1) + 1 FROM operations").fetchone()[0]
+            with self._connection:
+                _insert_rows(self._connection, frame, self.columns, first_row)
+        sqlite_logger.info(f"в базу SQLite добавлено транзакций: {len(frame)}")
+        return np.arange(first_row, first_row + len(frame))
+
+    def mark_version(self, version: tuple) -> None:
+        """Метод сохраняет в базе версию исходного файла, которой соответствуют данные"""
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (json.dumps(list(version)),))
+        self.version = tuple(version)
+
+    def _category_rows(self, keyword: str) -> list:
+        """Метод возвращает номера строк, категория которых содержит ключевое слово:
+        слово проверяется на уникальных категориях, строки выбираются по индексу категорий"""
+        if not self.has_column("Категория"):
+            return []
+        pattern = keyword_pattern(keyword)
+        categories = [row[0] for row in self._query('SELECT DISTINCT "Категория" FROM operations')]
+        matched = [category for category in categories if category is not None and pattern.search(str(category))]
+        if not matched:
+            return []
+        where, parameters = self._where(f'"Категория" IN ({", ".join("?" for _ in matched)})')
+        return [row[0] for row in self._query(f"SELECT _row FROM operations{where}", matched + parameters)]
+
+    def _description_rows(self, keyword: str) -> list:
+        """Метод возвращает номера строк, описание которых содержит ключевое слово (или фразу).
+        Кандидаты отбираются полнотекстовым индексом FTS5, затем проверяются тем же регулярным
+        выражением, что и при поиске по списку"""
+        if not self.has_column("Описание"):
+            return []
+        pattern = keyword_pattern(keyword)
+        tokens = FTS_TOKEN.findall(keyword)
+        if tokens:
+            # фраза в кавычках: слова ключевого слова подряд
+            condition = "_row IN (SELECT rowid FROM descriptions WHERE descriptions MATCH ?)"
+            where, parameters = self._where(condition)
+            parameters = ['"' + " ".join(tokens) + '"'] + parameters
+        else:
+            where, parameters = self._where('"Описание" IS NOT NULL')
+        rows = self._iter_query(f'SELECT _row, "Описание" FROM operations{where}', parameters)
+        return [row for row, description in rows if pattern.search(str(description))]
+
+    def search_rows(self, keywords: list, operator: str = "and") -> list:
+        """Метод возвращает отсортированные номера строк, содержащих в описании или категории
+        все (operator="and") или хотя бы одно (operator="or") из ключевых слов"""
+        if operator not in ("and", "or"):
+            raise ValueError(f"неизвестный оператор поиска: {operator}")
+        result: Optional[set] = None
+        for keyword in keywords:
+            rows = set(self._description_rows(keyword)) | set(self._category_rows(keyword))
+            if result is None:
+                result = rows
+            elif operator == "and":
+                result &= rows
+            else:
+                result |= rows
+        return sorted(result or ())
+
+    def phone_rows(self, phone: Optional[str] = None) -> list:
+        """Метод возвращает номера строк с номером телефона в описании; при заданном phone -
+        только строки с этим номером (в любом формате записи)"""
+        if phone is None:
+            condition = "_row IN (SELECT _row FROM phones)"
+            where, parameters = self._where(condition)
+        else:
+            where, parameters = self._where("_row IN (SELECT _row FROM phones WHERE phone = ?)")
+            parameters = [normalize_phone(phone)] + parameters
+        return [row[0] for row in self._query(f"SELECT _row FROM operations{where} ORDER BY _row", parameters)]
+
+    def category_total(self, category: str, start: object, stop: object) -> float:
+        """Метод возвращает сумму платежей по категории за период [start, stop), считая в копейках;
+        операции со статусом FAILED не учитываются"""
+        if not self.has_column("Сумма платежа"):
+            return 0.0
+        store = self.period(start, stop)
+        where, parameters = store._where('"Категория" = ?', _counted_condition(self.columns))
+        kopecks = store._query(
+            f'SELECT total(CAST(round(coalesce("Сумма платежа", 0) * 100) AS INTEGER)) FROM operations{where}',
+            [category] + parameters,
+        )[0][0]
+        return int(kopecks) / 100
+
+
+_current_sqlite_store: Optional[SqliteStore] = None
+
+
+def get_sqlite_store(file_path: Optional[str] = None) -> SqliteStore:
+    """Функция возвращает хранилище SQLite текущего сеанса; при изменении файла
+    с операциями база импортируется заново"""
+    global _current_sqlite_store
+    file_path = file_path or DEFAULT_FILE_PATH
+    version = source_version(file_path)
+    if _current_sqlite_store is None or _current_sqlite_store.version != version:
+        _current_sqlite_store = SqliteStore.from_file(file_path)
+    return _current_sqlite_store
@@ -0,0 +1,296 @@
+import itertools
+import logging
+import os
+from typing import Iterable, Optional, cast
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import CategoryDayCube, counted_mask
+from src.cache import read_operations_frame, source_version
+from src.search import PhoneIndex, SearchIndex
+
+store_logger = logging.getLogger("services_logger")
+
+DEFAULT_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "operations.xlsx")
+DATE_FORMAT = "%d.%m.%Y %H:%M:%S"
+CATEGORICAL_COLUMNS = ["Номер карты", "Категория", "Статус", "Валюта операции", "Валюта платежа"]
+
+# источник уникальных версий данных: версии не повторяются между хранилищами одного процесса
+_data_versions = itertools.count(1)
+# сегментов поискового индекса после добавлений, сверх которых индекс перестраивается целиком
+MAX_SEARCH_SEGMENTS = 16
+
+
+# позиции символов в строке формата ДД.ММ.ГГГГ ЧЧ:ММ:СС
+DIGIT_POSITIONS = [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15, 17, 18]
+SEPARATORS = {2: ".", 5: ".", 10: " ", 13: ":", 16: ":"}
+
+
+def parse_fixed_width_dates(values: Iterable) -> Optional[np.ndarray]:
+    """Функция разбирает даты формата ДД.ММ.ГГГГ ЧЧ:ММ:СС арифметикой над кодами символов,
+    без построчного strptime. Возвращает массив datetime64[ns] или None, если хотя бы одно
+    значение не соответствует формату или содержит несуществующую дату"""
+    chars = np.array(values if isinstance(values, np.ndarray) else list(values), dtype="U20")
+    codes = chars.view(np.uint32).reshape(len(chars), 20)
+    if len(chars) == 0:
+        return np.array([], dtype="datetime64[ns]")
+    digits = codes[:, DIGIT_POSITIONS].astype(np.int64) - ord("0")
+    if codes[:, 19].any() or ((digits < 0) | (digits > 9)).any():
+        return None
+    for position, separator in SEPARATORS.items():
+        if (codes[:, position] != ord(separator)).any():
+            return None
+    day, month = digits[:, 0] * 10 + digits[:, 1], digits[:, 2] * 10 + digits[:, 3]
+    year = digits[:, 4] * 1000 + digits[:, 5] * 100 + digits[:, 6] * 10 + digits[:, 7]
+    hour, minute = digits[:, 8] * 10 + digits[:, 9], digits[:, 10] * 10 + digits[:, 11]
+    second = digits[:, 12] * 10 + digits[:, 13]
+    if ((month < 1) | (month > 12) | (day < 1) | (hour > 23) | (minute > 59) | (second > 59)).any():
+        return None
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+    if (days.astype("datetime64[M]") != months).any():
+        return None
+    seconds = (hour * 3600 + minute * 60 + second).astype("timedelta64[s]")
+    return cast(np.ndarray, (days + seconds).astype("datetime64[ns]"))
+
+
+def parse_operation_dates(values: Iterable) -> np.ndarray:
+    """Функция разбирает колонку "Дата операции" в массив datetime64[ns].
+    Значения, не соответствующие формату ДД.ММ.ГГГГ ЧЧ:ММ:СС, разбираются
+    в режиме dayfirst, нераспознанные значения становятся NaT"""
+    series = pd.Series(values, dtype=object)
+    dates_array = parse_fixed_width_dates(series.to_numpy())
+    if dates_array is not None:
+        return dates_array
+    try:
+        dates = pd.to_datetime(series, format=DATE_FORMAT)
+    except (ValueError, TypeError):
+        dates = pd.to_datetime(series, format=DATE_FORMAT, errors="coerce")
+        unparsed = dates.isna() & series.notna()
+        if unparsed.any():
+            dates[unparsed] = pd.to_datetime(
+                series[unparsed].astype(str), format="mixed", dayfirst=True, errors="coerce"
+            )
+    return cast(np.ndarray, dates.to_numpy(dtype="datetime64[ns]"))
+
+
+class DateIndex:
+    """Индекс строк, отсортированных по дате операции. Строится один раз при загрузке
+    и отвечает на запросы по диапазону дат бинарным поиском за O(log n)"""
+
+    def __init__(self, dates: np.ndarray) -> None:
+        # сортировка устойчивая, NaT уходят в конец и в диапазоны не попадают
+        self.order = np.argsort(dates, kind="stable")
+        self.sorted_dates = dates[self.order]
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def extend(self, dates: np.ndarray, offset: int) -> None:
+        """Метод добавляет в индекс строки с номерами начиная с offset без пересортировки
+        всей истории: новые даты сортируются отдельно и вставляются слиянием. При равных
+        датах новые строки идут после прежних, как при устойчивой сортировке"""
+        order = np.argsort(dates, kind="stable")
+        new_dates = dates[order]
+        at = np.searchsorted(self.sorted_dates, new_dates, side="right")
+        self.order = np.insert(self.order, at, order + offset)
+        self.sorted_dates = np.insert(self.sorted_dates, at, new_dates)
+
+    def range_slice(self, start: np.datetime64, stop: np.datetime64) -> slice:
+        """Метод возвращает срез отсортированного индекса для полуинтервала дат [start, stop)"""
+        low = int(np.searchsorted(self.sorted_dates, start, side="left"))
+        high = int(np.searchsorted(self.sorted_dates, stop, side="left"))
+        return slice(low, max(low, high))
+
+    def positions(self, start: np.datetime64, stop: np.datetime64) -> np.ndarray:
+        """Метод возвращает номера строк с датой в полуинтервале [start, stop) в порядке файла"""
+        return np.sort(self.order[self.range_slice(start, stop)])
+
+
+class TransactionStore:
+    """Хранилище транзакций, загружаемое один раз за сеанс.
+    Содержит DataFrame с типизированными колонками (категории и номера карт - category)
+    и разобранные один раз даты операций. Функции views, services и reports
+    принимают хранилище вместо списка словарей или DataFrame"""
+
+    def __init__(self, data_frame: pd.DataFrame, version: Optional[tuple] = None) -> None:
+        frame = data_frame.reset_index(drop=True)
+        for column in CATEGORICAL_COLUMNS:
+            if column in frame.columns and frame[column].dtype == object:
+                frame[column] = frame[column].astype("category")
+        self.frame = frame
+        self.version = version
+        # ключ данных для кэшей: версия файла или уникальный номер для данных из памяти
+        self.data_key = version if version is not None else ("memory", next(_data_versions))
+        # версии месяцев (год, месяц), изменившихся после загрузки через append
+        self.month_versions: dict = {}
+        self.dates = self._parse_dates(frame)
+        self.date_index = DateIndex(self.dates)
+        self._category_cube: Optional[CategoryDayCube] = None
+        self._search_index: Optional[SearchIndex] = None
+        self._phone_index: Optional[PhoneIndex] = None
+
+    @staticmethod
+    def _parse_dates(frame: pd.DataFrame) -> np.ndarray:
+        """Метод разбирает даты операций таблицы (NaT, если колонки нет)"""
+        if "Дата операции" in frame.columns:
+            return parse_operation_dates(frame["Дата операции"])
+        return np.full(len(frame), np.datetime64("NaT"), dtype="datetime64[ns]")
+
+    def month_version(self, year: int, month: int) -> tuple:
+        """Метод возвращает версию данных месяца: меняется только при добавлении операций этого месяца"""
+        return self.data_key, self.month_versions.get((year, month), 0)
+
+    def append(self, transactions: list | pd.DataFrame) -> np.ndarray:
+        """Метод добавляет новые транзакции в конец хранилища и возвращает их номера строк.
+        Версия меняется только у месяцев добавленных операций, поэтому закэшированные
+        результаты по остальным месяцам остаются действительными. Индекс дат, куб
+        по категориям и индексы поиска (если уже построены) дополняются на месте
+        по новым строкам, без перестроения по всей истории"""
+        new_frame = pd.DataFrame(transactions).reset_index(drop=True)
+        if new_frame.empty:
+            return np.array([], dtype=np.intp)
+        new_dates = self._parse_dates(new_frame)
+        offset = len(self.frame)
+        for column in CATEGORICAL_COLUMNS:
+            categorical = column in self.frame.columns and isinstance(self.frame[column].dtype, pd.CategoricalDtype)
+            if categorical and column in new_frame.columns:
+                # к категориям добавляются только новые значения, коды прежних строк не меняются
+                values = new_frame[column].astype(object)
+                added = pd.Index(values.dropna().unique()).difference(self.frame[column].cat.categories)
+                if len(added):
+                    self.frame[column] = self.frame[column].cat.add_categories(added)
+                new_frame[column] = pd.Categorical(values, categories=self.frame[column].cat.categories)
+        frame = pd.concat([self.frame, new_frame], ignore_index=True)
+        for column in CATEGORICAL_COLUMNS:
+            if column in frame.columns and not isinstance(frame[column].dtype, pd.CategoricalDtype):
+                frame[column] = frame[column].astype("category")
+        positions = np.arange(offset, len(frame))
+        self.frame = frame
+        self.dates = np.concatenate([self.dates, new_dates])
+        self.date_index.extend(new_dates, offset)
+        missing = pd.Series(np.nan, index=new_frame.index)
+        if self._category_cube is not None:
+            self._category_cube.add(
+                new_dates, self._counted_categories(new_frame), new_frame.get("Сумма платежа", missing).to_numpy()
+            )
+        if self._search_index is not None:
+            if len(self._search_index.segments) < MAX_SEARCH_SEGMENTS:
+                self._search_index.extend_frame(new_frame, offset)
+            else:
+                self._search_index = None
+        if self._phone_index is not None:
+            self._phone_index.extend(new_frame.get("Описание", missing), offset)
+        valid = new_dates[~np.isnat(new_dates)].astype("datetime64[M]").astype(np.int64)
+        for month_number in np.unique(valid):
+            month = (int(month_number) // 12 + 1970, int(month_number) % 12 + 1)
+            self.month_versions[month] = next(_data_versions)
+        store_logger.info(f"в хранилище добавлено транзакций: {len(positions)}")
+        return positions
+
+    def high_water_mark(self) -> Optional[np.datetime64]:
+        """Метод возвращает наибольшую дату операции в хранилище (None, если дат нет)"""
+        dates = self.dates[~np.isnat(self.dates)]
+        return dates.max() if len(dates) else None
+
+    def records_at(self, moment: Optional[np.datetime64]) -> list:
+        """Метод возвращает транзакции с датой операции, равной moment; при moment=None - без даты"""
+        if moment is None:
+            return self.take(np.flatnonzero(np.isnat(self.dates)))
+        return self.take(self.between(moment, moment.astype("datetime64[ns]") + np.timedelta64(1, "ns")))
+
+    @staticmethod
+    def _counted_categories(frame: pd.DataFrame) -> pd.Series:
+        """Метод возвращает категории операций таблицы; у операций со статусом FAILED - пропуск"""
+        categories = frame.get("Категория", pd.Series(np.nan, index=frame.index))
+        if "Статус" not in frame.columns:
+            return categories
+        return categories.where(counted_mask(frame["Статус"]))
+
+    @property
+    def category_cube(self) -> CategoryDayCube:
+        """Куб сумм по категориям и дням (без операций со статусом FAILED), строится при первом обращении"""
+        if self._category_cube is None:
+            self._category_cube = CategoryDayCube(
+                self.dates, self._counted_categories(self.frame), self.column("Сумма платежа")
+            )
+        return self._category_cube
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Инвертированный индекс по описанию и категории, строится при первом обращении"""
+        if self._search_index is None:
+            self._search_index = SearchIndex.from_frame(self.frame)
+        return self._search_index
+
+    @property
+    def phone_index(self) -> PhoneIndex:
+        """Индекс номеров телефонов в описаниях, строится при первом обращении"""
+        if self._phone_index is None:
+            self._phone_index = PhoneIndex(self.column("Описание"))
+        return self._phone_index
+
+    @property
+    def phones(self) -> pd.Series:
+        """Производная колонка: номер телефона из описания в формате E.164 или NaN"""
+        return self.phone_index.phones
+
+    @classmethod
+    def from_file(cls, file_path: Optional[str] = None, use_cache: bool = True) -> "TransactionStore":
+        """Метод загружает хранилище из xlsx-файла с операциями"""
+        file_path = file_path or DEFAULT_FILE_PATH
+        store_logger.info("загрузка хранилища транзакций")
+        version = source_version(file_path)
+        store = cls(read_operations_frame(file_path, use_cache=use_cache), version=version)
+        store_logger.info(f"хранилище транзакций загружено: {len(store)} строк")
+        return store
+
+    @classmethod
+    def from_records(cls, transactions: list) -> "TransactionStore":
+        """Метод создает хранилище из списка словарей (формат make_transactions)"""
+        return cls(pd.DataFrame(transactions))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def column(self, name: str) -> pd.Series:
+        """Метод возвращает колонку хранилища; отсутствующая колонка заполняется пропусками"""
+        if name in self.frame.columns:
+            return self.frame[name]
+        return pd.Series(np.nan, index=self.frame.index)
+
+    def records(self) -> list:
+        """Метод возвращает все транзакции в виде списка словарей, как make_transactions"""
+        return cast(list, self.frame.to_dict(orient="records"))
+
+    def take(self, positions: Iterable) -> list:
+        """Метод возвращает транзакции с заданными номерами строк в виде списка словарей"""
+        return cast(list, self.frame.iloc[np.asarray(positions, dtype=np.intp)].to_dict(orient="records"))
+
+    def take_frame(self, positions: Iterable) -> pd.DataFrame:
+        """Метод возвращает копию строк с заданными номерами в виде DataFrame
+        с исходными (не category) типами колонок"""
+        result = self.frame.iloc[np.asarray(positions, dtype=np.intp)].copy()
+        for column in result.columns:
+            if isinstance(result[column].dtype, pd.CategoricalDtype):
+                result[column] = result[column].astype(object)
+        return result
+
+    def between(self, start: np.datetime64, stop: np.datetime64) -> np.ndarray:
+        """Метод возвращает номера строк с датой операции в полуинтервале [start, stop).
+        Стоимость запроса пропорциональна размеру результата, а не всей истории"""
+        return self.date_index.positions(start.astype("datetime64[ns]"), stop.astype("datetime64[ns]"))
+
+
+_current_store: Optional[TransactionStore] = None
+
+
+def get_store(file_path: Optional[str] = None) -> TransactionStore:
+    """Функция возвращает хранилище транзакций текущего сеанса. Файл загружается
+    повторно, только если изменились его путь, время изменения или размер"""
+    global _current_store
+    file_path = file_path or DEFAULT_FILE_PATH
+    if _current_store is None or _current_store.version != source_version(file_path):
+        _current_store = TransactionStore.from_file(file_path)
+    return _current_store
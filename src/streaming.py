@@ -0,0 +1,162 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import counted_mask
+from src.reports import parse_report_period
+from src.search import PhoneIndex, SearchIndex
+from src.store import parse_operation_dates
+
+streaming_logger = logging.getLogger("services_logger")
+
+DEFAULT_BATCH_SIZE = 10000
+AMOUNT_COLUMNS = ["Сумма операции", "Сумма платежа", "Кэшбэк", "MCC", "Сумма операции с округлением"]
+# целочисленные колонки выгрузки (как у pandas.read_excel): пропуск считается нулем
+INTEGER_COLUMNS = ["Бонусы (включая кэшбэк)", "Округление на инвесткопилку"]
+
+
+def _column_dtype(column: str, values: pd.Series) -> str:
+    """Функция определяет тип колонки потока один раз: суммы - float64, целочисленные колонки
+    выгрузки - int64, прочие колонки - по первому пакету (числа - float64, иначе - object)"""
+    if column in AMOUNT_COLUMNS:
+        return "float64"
+    if column in INTEGER_COLUMNS:
+        return "int64"
+    present = values.dropna()
+    if len(present) and pd.api.types.is_numeric_dtype(present.infer_objects()):
+        return "float64"
+    return "object"
+
+
+def _typed_batch(batch: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """Функция приводит типы колонок пакета к схеме потока dtypes: пустые ячейки - NaN,
+    суммы - float64, целочисленные колонки - int64. Тип новой колонки определяется
+    по первому пакету, в котором она встретилась, и дальше не меняется, поэтому типы
+    колонок одинаковы во всех пакетах независимо от пропусков в отдельном пакете"""
+    for column in batch.columns:
+        if column not in dtypes:
+            dtypes[column] = _column_dtype(column, batch[column])
+        dtype = dtypes[column]
+        if dtype == "object":
+            values = batch[column].to_numpy(dtype=object, copy=True)
+            values[pd.isna(values)] = np.nan
+            batch[column] = values
+        elif dtype == "int64":
+            batch[column] = pd.to_numeric(batch[column], errors="coerce").fillna(0).astype(np.int64)
+        else:
+            batch[column] = pd.to_numeric(batch[column], errors="coerce").astype(np.float64)
+    return batch
+
+
+def _iter_xlsx_batches(file_path: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    """Функция читает xlsx-файл построчно (режим read_only openpyxl) и возвращает пакеты строк"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) for name in header]
+        dtypes: dict = {}
+        batch_rows = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch_rows.append(row)
+            if len(batch_rows) >= batch_size:
+                yield _typed_batch(pd.DataFrame.from_records(batch_rows, columns=columns), dtypes)
+                batch_rows = []
+        if batch_rows:
+            yield _typed_batch(pd.DataFrame.from_records(batch_rows, columns=columns), dtypes)
+    finally:
+        workbook.close()
+
+
+def _iter_parquet_batches(file_path: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    """Функция читает parquet-файл по пакетам строк (нужен pyarrow)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("для чтения parquet-файлов установите pyarrow") from e
+    parquet_file = pq.ParquetFile(file_path)
+    dtypes: dict = {}
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield _typed_batch(record_batch.to_pandas(), dtypes)
+
+
+def iter_operation_batches(file_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+    """Функция читает файл с операциями (xlsx, csv или parquet) пакетами по batch_size строк
+    и возвращает генератор DataFrame с одинаковыми типами колонок. В памяти одновременно
+    находится только один пакет, поэтому размер файла не ограничен объемом памяти"""
+    extension = os.path.splitext(file_path)[1].lower()
+    streaming_logger.info(f"потоковое чтение файла {os.path.basename(file_path)} пакетами по {batch_size} строк")
+    if extension == ".xlsx":
+        yield from _iter_xlsx_batches(file_path, batch_size)
+    elif extension == ".csv":
+        dtypes: dict = {}
+        for chunk in pd.read_csv(file_path, chunksize=batch_size):
+            yield _typed_batch(chunk, dtypes)
+    elif extension == ".parquet":
+        yield from _iter_parquet_batches(file_path, batch_size)
+    else:
+        raise ValueError(f"неподдерживаемый формат файла: {extension}")
+
+
+def iter_transactions(batches: Iterable[pd.DataFrame]) -> Iterator[dict]:
+    """Функция превращает пакеты в поток транзакций-словарей (формат make_transactions)"""
+    for batch in batches:
+        yield from batch.to_dict(orient="records")
+
+
+def stream_filter_by_currency_month(batches: Iterable[pd.DataFrame], act_date: str) -> Iterator[dict]:
+    """Функция-генератор отбирает транзакции с начала месяца по act_date из потока пакетов.
+    Строки с неразобранной датой пропускаются. Неверная act_date вызывает ValueError"""
+    end_date = datetime.strptime(act_date, "%d.%m.%Y")
+    start_date = np.datetime64(end_date.replace(day=1), "ns")
+    stop_date = np.datetime64(end_date + timedelta(days=1), "ns")
+    for batch in batches:
+        dates = parse_operation_dates(batch["Дата операции"])
+        yield from batch[(dates >= start_date) & (dates < stop_date)].to_dict(orient="records")
+
+
+def stream_search_by_target(
+    batches: Iterable[pd.DataFrame], input_target: str | list, operator: str = "and"
+) -> Iterator[dict]:
+    """Функция-генератор возвращает транзакции, содержащие в описании или категории
+    ключевые слова (правила поиска - как в search_by_target)"""
+    keywords = [input_target] if isinstance(input_target, str) else list(input_target)
+    for batch in batches:
+        positions = SearchIndex.from_frame(batch).search(keywords, operator)
+        yield from batch.iloc[positions].to_dict(orient="records")
+
+
+def stream_search_by_phones(batches: Iterable[pd.DataFrame], phone: Optional[str] = None) -> Iterator[dict]:
+    """Функция-генератор возвращает транзакции с номерами телефонов в описании,
+    а при переданном phone - только с этим номером"""
+    for batch in batches:
+        if "Описание" not in batch.columns:
+            continue
+        phone_index = PhoneIndex(batch["Описание"])
+        positions = phone_index.rows if phone is None else phone_index.lookup(phone)
+        yield from batch.iloc[positions].to_dict(orient="records")
+
+
+def stream_spending_by_category(
+    batches: Iterable[pd.DataFrame], category: str, date: Optional[str] = None
+) -> Iterator[dict]:
+    """Функция-генератор возвращает траты по категории за три месяца до переданной даты
+    (правила отбора - как в spending_by_category)"""
+    start_date, end_date = parse_report_period(date)
+    start, stop = start_date.to_datetime64(), (end_date + pd.Timedelta(1)).to_datetime64()
+    for batch in batches:
+        dates = parse_operation_dates(batch["Дата операции"])
+        mask = (dates >= start) & (dates < stop) & (batch["Категория"] == category).to_numpy()
+        if "Статус" in batch.columns:
+            mask &= counted_mask(batch["Статус"])
+        yield from batch[mask].to_dict(orient="records")
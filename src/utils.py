@@ -1,36 +1,37 @@
+import heapq
 import logging
 import os
-from datetime import datetime
-from typing import Any, Dict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, cast
 
+import numpy as np
 import pandas as pd
-import requests
-from dotenv import load_dotenv
 
-load_dotenv()
-API_KEY = os.getenv("API_KEY_STOCKS")
+from src.aggregates import counted_mask
+from src.cache import read_operations_frame
+from src.engine import get_operations_table
+from src.market import MarketDataClient, get_api_key
+from src.records import compact_transactions
+from src.sqlite_store import SqliteStore
+from src.store import TransactionStore, parse_fixed_width_dates
 
-log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "logs")
-os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, "utils_logs.log")
 utils_logger = logging.getLogger("services_logger")
-utils_logger.setLevel(logging.DEBUG)
-file_handler = logging.FileHandler(log_file, mode="w", encoding="utf-8")
-file_formatter = logging.Formatter("%(asctime)s %(filename)s %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-utils_logger.addHandler(file_handler)
 
 
-def make_transactions(file_path: str | None = None) -> Any:
+def make_transactions(file_path: str | None = None, use_cache: bool = True, compact: bool = False) -> Any:
     """Функция, считывающая транзакции из xlsx-файла и возвращающая
-    их в виде списка словарей python"""
+    их в виде списка словарей python. Повторные чтения того же файла
+    обслуживаются из колоночного кэша (см. src.cache). При compact=True
+    возвращает список компактных записей Transaction (см. src.records)"""
     if not file_path:
         utils_logger.info("поиск файла со списком операций")
         file_dir = os.path.dirname(os.path.abspath(__file__))
         file_path = os.path.join(file_dir, "..", "data", "operations.xlsx")
     try:
         utils_logger.info("формирование списка операций")
-        data_frame = pd.read_excel(file_path)
+        data_frame = read_operations_frame(file_path, use_cache=use_cache)
+        if compact:
+            return compact_transactions(data_frame)
         data_xlsx = data_frame.to_dict(orient="records")
         return data_xlsx
     except FileNotFoundError:
@@ -41,44 +42,113 @@ def make_transactions(file_path: str | None = None) -> Any:
         print("Данные имеют неверный формат!")
 
 
-def filter_by_currency_month(transactions: list, act_date: str) -> list:
+def parse_operation_days(values: list) -> np.ndarray:
+    """Функция разбирает даты операций одним векторизованным вызовом.
+    Если строки не соответствуют формату ДД.ММ.ГГГГ ЧЧ:ММ:СС, разбирается
+    только дата до первого пробела. Неверные даты вызывают ValueError"""
+    dates = parse_fixed_width_dates(values)
+    if dates is not None:
+        return dates
+    series = pd.Series(values, dtype=object)
+    return cast(np.ndarray, pd.to_datetime(series.str.split(n=1).str[0], format="%d.%m.%Y").to_numpy())
+
+
+def filter_by_currency_month(transactions: list | TransactionStore | SqliteStore, act_date: str) -> list:
     """Функция отбирает транзакции за текущий месяц"""
     utils_logger.info("отбор транзакций за выбранный период")
     try:
         end_date = datetime.strptime(act_date, "%d.%m.%Y")
-        start_date = end_date.replace(day=1)
-        filtered_by_month_transactions = []
-        for t in transactions:
-            t_date = datetime.strptime(t.get("Дата операции", "01.01.2000").split()[0], "%d.%m.%Y")
-            if start_date <= t_date <= end_date:
-                filtered_by_month_transactions.append(t)
-        transactions = filtered_by_month_transactions
+        start_date = np.datetime64(end_date.replace(day=1))
+        stop_date = np.datetime64(end_date + timedelta(days=1))
+        if isinstance(transactions, TransactionStore):
+            # даты в хранилище разобраны один раз при загрузке
+            positions = transactions.between(start_date, stop_date)
+            utils_logger.info("список транзакций за выбранный период успешно сформирован")
+            return transactions.take(positions)
+        if isinstance(transactions, SqliteStore):
+            # строки месяца выбираются запросом по индексу дат
+            month_transactions = transactions.period(start_date, stop_date).records()
+            utils_logger.info("список транзакций за выбранный период успешно сформирован")
+            return month_transactions
+        dates = parse_operation_days([t.get("Дата операции", "01.01.2000") for t in transactions])
+        positions = np.flatnonzero((dates >= start_date) & (dates < stop_date))
         utils_logger.info("список транзакций за выбранный период успешно сформирован")
-        return transactions
+        return [transactions[i] for i in positions]
     except ValueError:
         utils_logger.error("Ошибка! Транзакции за выбранный период отсутствуют")
         return []
 
 
-def get_top_transactions(transactions: list) -> dict:
-    """Функция вычисляет ТОП-5 транзакций по сумме"""
-    utils_logger.info("отбор ТОП-5 транзакций за выбранный период")
-    transactions_df = pd.DataFrame(transactions)
-    top_df = transactions_df.sort_values(by="Сумма платежа", ascending=False, key=lambda x: abs(x)).head(5)
-    formatted_transactions = []
-    for _, row in top_df.iterrows():
-        formatted_transactions.append(
-            {
-                "date": row["Дата операции"].split()[0],
-                "amount": float(row["Сумма платежа"]),
-                "category": row["Категория"],
-                "description": row["Описание"],
-            }
-        )
-    utils_logger.info("ТОП-5 транзакций за выбранный период сформирован")
+def _top_key(transaction: dict) -> float:
+    """Ключ отбора ТОП-транзакций: модуль суммы платежа, пропуски - в конце"""
+    amount = transaction.get("Сумма платежа", np.nan)
+    return -np.inf if pd.isna(amount) else abs(amount)
+
+
+def _format_top_transaction(transaction: dict) -> dict:
+    """Функция формирует описание транзакции для блока ТОП-транзакций"""
+    return {
+        "date": transaction["Дата операции"].split()[0],
+        "amount": float(transaction.get("Сумма платежа", np.nan)),
+        "category": transaction.get("Категория", np.nan),
+        "description": transaction.get("Описание", np.nan),
+    }
+
+
+def get_top_transactions(
+    transactions: Iterable | TransactionStore | SqliteStore, n: int = 5, rows: Optional[np.ndarray] = None
+) -> dict:
+    """Функция вычисляет ТОП-N (по умолчанию ТОП-5) транзакций по модулю суммы платежа.
+    Принимает список, генератор транзакций или хранилище; отбор выполняется
+    за один проход частичной выборкой, без сортировки всех транзакций.
+    Для TransactionStore rows - возрастающие номера строк, среди которых выбирается ТОП"""
+    utils_logger.info(f"отбор ТОП-{n} транзакций за выбранный период")
+    if isinstance(transactions, TransactionStore):
+        amounts = transactions.column("Сумма платежа").to_numpy(dtype=np.float64)
+        amounts = np.abs(amounts if rows is None else amounts[rows])
+        amounts[np.isnan(amounts)] = -np.inf
+        positions = np.arange(len(amounts))
+        if 0 < n < len(amounts):
+            # берутся все строки не меньше N-й суммы: при равных суммах на границе отбора
+            # argpartition выбирает строки произвольно, а нужны более ранние
+            threshold = -np.partition(-amounts, n - 1)[n - 1]
+            positions = np.flatnonzero(amounts >= threshold)
+        # при равных суммах транзакции идут в порядке файла
+        positions = positions[np.lexsort((positions, -amounts[positions]))][: max(n, 0)]
+        top = transactions.take(positions if rows is None else rows[positions])
+    elif isinstance(transactions, SqliteStore):
+        top = transactions.top_records(n)
+    else:
+        top = heapq.nlargest(n, transactions, key=_top_key)
+    formatted_transactions = [_format_top_transaction(transaction) for transaction in top]
+    utils_logger.info(f"ТОП-{n} транзакций за выбранный период сформирован")
     return {"top_transactions": formatted_transactions}
 
 
+def get_top_transactions_by(transactions: Iterable, group_by: str = "Номер карты", n: int = 5) -> dict:
+    """Функция вычисляет ТОП-N транзакций отдельно для каждой карты (group_by="Номер карты")
+    или категории (group_by="Категория") за один проход по транзакциям.
+    Возвращает словарь {значение группы: список ТОП-транзакций}"""
+    utils_logger.info(f"отбор ТОП-{n} транзакций в разрезе '{group_by}'")
+    heaps: dict = {}
+    for sequence, transaction in enumerate(transactions):
+        group = transaction.get(group_by, np.nan)
+        group = "----" if pd.isna(group) else group
+        # в куче хранится (ключ, -порядковый номер): при равных суммах остаются более ранние транзакции
+        item = (_top_key(transaction), -sequence, transaction)
+        heap = heaps.setdefault(group, [])
+        if len(heap) < n:
+            heapq.heappush(heap, item)
+        elif n > 0 and item > heap[0]:
+            heapq.heapreplace(heap, item)
+    top_by_group = {
+        group: [_format_top_transaction(item[2]) for item in sorted(heap, reverse=True)]
+        for group, heap in sorted(heaps.items())
+    }
+    utils_logger.info(f"ТОП-{n} транзакций в разрезе '{group_by}' сформирован")
+    return top_by_group
+
+
 def filtered_by_card_number(transactions: list) -> list[Dict]:
     """Функция сортирует транзакции по номеру карты"""
     utils_logger.info("отбор транзакций по номеру карты")
@@ -95,7 +165,7 @@ def filtered_by_card_number(transactions: list) -> list[Dict]:
 def get_card_info(transactions: list) -> list:
     """Функция получает выводимую информацию: номер карты,
     сумму расходов за текущий месяц, включая дату, указанную в запросе,
-    начисленный кешбэк"""
+    начисленный кешбэк. Операции со статусом FAILED не учитываются"""
     utils_logger.info("запрос формирования информации по картам за выбранный период")
     cards = []
     for item in transactions:
@@ -103,6 +173,8 @@ def get_card_info(transactions: list) -> list:
         cards.append(card)
         card["last_digits"] = item.get("Номер карты")[1:]
         transactions_df = pd.DataFrame(item.get("Транзакции"))
+        if "Статус" in transactions_df.columns:
+            transactions_df = transactions_df[counted_mask(transactions_df["Статус"])]
         payments = float(
             round((transactions_df["Сумма платежа"][transactions_df["Сумма платежа"] < 0].sum()) * (-1), 2)
         )
@@ -114,13 +186,55 @@ def get_card_info(transactions: list) -> list:
     return cards
 
 
-def get_exchange_rate(currency_op: list, currency_main: str) -> list:
-    """Функция запрашивает курс заданной валюты к валюте счета пользователя"""
+def get_cards_summary(
+    transactions: Iterable | pd.DataFrame | TransactionStore | SqliteStore,
+    with_count: bool = False,
+    start: object = None,
+    stop: object = None,
+) -> list:
+    """Функция за один векторизованный проход считает по каждой карте сумму расходов
+    (модуль суммы отрицательных платежей) и кешбэк, а при with_count=True - и число транзакций.
+    Операции со статусом FAILED не учитываются. start и stop ограничивают период [start, stop)
+    дат операций. Возвращает тот же список карт, что и get_card_info(filtered_by_card_number(...))"""
+    utils_logger.info("формирование информации по картам за выбранный период")
+    if isinstance(transactions, SqliteStore):
+        if start is not None or stop is not None:
+            transactions = transactions.period(start, stop)
+        # агрегаты считаются в базе запросом с группировкой по карте
+        summary = transactions.cards_summary(with_count)
+        utils_logger.info("информация по картам за выбранный период успешно сформирована")
+        return summary
+    # группы считаются движком агрегатов по целым кодам карт, без операций со статусом FAILED;
+    # строки периода хранилища отбираются индексом дат таблицы движка
+    groups = get_operations_table(transactions).aggregate(["card"], start=start, stop=stop)
+    summary = []
+    for group in sorted(groups, key=lambda item: item["card"] or "----"):
+        card = {
+            "last_digits": (group["card"] or "----")[1:],
+            "total_spent": group["spent"],
+            "cashback": group["cashback"],
+        }
+        if with_count:
+            card["transactions"] = group["operations"]
+        summary.append(card)
+    utils_logger.info("информация по картам за выбранный период успешно сформирована")
+    return summary
+
+
+def get_exchange_rate(currency_op: list, currency_main: str, client: Optional[MarketDataClient] = None) -> list:
+    """Функция запрашивает курс заданной валюты к валюте счета пользователя.
+    Если передан клиент MarketDataClient, все валюты запрашиваются пакетно и параллельно"""
     utils_logger.info("запрос информации по курсам валют")
+    if client is not None:
+        currency_rates = client.exchange_rates(currency_op, currency_main)
+        utils_logger.info("доступная информация по курсам валют получена")
+        return currency_rates
+    import requests
+
     currency_rates = []
     url = "https://api.twelvedata.com/exchange_rate"
     for item in currency_op:
-        params = {"symbol": f"{item}/{currency_main}", "apikey": API_KEY}
+        params = {"symbol": f"{item}/{currency_main}", "apikey": get_api_key()}
         response = requests.get(url, params=params)
         response.raise_for_status()
         data = response.json()
@@ -132,15 +246,22 @@ def get_exchange_rate(currency_op: list, currency_main: str) -> list:
     return currency_rates
 
 
-def get_stocks_rates(stocks: list) -> list:
-    """Функция запрашивает актуальный курс выбранных акций из индекса S&P500"""
+def get_stocks_rates(stocks: list, client: Optional[MarketDataClient] = None) -> list:
+    """Функция запрашивает актуальный курс выбранных акций из индекса S&P500.
+    Если передан клиент MarketDataClient, все акции запрашиваются пакетно и параллельно"""
     utils_logger.info("запрос информации по котировкам акций")
+    if client is not None:
+        stocks_rates = client.stock_prices(stocks)
+        utils_logger.info("доступная информация по котировкам акций получена")
+        return stocks_rates
+    import requests
+
     stocks_rates = []
     url = "https://api.twelvedata.com/price"
     for item in stocks:
         stock_info = {}
         stock_info["stock"] = item
-        params = {"symbol": item, "apikey": API_KEY}
+        params = {"symbol": item, "apikey": get_api_key()}
         response = requests.get(url, params=params)
         response.raise_for_status()
         data = response.json()
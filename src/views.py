@@ -1,96 +1,124 @@
 import json
 import logging
 import os.path
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional, cast
 
-from dotenv import load_dotenv
+import numpy as np
 
+from src.dashboard import dashboard_cache, dashboard_key
+from src.market import MarketDataClient, get_market_client
+from src.prompts import prompt_act_datetime
+from src.sqlite_store import SqliteStore
+from src.store import TransactionStore
 from src.utils import (
     filter_by_currency_month,
-    filtered_by_card_number,
-    get_card_info,
+    get_cards_summary,
     get_exchange_rate,
     get_stocks_rates,
     get_top_transactions,
     make_transactions,
 )
 
-load_dotenv()
-API_KEY = os.getenv("API_KEY_STOCKS")
-
-log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "logs")
-os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, "views_logs.log")
 views_logger = logging.getLogger("services_logger")
-views_logger.setLevel(logging.DEBUG)
-file_handler = logging.FileHandler(log_file, mode="w", encoding="utf-8")
-file_formatter = logging.Formatter("%(asctime)s %(filename)s %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-views_logger.addHandler(file_handler)
 
 
-def main_views() -> str:
-    """Функция принимает на вход строку с датой и временем в формате
-    YYYY-MM-DD HH:MM:SS и возвращает JSON-ответ со следующими данными:
+def transaction_sections(transactions: list | TransactionStore | SqliteStore, act_date: datetime) -> dict:
+    """Функция вычисляет разделы ответа по транзакциям месяца до act_date: карты и топ транзакций.
+    Для хранилищ разделы считаются без выборки транзакций месяца в список: для SqliteStore -
+    запросами к базе за период, для TransactionStore - по диапазону строк индекса дат"""
+    if isinstance(transactions, TransactionStore):
+        start, stop = np.datetime64(act_date.replace(day=1)), np.datetime64(act_date + timedelta(days=1))
+        return {
+            "cards": get_cards_summary(transactions, start=start, stop=stop),
+            "top_transactions": get_top_transactions(transactions, rows=transactions.between(start, stop)),
+        }
+    month_transactions: list | SqliteStore
+    if isinstance(transactions, SqliteStore):
+        month_transactions = transactions.period(act_date.replace(day=1), act_date + timedelta(days=1))
+    else:
+        month_transactions = filter_by_currency_month(transactions, act_date.strftime("%d.%m.%Y"))
+    return {
+        "cards": get_cards_summary(month_transactions),
+        "top_transactions": get_top_transactions(month_transactions),
+    }
+
+
+def get_greeting(hour: int) -> str:
+    """Функция возвращает приветствие в зависимости от часа"""
+    if 6 <= hour < 11:
+        return "Доброе утро!"
+    elif 11 <= hour < 17:
+        return "Добрый день!"
+    elif 17 <= hour < 23:
+        return "Добрый вечер!"
+    return "Доброй ночи!"
+
+
+def load_user_settings(file_path: Optional[str] = None) -> dict:
+    """Функция читает пользовательские настройки отображения курсов валют и котировок"""
+    if file_path is None:
+        file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "user_settings.json")
+    with open(file_path, "r", encoding="utf-8") as file:
+        return cast(dict, json.load(file))
+
+
+def build_dashboard(
+    act_datetime: datetime,
+    transactions: list | TransactionStore | SqliteStore,
+    settings: Optional[dict] = None,
+    market_client: Optional[MarketDataClient] = None,
+) -> dict:
+    """Функция формирует данные Главной страницы без обращения к вводу пользователя:
     приветствие, информация о каждой карте, сумме расходов и кешбэка за месяц,
-    курсы валют, котировки акций"""
-    views_logger.info("запуск приложения...")
-    # создаем словарь для будущего JSON-ответа
-    data = {}
-    views_logger.info("запрос даты и времени для обработки")
-    correct_act_date = None
-    while not correct_act_date:
-        views_logger.info("запрос даты для анализа данных")
-        act_date = input("Введите дату и время в формате ДД.ММ.ГГГГ ЧЧ:ММ:СС: ")
-        try:
-            correct_act_date = datetime.strptime(act_date[:10], "%d.%m.%Y")
-            act_time = int(act_date[11:13])
-            if 6 <= act_time < 11:
-                data["greeting"] = "Доброе утро!"
-            elif 11 <= act_time < 17:
-                data["greeting"] = "Добрый день!"
-            elif 17 <= act_time < 23:
-                data["greeting"] = "Добрый вечер!"
-            else:
-                data["greeting"] = "Доброй ночи!"
-        except ValueError:
-            views_logger.error("ошибка: получены некорректные данные")
-            print("Формат данных не соответствует запросу!")
-    # запуск функции для чтения файла xlsx
-    transactions = make_transactions()
+    топ транзакций, а при переданных настройках - курсы валют и котировки акций.
+    Для хранилища транзакций разделы по транзакциям берутся из кэша главной страницы"""
+    data: dict = {"greeting": get_greeting(act_datetime.hour)}
+    act_date = act_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
     # проверяем, удалось ли прочитать файл xlsx
-    if not transactions or not isinstance(transactions, list) or len(transactions) == 0:
+    stores = (TransactionStore, SqliteStore)
+    if not transactions or not isinstance(transactions, (list, *stores)) or len(transactions) == 0:
         views_logger.warning("предупреждение: транзакции для обработки не найдены")
         data["Ошибка"] = "Не удалось получить данные о транзакциях"
+    # проверяем, есть ли в файле данные за выбранный период
+    elif not datetime(2018, 1, 1) < act_date < datetime(2021, 12, 31):
+        # если данных за период нет, добавляем в ответ сообщение об ошибке
+        views_logger.warning("предупреждение: транзакции за выбранный период отсутствуют")
+        data["Ошибка"] = "Данные о транзакциях за период отсутствуют"
+    elif isinstance(transactions, TransactionStore):
+        # разделы по транзакциям кэшируются по версии данных месяца и дате
+        data.update(
+            dashboard_cache.get_or_compute(
+                dashboard_key(transactions, act_date), lambda: transaction_sections(transactions, act_date)
+            )
+        )
     else:
-        # проверяем, есть ли в файле данные за выбранный период
-        if (
-            not datetime.strptime("01.01.2018", "%d.%m.%Y")
-            < correct_act_date
-            < datetime.strptime("31.12.2021", "%d.%m.%Y")
-        ):
-            # если данных за период нет, добавляем в ответ сообщение об ошибке
-            views_logger.warning("предупреждение: транзакции за выбранный период отсутствуют")
-            data["Ошибка"] = "Данные о транзакциях за период отсутствуют"
-        else:
-            # если данные за период получены, производим обработку
-            act_date = correct_act_date.strftime("%d.%m.%Y")
-            transactions = filter_by_currency_month(transactions, act_date)
-            data["cards"] = get_card_info(filtered_by_card_number(transactions))   # list
-            data["top_transactions"] = get_top_transactions(transactions)   #dict
+        data.update(transaction_sections(transactions, act_date))
+    if settings is not None:
+        market_client = market_client or get_market_client()
+        data["currency_rates"] = get_exchange_rate(
+            settings["user_currencies"], settings["user_main_currency"], client=market_client
+        )
+        data["stock_prices"] = get_stocks_rates(settings["user_stocks"], client=market_client)
+    return data
+
+
+def main_views(store: Optional[TransactionStore | SqliteStore] = None, act_datetime: Optional[datetime] = None) -> str:
+    """Функция принимает на вход строку с датой и временем в формате
+    ДД.ММ.ГГГГ ЧЧ:ММ:СС и возвращает JSON-ответ со следующими данными:
+    приветствие, информация о каждой карте, сумме расходов и кешбэка за месяц,
+    курсы валют, котировки акций. Если передано хранилище транзакций,
+    файл с операциями повторно не читается; если передана дата, она не запрашивается"""
+    views_logger.info("запуск приложения...")
+    if act_datetime is None:
+        act_datetime = prompt_act_datetime()
+    # запуск функции для чтения файла xlsx, если хранилище транзакций не передано
+    transactions = store if store is not None else make_transactions()
     # независимо от распакованных данных о транзакциях запрашиваем информацию о валюте и акциях
     views_logger.info("запрос пользовательских настроек по отображению курсов валют и котировок")
-    dir_path = os.path.dirname(os.path.abspath(__file__))
-    user_settings_path = os.path.join(dir_path, "..", "user_settings.json")
-    with open(user_settings_path, "r", encoding="utf-8") as file:
-        settings = json.load(file)
-        currency_op = settings["user_currencies"]
-        currency_main = settings["user_main_currency"]
-        stocks = settings["user_stocks"]
-        data["currency_rates"] = get_exchange_rate(currency_op, currency_main)    #list
-        data["stock_prices"] = get_stocks_rates(stocks)    #list
+    settings = load_user_settings()
+    data = build_dashboard(act_datetime, transactions, settings)
     views_logger.info("формирование ответа на запрос")
     json_response = json.dumps(data, ensure_ascii=False)
     views_logger.info("Ответ сформирован")
     return json_response
-
@@ -1,7 +1,19 @@
 
 
+from pathlib import Path
+
 import pytest
 
+import src.cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Фикстура, направляющая колоночный кэш операций во временную папку теста"""
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setattr(src.cache, "CACHE_DIR", cache_dir)
+    return cache_dir
+
 
 @pytest.fixture
 def get_transactions() -> list:
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from src.aggregates import CategoryDayCube, to_kopecks
+
+
+def test_to_kopecks() -> None:
+    """Тест для перевода сумм в копейки - округление и пропуски"""
+    assert to_kopecks(np.array([-160.89, 0.1 + 0.2, np.nan])).tolist() == [-16089, 30, 0]
+
+
+def test_category_day_cube() -> None:
+    """Тест для куба сумм по категориям и дням - суммы и количество операций за период"""
+    dates = np.array(
+        ["2023-03-01T12:00", "2023-03-02T10:00", "2023-03-02T11:00", "2023-03-05T00:00", "NaT"],
+        dtype="datetime64[ns]",
+    )
+    categories = pd.Series(["Еда", "Еда", "Транспорт", "Еда", "Еда"])
+    amounts = np.array([-100.5, -20.25, -40.0, -1.0, -1000.0])
+    cube = CategoryDayCube(dates, categories, amounts)
+    assert cube.total("Еда", np.datetime64("2023-03-01"), np.datetime64("2023-03-03")) == (-12075, 2)
+    assert cube.total("Еда", np.datetime64("2023-01-01"), np.datetime64("2024-01-01")) == (-12175, 3)
+    assert cube.total("Еда", np.datetime64("2023-03-02"), np.datetime64("2023-03-02")) == (0, 0)
+    assert cube.total("Транспорт", np.datetime64("2023-03-02"), np.datetime64("2023-03-03")) == (-4000, 1)
+    assert cube.total("Связь", np.datetime64("2023-03-01"), np.datetime64("2023-03-03")) == (0, 0)
+
+
+def test_category_day_cube_empty() -> None:
+    """Тест для куба сумм по категориям и дням - нет ни одной операции с датой и категорией"""
+    cube = CategoryDayCube(np.array([], dtype="datetime64[ns]"), pd.Series([], dtype=object), np.array([]))
+    assert cube.total("Еда", np.datetime64("2023-03-01"), np.datetime64("2023-03-03")) == (0, 0)
@@ -0,0 +1,103 @@
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.api import handle_request, read_requests, run_batch
+from src.store import TransactionStore
+
+
+@pytest.fixture
+def store(get_transactions_2: list) -> TransactionStore:
+    """Фикстура, возвращающая хранилище с транзакциями get_transactions_2 (с кэшбэком)"""
+    for transaction in get_transactions_2:
+        transaction["Кэшбэк"] = 1.0
+    return TransactionStore.from_records(get_transactions_2)
+
+
+def test_handle_request_dashboard(store: TransactionStore) -> None:
+    """Тест для функции handle_request - Главная страница без обращения к input и без курсов"""
+    with patch("builtins.input") as mock_input:
+        response = handle_request({"id": 1, "type": "dashboard", "datetime": "15.01.2018 07:00:00"}, store)
+    mock_input.assert_not_called()
+    assert response["id"] == 1
+    assert response["result"]["greeting"] == "Доброе утро!"
+    assert [card["last_digits"] for card in response["result"]["cards"]] == ["4556", "5441"]
+    assert "currency_rates" not in response["result"]
+
+
+def test_handle_request_search_and_phones(store: TransactionStore) -> None:
+    """Тест для функции handle_request - поиск по словам и по номеру телефона"""
+    response = handle_request({"type": "search", "query": "отеля ИЛИ покупок"}, store)
+    assert [row["Описание"] for row in response["result"]] == ["Оплата покупок", "Оплата отеля"]
+    response = handle_request({"type": "search", "keywords": ["оплата", "отеля"], "operator": "and"}, store)
+    assert len(response["result"]) == 1
+    response = handle_request({"type": "phones", "phone": "+7 921 111-22-33"}, store)
+    assert response["result"] == {"Результаты поиска": "Ничего не нашлось"}
+
+
+def test_handle_request_report(store: TransactionStore) -> None:
+    """Тест для функции handle_request - отчет по категории без файла и с файлом"""
+    request = {"type": "report", "category": "Путешествия", "date": "01.02.2018"}
+    with patch("src.reports.write_report") as mock_write:
+        response = handle_request(request, store)
+    mock_write.assert_not_called()
+    assert response["result"] == {"category": "Путешествия", "total": -87068.0, "transactions": 1, "file": None}
+    with patch("src.reports.write_report") as mock_write:
+        response = handle_request({**request, "file": "travel.json"}, store)
+    assert mock_write.call_args.args[1].endswith("travel.json")
+    assert response["result"]["file"] == "travel.json"
+
+
+@pytest.mark.parametrize(
+    "request_data, error",
+    [
+        ({"type": "unknown"}, "неизвестный тип запроса: unknown"),
+        ({"type": "dashboard"}, "не задано поле datetime"),
+        (
+            {"type": "dashboard", "datetime": "32.01.2018 12:00:00"},
+            "неверный формат даты и времени: 32.01.2018 12:00:00",
+        ),
+        ({"type": "report", "category": "Кафе", "date": "32.01.2018"}, "неверный формат даты: 32.01.2018"),
+        ({"type": "search", "keywords": ["кафе"], "operator": "xor"}, "неизвестный оператор поиска: xor"),
+        (
+            {"type": "report", "category": "Кафе", "file": "/tmp/escaped_report.json"},
+            "недопустимое имя файла отчета: /tmp/escaped_report.json",
+        ),
+        (
+            {"type": "report", "category": "Кафе", "file": "reports/report.json"},
+            "недопустимое имя файла отчета: reports/report.json",
+        ),
+        (
+            {"type": "report", "category": "Кафе", "file": "../escaped_report.json"},
+            "недопустимое имя файла отчета: ../escaped_report.json",
+        ),
+    ],
+)
+def test_handle_request_errors(store: TransactionStore, request_data: dict, error: str) -> None:
+    """Тест для функции handle_request - ошибка в запросе возвращается в ответе"""
+    with patch("builtins.input") as mock_input:
+        response = handle_request(request_data, store)
+    mock_input.assert_not_called()
+    assert response["error"] == error
+    assert "result" not in response
+
+
+def test_read_requests() -> None:
+    """Тест для функции read_requests - пустые строки пропускаются, неверные строки помечаются"""
+    lines = ['{"id": 1, "type": "phones"}\n', "\n", "не json\n", "[1, 2]\n"]
+    assert list(read_requests(lines)) == [{"id": 1, "type": "phones"}, {"invalid_line": 3}, {"invalid_line": 4}]
+
+
+def test_run_batch(store: TransactionStore) -> None:
+    """Тест для функции run_batch - ответы по одному на строку в порядке запросов"""
+    input_file = io.StringIO(
+        '{"id": "a", "type": "search", "query": "отеля"}\nне json\n{"id": "c", "type": "phones"}\n'
+    )
+    output_file = io.StringIO()
+    stats = run_batch(input_file, output_file, store)
+    responses = [json.loads(line) for line in output_file.getvalue().splitlines()]
+    assert stats == {"requests": 3, "errors": 1}
+    assert [response["id"] for response in responses] == ["a", None, "c"]
+    assert responses[1]["error"] == "строка 2: запрос должен быть объектом JSON"
@@ -0,0 +1,69 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.batch_reports import report_file_name, run_report_batch
+from src.reports import spending_by_category
+from src.store import TransactionStore
+from src.streaming import stream_spending_by_category
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_run_report_batch(tmp_path: str, get_transactions_2: list, processes: int) -> None:
+    """Тест для пакетного формирования отчетов - по файлу на задачу, результат как у spending_by_category"""
+    store = TransactionStore.from_records(get_transactions_2)
+    jobs = [
+        ("Путешествия", "01.02.2018"),
+        ("Супермаркеты", "01.02.2018"),
+        ("Такси", "01.02.2018"),
+        ("Путешествия", "32.01.2018"),
+    ]
+    output_dir = os.path.join(tmp_path, "reports")
+    results = run_report_batch(store, jobs, output_dir, processes=processes)
+    assert [result.get("transactions") for result in results] == [1, 1, 0, None]
+    assert results[3]["error"] == "неверный формат даты"
+    for result, (category, date) in zip(results[:3], jobs):
+        with open(result["file"], "r", encoding="utf-8") as file:
+            report = json.load(file)
+        expected = spending_by_category.__wrapped__(store, category, date).to_dict(orient="records")
+        assert report == json.loads(json.dumps(expected, ensure_ascii=False))
+    assert sorted(os.listdir(output_dir)) == sorted(os.path.basename(result["file"]) for result in results[:3])
+
+
+def test_report_paths_skip_failed(tmp_path: str, get_transactions_2: list) -> None:
+    """Тест для отчета по категории - операции со статусом FAILED не попадают в отчет
+    ни в spending_by_category, ни в потоковом, ни в пакетном формировании"""
+    transactions = [dict(transaction, **{"Статус": "OK"}) for transaction in get_transactions_2]
+    failed = {"Дата операции": "20.01.2018 10:00:00", "Сумма платежа": -10.0, "Категория": "Супермаркеты"}
+    transactions.append(dict(failed, **{"Статус": "FAILED"}))
+    store = TransactionStore.from_records(transactions)
+    expected = spending_by_category.__wrapped__(store, "Супермаркеты", "01.02.2018")
+    assert expected["Сумма платежа"].tolist() == [-567.53]
+    streamed = stream_spending_by_category([pd.DataFrame(transactions)], "Супермаркеты", "01.02.2018")
+    assert [item["Сумма платежа"] for item in streamed] == [-567.53]
+    results = run_report_batch(store, [("Супермаркеты", "01.02.2018")], os.path.join(tmp_path, "reports"), processes=1)
+    with open(results[0]["file"], "r", encoding="utf-8") as file:
+        assert [item["Сумма платежа"] for item in json.load(file)] == [-567.53]
+
+
+def test_report_file_name() -> None:
+    """Тест для имени файла отчета пакета"""
+    end_date = pd.Timestamp("2018-02-01")
+    assert report_file_name(7, "Дом и ремонт/сад", end_date) == "report_0007_Дом_и_ремонт_сад_01-02-2018.json"
+
+
+def test_run_report_batch_errors(tmp_path: str, get_transactions_2: list) -> None:
+    """Тест для пакета отчетов - дата с разделителем '/' не попадает в путь, ошибка записи
+    отчета возвращается в результате задачи, не прерывает пакет и не оставляет временных файлов"""
+    store = TransactionStore.from_records(get_transactions_2)
+    output_dir = os.path.join(tmp_path, "reports")
+    results = run_report_batch(store, [("Путешествия", "01/02/2018")], output_dir, processes=1)
+    assert os.path.dirname(results[0]["file"]) == output_dir and results[0]["transactions"] == 1
+    os.remove(results[0]["file"])
+    os.makedirs(os.path.join(results[0]["file"], "busy"))
+    results = run_report_batch(store, [("Путешествия", "01.02.2018"), ("Супермаркеты", "01.02.2018")], output_dir, 1)
+    assert "error" in results[0] and results[1]["transactions"] == 1
+    # отчет пишется атомарно: после ошибки записи временных файлов не остается
+    assert not [name for name in os.listdir(output_dir) if name.endswith(".tmp")]
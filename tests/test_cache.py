@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cache import cache_path_for, load_cached_frame, read_operations_frame, save_cached_frame
+from src.utils import make_transactions
+
+
+@pytest.fixture
+def operations_file(tmp_path: Path) -> str:
+    """Фикстура, создающая небольшой xlsx-файл с операциями"""
+    file_path = str(tmp_path / "operations.xlsx")
+    pd.DataFrame(
+        {
+            "Дата операции": ["31.12.2021 16:44:00", "30.12.2021 10:00:00", "29.12.2021 09:15:00"],
+            "Номер карты": ["*7197", np.nan, "*4556"],
+            "Сумма платежа": [-160.89, 1700.0, -64.0],
+            "Кэшбэк": [np.nan, np.nan, 1.0],
+            "Категория": ["Супермаркеты", "Пополнения", np.nan],
+            "Бонусы (включая кэшбэк)": [3, 0, 1],
+        }
+    ).to_excel(file_path, index=False)
+    return file_path
+
+
+def test_read_operations_frame_warm(operations_file: str) -> None:
+    """Тест для чтения файла с операциями - повторное чтение обслуживается из кэша"""
+    cold = read_operations_frame(operations_file)
+    with patch("pandas.read_excel") as mock_read:
+        warm = read_operations_frame(operations_file)
+    mock_read.assert_not_called()
+    pd.testing.assert_frame_equal(cold, warm)
+    pd.testing.assert_frame_equal(warm, pd.read_excel(operations_file))
+
+
+def test_read_operations_frame_invalidated(operations_file: str) -> None:
+    """Тест для чтения файла с операциями - изменение файла делает кэш неактуальным"""
+    read_operations_frame(operations_file)
+    old_cache = cache_path_for(operations_file)
+    pd.DataFrame({"Сумма платежа": [1.0]}).to_excel(operations_file, index=False)
+    os.utime(operations_file, ns=(0, 0))
+    assert cache_path_for(operations_file) != old_cache
+    result = read_operations_frame(operations_file)
+    assert list(result.columns) == ["Сумма платежа"]
+    assert not os.path.exists(old_cache)
+
+
+def test_save_cached_frame_mixed_types(tmp_path: Path) -> None:
+    """Тест для сохранения кэша - колонка со значениями разных типов не кэшируется"""
+    cache_path = str(tmp_path / "mixed")
+    assert not save_cached_frame(pd.DataFrame({"Категория": ["Еда", 101]}), cache_path)
+    assert load_cached_frame(cache_path) is None
+
+
+def test_make_transactions_cached(operations_file: str) -> None:
+    """Тест для функции, считывающей транзакции - результат из кэша совпадает с чтением xlsx"""
+    expected = make_transactions(operations_file, use_cache=False)
+    make_transactions(operations_file)
+    assert str(make_transactions(operations_file)) == str(expected)
@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+from unittest.mock import mock_open, patch
+
+import pytest
+
+from src.dashboard import DashboardCache, dashboard_key
+from src.store import TransactionStore
+from src.utils import get_cards_summary
+from src.views import main_views, transaction_sections
+
+
+def test_dashboard_cache_lru() -> None:
+    """Тест для класса DashboardCache - попадания, копии значений и вытеснение старых записей"""
+    cache = DashboardCache(max_size=2)
+    calls = []
+
+    def compute(name: str) -> dict:
+        calls.append(name)
+        return {"cards": [name]}
+
+    assert cache.get_or_compute(("a",), lambda: compute("a")) == {"cards": ["a"]}
+    cache.get_or_compute(("a",), lambda: compute("a"))["cards"].append("изменено")
+    assert cache.get_or_compute(("a",), lambda: compute("a")) == {"cards": ["a"]}
+    cache.get_or_compute(("b",), lambda: compute("b"))
+    cache.get_or_compute(("c",), lambda: compute("c"))
+    cache.get_or_compute(("b",), lambda: compute("b"))
+    cache.get_or_compute(("a",), lambda: compute("a"))
+    assert calls == ["a", "b", "c", "a"]
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (3, 4)
+
+
+def test_dashboard_key_append(get_transactions_2: list) -> None:
+    """Тест для функции dashboard_key - добавление операций меняет ключ только своего месяца"""
+    store = TransactionStore.from_records(get_transactions_2)
+    january, march = datetime(2018, 1, 15), datetime(2018, 3, 1)
+    keys = dashboard_key(store, january), dashboard_key(store, march)
+    store.append([{"Дата операции": "02.03.2018 10:00:00", "Сумма платежа": -10.0}])
+    assert dashboard_key(store, january) == keys[0]
+    assert dashboard_key(store, march) != keys[1]
+    assert dashboard_key(TransactionStore.from_records(get_transactions_2), january) != keys[0]
+
+
+def test_main_views_dashboard_cache(get_transactions_2: list) -> None:
+    """Тест для функции main_views - повторный запрос за ту же дату берет карты из кэша,
+    а добавление операций этого месяца приводит к пересчету"""
+    test_settings = {"user_currencies": ["USD"], "user_main_currency": "RUB", "user_stocks": ["AAPL"]}
+    store = TransactionStore.from_records(get_transactions_2)
+    with (
+        patch("builtins.input", return_value="15.01.2018 12:00:00"),
+        patch("builtins.open", mock_open(read_data=json.dumps(test_settings))),
+        patch("src.views.get_exchange_rate", return_value=[]) as mock_exchange_rate,
+        patch("src.views.get_stocks_rates", return_value=[]),
+        patch("src.views.get_cards_summary", wraps=get_cards_summary) as mock_cards,
+    ):
+        first = json.loads(main_views(store))
+        second = json.loads(main_views(store))
+        assert mock_cards.call_count == 1
+        assert first == second
+        store.append(
+            [{"Дата операции": "14.01.2018 10:00:00", "Номер карты": "*7197", "Сумма платежа": -10.0, "Кэшбэк": 0.0}]
+        )
+        third = json.loads(main_views(store))
+    assert mock_cards.call_count == 2
+    assert mock_exchange_rate.call_count == 3
+    assert "7197" in [card["last_digits"] for card in third["cards"]]
+
+
+@pytest.mark.parametrize("act_date", [datetime(2018, 1, 12), datetime(2018, 1, 31), datetime(2018, 2, 1)])
+def test_transaction_sections_store(get_transactions_2: list, act_date: datetime) -> None:
+    """Тест для разделов Главной страницы по хранилищу - результат как для списка транзакций,
+    транзакции месяца не выбираются в список и не разбираются повторно"""
+    expected = transaction_sections(get_transactions_2, act_date)
+    store = TransactionStore.from_records(get_transactions_2)
+    with (
+        patch("src.views.filter_by_currency_month") as mock_filter,
+        patch("src.engine.OperationsTable.from_records") as mock_from_records,
+    ):
+        assert transaction_sections(store, act_date) == expected
+    mock_filter.assert_not_called()
+    mock_from_records.assert_not_called()
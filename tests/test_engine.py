@@ -0,0 +1,111 @@
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import engine
+from src.api import handle_request
+from src.engine import OperationsTable, aggregate_operations, get_operations_table
+from src.reports import category_spending_total, spending_by_category
+from src.sqlite_store import SqliteStore
+from src.store import TransactionStore
+from src.utils import filtered_by_card_number, get_card_info, get_cards_summary
+
+
+@pytest.fixture
+def engine_transactions() -> list:
+    """Фикстура, возвращающая операции с MCC, кешбэком, пропусками и неуспешной операцией"""
+    rows = [
+        ("10.01.2018 12:41:24", "*5441", -567.53, 5.0, "Супермаркеты", 5411.0, "OK"),
+        ("12.01.2018 08:00:00", "*4556", -87068.0, np.nan, "Путешествия", 4511.0, "OK"),
+        ("15.01.2018 08:15:55", "*4556", -1000.0, np.nan, "Супермаркеты", 5411.0, "FAILED"),
+        ("01.02.2018 09:00:00", np.nan, -120.3, 1.2, "Супермаркеты", 5411.0, "OK"),
+        ("02.02.2018 10:00:00", "*5441", 500.0, np.nan, "Пополнения", np.nan, "OK"),
+    ]
+    columns = ["Дата операции", "Номер карты", "Сумма платежа", "Кэшбэк", "Категория", "MCC", "Статус"]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def test_aggregate_operations(engine_transactions: list, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест для движка агрегатов - группировка по MCC и месяцу, отбор по ключам и датам, FAILED не учитывается;
+    результат одинаков для всех видов входа и для группировки по сегментам np.unique"""
+    expected = [
+        {"mcc": 4511, "month": "2018-01", "operations": 1, "amount": -87068.0, "spent": 87068.0, "cashback": 0.0},
+        {"mcc": 5411, "month": "2018-01", "operations": 1, "amount": -567.53, "spent": 567.53, "cashback": 5.0},
+        {"mcc": 5411, "month": "2018-02", "operations": 1, "amount": -120.3, "spent": 120.3, "cashback": 1.2},
+        {"mcc": None, "month": "2018-02", "operations": 1, "amount": 500.0, "spent": 0.0, "cashback": 0.0},
+    ]
+    frame = pd.DataFrame(engine_transactions)
+    sqlite_store = SqliteStore.from_frame(frame, str(tmp_path / "operations.sqlite"))
+    backends = [engine_transactions, frame, TransactionStore(frame), sqlite_store]
+    for transactions in backends:
+        assert aggregate_operations(transactions, ["mcc", "month"]) == expected
+        assert aggregate_operations(transactions, ["card"], mccs=[5411], stop="01.02.2018") == [
+            {"card": "*5441", "operations": 1, "amount": -567.53, "spent": 567.53, "cashback": 5.0}
+        ]
+        failed = aggregate_operations(transactions, ["status"], statuses=["FAILED"])
+        assert [(item["status"], item["operations"], item["spent"]) for item in failed] == [("FAILED", 1, 1000.0)]
+        assert aggregate_operations(transactions, cards=[None])[0]["operations"] == 1
+    monkeypatch.setattr(engine, "MAX_DENSE_GROUPS", 0)
+    assert OperationsTable.from_records(engine_transactions).aggregate(["mcc", "month"]) == expected
+    with pytest.raises(ValueError):
+        aggregate_operations(engine_transactions, ["week"])
+
+
+def test_status_aware_summaries(engine_transactions: list, tmp_path: Path) -> None:
+    """Тест для отчетов и сводки по картам поверх движка - операции со статусом FAILED не учитываются"""
+    frame = pd.DataFrame(engine_transactions)
+    store = TransactionStore(frame)
+    sqlite_store = SqliteStore.from_frame(frame, str(tmp_path / "operations.sqlite"))
+    expected = [
+        {"last_digits": "4556", "total_spent": 87068.0, "cashback": 0.0, "transactions": 1},
+        {"last_digits": "5441", "total_spent": 567.53, "cashback": 5.0, "transactions": 2},
+        {"last_digits": "---", "total_spent": 120.3, "cashback": 1.2, "transactions": 1},
+    ]
+    for transactions in (engine_transactions, frame, store, sqlite_store):
+        assert get_cards_summary(transactions, with_count=True) == expected
+    for transactions in (frame, store, sqlite_store):
+        report = spending_by_category(transactions, "Супермаркеты", "01.03.2018")
+        assert report["Сумма платежа"].tolist() == [-567.53, -120.3]
+    card_info = get_card_info(filtered_by_card_number(engine_transactions))
+    assert [card["total_spent"] for card in card_info] == [87068.0, 567.53, 120.3]
+    for transactions in (store, sqlite_store):
+        assert category_spending_total(transactions, "Супермаркеты", "01.03.2018") == -687.83
+    store.append([{"Дата операции": "20.02.2018 10:00:00", "Сумма платежа": -2.0, "Категория": "Супермаркеты"}])
+    assert get_operations_table(store) is get_operations_table(store)
+    assert category_spending_total(store, "Супермаркеты", "01.03.2018") == -689.83
+
+
+def test_aggregate_request(engine_transactions: list) -> None:
+    """Тест для запроса агрегатов в неинтерактивном интерфейсе"""
+    store = TransactionStore.from_records(engine_transactions)
+    response = handle_request({"id": 1, "type": "aggregate", "group_by": "category", "mccs": ["5411"]}, store)
+    assert response["result"] == [
+        {"category": "Супермаркеты", "operations": 2, "amount": -687.83, "spent": 687.83, "cashback": 6.2}
+    ]
+    assert "error" in handle_request({"type": "aggregate", "group_by": ["week"]}, store)
+    assert "error" in handle_request({"type": "aggregate", "start": "не дата"}, store)
+
+
+class SlowCache(OrderedDict):
+    """Кэш, в котором проверка ключа уступает управление другим потокам"""
+
+    def __contains__(self, key: object) -> bool:
+        found = super().__contains__(key)
+        time.sleep(0.001)
+        return found
+
+
+def test_operations_table_cache_threads(engine_transactions: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест для кэша таблиц движка - одновременные запросы из нескольких потоков с вытеснением записей"""
+    monkeypatch.setattr(engine, "MAX_TABLES", 1)
+    monkeypatch.setattr(engine, "_tables", SlowCache())
+    stores = [TransactionStore.from_records(engine_transactions) for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        tables = list(executor.map(get_operations_table, stores * 20))
+    assert all(len(table) == len(engine_transactions) for table in tables)
+    assert len(engine._tables) == 1
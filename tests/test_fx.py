@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.twelvedata_stub import run_stub_server, stub_price
+from src.fx import RateTable, normalize_store, normalize_transactions
+from src.market import MarketDataClient
+from src.store import TransactionStore
+from src.utils import get_cards_summary
+
+
+@pytest.fixture
+def rate_table() -> RateTable:
+    """Фикстура, возвращающая таблицу курсов к рублю с курсом доллара на 10 и 12 января 2018 года"""
+    table = RateTable("RUB")
+    table.update("USD", ["2018-01-12", "2018-01-10"], [58.0, 57.0])
+    return table
+
+
+@pytest.fixture
+def usd_transactions(get_transactions_2: list) -> list:
+    """Фикстура, возвращающая транзакции get_transactions_2 с оплатой отеля в долларах"""
+    transactions = [dict(transaction, **{"Валюта платежа": "RUB"}) for transaction in get_transactions_2]
+    transactions[1].update({"Сумма платежа": -1000.0, "Валюта платежа": "USD", "Кэшбэк": 10.0})
+    return transactions
+
+
+def test_rate_table_as_of(rate_table: RateTable) -> None:
+    """Тест для таблицы курсов - курс на дату равен последнему известному курсу не позже нее"""
+    days = np.array(
+        ["2018-01-09", "2018-01-10", "2018-01-11", "2018-01-12", "2018-03-01", "NaT"], dtype="datetime64[D]"
+    )
+    np.testing.assert_array_equal(rate_table.rates_at("USD", days), [np.nan, 57.0, 57.0, 58.0, 58.0, np.nan])
+    assert rate_table.rate("RUB", "2000-01-01") == 1.0
+    assert rate_table.rate("USD", "2018-01-11 23:59:59") == 57.0
+    assert np.isnan(rate_table.rate("EUR", "2018-01-11"))
+    rate_table.update("USD", ["2018-01-11"], [60.0])
+    assert rate_table.rate("USD", "2018-01-11") == 60.0
+
+
+def test_rate_table_file(rate_table: RateTable, tmp_path: Path) -> None:
+    """Тест для таблицы курсов - сохранение в файл, чтение и обратные курсы"""
+    file_path = str(tmp_path / "fx_rates.csv")
+    rate_table.save(file_path)
+    assert RateTable.from_file("RUB", file_path).to_frame().equals(rate_table.to_frame())
+    assert RateTable.from_file("USD", file_path).rate("RUB", "2018-01-10") == pytest.approx(1 / 57)
+    assert len(RateTable.from_file("RUB", str(tmp_path / "missing.csv"))) == 0
+
+
+def test_normalize_transactions(rate_table: RateTable, usd_transactions: list) -> None:
+    """Тест для пересчета сумм в основную валюту - сумма платежа и кэшбэк по курсу на дату операции"""
+    normalized = normalize_transactions(usd_transactions, rate_table)
+    assert isinstance(normalized, list)
+    assert normalized[1]["Сумма платежа"] == -58000.0 and normalized[1]["Кэшбэк"] == 580.0
+    assert [transaction["Валюта платежа"] for transaction in normalized] == ["RUB"] * 3
+    assert normalized[0]["Сумма платежа"] == usd_transactions[0]["Сумма платежа"]
+    assert usd_transactions[1]["Сумма платежа"] == -1000.0
+    store = TransactionStore.from_records(usd_transactions)
+    normalized_store = normalize_store(store, rate_table)
+    assert normalize_store(store, rate_table) is normalized_store
+    assert get_cards_summary(normalized_store) == get_cards_summary(normalized)
+    rate_table.update("USD", ["2018-01-12"], [60.0])
+    assert normalize_store(store, rate_table).frame["Сумма платежа"].iloc[1] == -60000.0
+
+
+def test_rate_table_backfill() -> None:
+    """Тест для загрузки исторических курсов - все валюты одним пакетным запросом time_series"""
+    table = RateTable("RUB")
+    with run_stub_server() as server:
+        with MarketDataClient(base_url=server.base_url, api_key="test") as client:
+            loaded = table.backfill(client, ["USD", "EUR", "RUB", "UNKNOWN"], "2018-01-01", "2018-01-31")
+    assert loaded == {"USD": 31, "EUR": 31, "UNKNOWN": 0}
+    assert server.requests == [("time_series", ["USD/RUB", "EUR/RUB", "UNKNOWN/RUB"])]
+    assert table.rate("USD", pd.Timestamp("2018-01-15 10:00")) == pytest.approx(stub_price("USD/RUB") / 100 + 0.014)
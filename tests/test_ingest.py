@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ingest import ingest_file, ingest_sqlite, new_row_positions, refresh_store
+from src.sqlite_store import SqliteStore, sqlite_path_for
+from src.store import TransactionStore
+from src.utils import get_cards_summary
+
+
+@pytest.fixture
+def export_frame(get_transactions_2: list) -> pd.DataFrame:
+    """Фикстура, возвращающая выгрузку в порядке банка (по убыванию даты) с двумя одинаковыми
+    операциями в последний момент истории"""
+    repeated = dict(get_transactions_2[2], **{"Описание": "Перевод на Ozon.ru"})
+    return pd.DataFrame([repeated, repeated] + get_transactions_2[::-1])
+
+
+@pytest.fixture
+def new_transactions() -> list:
+    """Фикстура, возвращающая операции, дописанные в начало выгрузки"""
+    return [
+        {
+            "Дата операции": "20.01.2018 10:00:00",
+            "Номер карты": "*4556",
+            "Сумма платежа": -300.0,
+            "Категория": "Мобильная связь",
+            "Описание": "МТС +7 921 111-22-33",
+        },
+        {
+            "Дата операции": "15.01.2018 08:15:55",
+            "Номер карты": "*5441",
+            "Сумма платежа": -150.0,
+            "Категория": "Супермаркеты",
+            "Описание": "Оплата покупок",
+        },
+    ]
+
+
+def test_new_row_positions(export_frame: pd.DataFrame, new_transactions: list) -> None:
+    """Тест для поиска новых строк выгрузки - строки позже последней даты и повторы в последний момент"""
+    store = TransactionStore(export_frame.iloc[1:])
+    extended = pd.concat([pd.DataFrame(new_transactions), export_frame], ignore_index=True)
+    # в последний момент истории новые - операция new_transactions и вторая из одинаковых операций
+    assert new_row_positions(store, extended).tolist() == [0, 1, 3]
+    assert new_row_positions(store, extended.iloc[:5], complete=False).tolist() == [0, 1, 3]
+    with pytest.raises(ValueError):
+        new_row_positions(store, extended.iloc[:2], complete=False)
+    with pytest.raises(ValueError):
+        new_row_positions(store, extended.iloc[:-1])
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_ingest_file(backend: str, export_frame: pd.DataFrame, new_transactions: list, tmp_path: Path) -> None:
+    """Тест для загрузки дополненной выгрузки - добавляются только новые строки, агрегаты совпадают
+    с полной загрузкой, повторная загрузка ничего не добавляет"""
+    store: TransactionStore | SqliteStore
+    if backend == "memory":
+        store = TransactionStore(export_frame)
+        _ = store.search_index, store.phone_index, store.category_cube
+    else:
+        store = SqliteStore.from_frame(export_frame, str(tmp_path / "operations.sqlite"))
+    file_path = str(tmp_path / "operations.xlsx")
+    extended = pd.concat([pd.DataFrame(new_transactions), export_frame], ignore_index=True)
+    extended.to_excel(file_path, index=False)
+    assert ingest_file(store, file_path) == {"rows_read": 5, "rows_added": 2}
+    assert ingest_file(store, file_path)["rows_added"] == 0
+    assert len(store) == 7
+    fresh = TransactionStore(extended)
+    assert get_cards_summary(store, with_count=True) == get_cards_summary(fresh, with_count=True)
+    assert refresh_store(store, file_path) is store
+
+
+def test_refresh_store(export_frame: pd.DataFrame, tmp_path: Path) -> None:
+    """Тест для обновления хранилища - файл, не продолжающий данные, загружается заново"""
+    file_path = str(tmp_path / "operations.xlsx")
+    export_frame.to_excel(file_path, index=False)
+    store = TransactionStore.from_file(file_path)
+    export_frame.iloc[1:].to_excel(file_path, index=False)
+    refreshed = refresh_store(store, file_path)
+    assert refreshed is not store
+    assert len(refreshed) == 4 and len(store) == 5
+
+
+def test_ingest_sqlite(export_frame: pd.DataFrame, new_transactions: list, tmp_path: Path) -> None:
+    """Тест для дополнения базы SQLite файла - импорт при первом запуске, затем только новые строки"""
+    file_path = str(tmp_path / "operations.xlsx")
+    export_frame.to_excel(file_path, index=False)
+    assert ingest_sqlite(file_path) == {"rows_read": 5, "rows_added": 5}
+    assert ingest_sqlite(file_path) == {"rows_read": 0, "rows_added": 0}
+    pd.concat([pd.DataFrame(new_transactions), export_frame]).to_excel(file_path, index=False)
+    assert ingest_sqlite(file_path)["rows_added"] == 2
+    store = SqliteStore(sqlite_path_for(file_path))
+    assert len(store) == 7
+    assert store.high_water_mark() == np.datetime64("2018-01-20T10:00:00")
+    store.close()
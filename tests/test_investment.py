@@ -0,0 +1,103 @@
+import json
+import math
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import investment
+from src.api import handle_request
+from src.investment import get_round_up_simulator, investment_bank, investment_bank_sweep
+from src.sqlite_store import SqliteStore
+from src.store import TransactionStore
+
+
+@pytest.fixture
+def investment_transactions(get_transactions_2: list) -> list:
+    """Фикстура, возвращающая транзакции с пополнением, неуспешной операцией и операцией февраля"""
+    transactions = [dict(transaction, **{"Статус": "OK"}) for transaction in get_transactions_2]
+    return transactions + [
+        {"Дата операции": "16.01.2018 10:00:00", "Номер карты": "*5441", "Сумма платежа": 500.0, "Статус": "OK"},
+        {"Дата операции": "17.01.2018 10:00:00", "Номер карты": "*5441", "Сумма платежа": -1.0, "Статус": "FAILED"},
+        {"Дата операции": "01.02.2018 09:00:00", "Номер карты": np.nan, "Сумма платежа": -120.3, "Статус": "OK"},
+    ]
+
+
+def test_investment_bank(investment_transactions: list) -> None:
+    """Тест для инвесткопилки - итог, по месяцам и по картам; пополнения и неуспешные операции не учитываются"""
+    result = json.loads(investment_bank(investment_transactions, 50))
+    # -567.53 -> 32.47, -87068.0 -> 32.0, -1000.0 -> 0, -120.3 -> 29.7
+    assert result["saved"] == 94.17 and result["operations"] == 4
+    assert result["months"] == [
+        {"month": "2018-01", "saved": 64.47, "operations": 3},
+        {"month": "2018-02", "saved": 29.7, "operations": 1},
+    ]
+    assert result["cards"] == [
+        {"last_digits": "4556", "saved": 32.0, "operations": 2},
+        {"last_digits": "5441", "saved": 32.47, "operations": 1},
+        {"last_digits": "---", "saved": 29.7, "operations": 1},
+    ]
+    january = json.loads(investment_bank(investment_transactions, 10, "01.01.2018", "01.02.2018"))
+    expected = sum(math.ceil(-amount / 10) * 10 + amount for amount in (-567.53, -87068.0, -1000.0))
+    assert january["saved"] == round(expected, 2) and len(january["months"]) == 1
+    with pytest.raises(ValueError):
+        investment_bank(investment_transactions, 0)
+
+
+def test_investment_bank_sweep(investment_transactions: list, tmp_path: Path) -> None:
+    """Тест для перебора шагов и периодов - совпадает с расчетом по отдельности для всех видов входа"""
+    periods = [("10.01.2018", "13.01.2018"), (None, "01.02.2018"), ("01.02.2018", None)]
+    store = TransactionStore.from_records(investment_transactions)
+    sqlite_store = SqliteStore.from_frame(pd.DataFrame(investment_transactions), str(tmp_path / "operations.sqlite"))
+    expected = []
+    for step in (10, 50, 100):
+        for start, stop in periods:
+            result = json.loads(investment_bank(investment_transactions, step, start, stop))
+            expected.append(
+                {
+                    "step": step,
+                    "start": start,
+                    "stop": stop,
+                    "saved": result["saved"],
+                    "operations": result["operations"],
+                }
+            )
+    for transactions in (investment_transactions, store, sqlite_store):
+        assert json.loads(investment_bank_sweep(transactions, [10, 50, 100], periods)) == expected
+    assert get_round_up_simulator(store) is get_round_up_simulator(store)
+    store.append([{"Дата операции": "02.02.2018 09:00:00", "Сумма платежа": -0.01, "Статус": "OK"}])
+    assert json.loads(investment_bank(store, 10, "01.02.2018"))["saved"] == 19.69
+
+
+def test_investment_request(investment_transactions: list) -> None:
+    """Тест для запроса инвесткопилки в неинтерактивном интерфейсе"""
+    store = TransactionStore.from_records(investment_transactions)
+    response = handle_request({"id": 1, "type": "investment", "step": 100, "stop": "01.02.2018"}, store)
+    assert response["result"]["saved"] == 64.47
+    sweep = handle_request({"type": "investment", "steps": [10, 50], "periods": [["01.02.2018", None]]}, store)
+    assert [item["saved"] for item in sweep["result"]] == [9.7, 29.7]
+    assert "error" in handle_request({"type": "investment", "step": -10}, store)
+
+
+class SlowCache(OrderedDict):
+    """Кэш, в котором проверка ключа уступает управление другим потокам"""
+
+    def __contains__(self, key: object) -> bool:
+        found = super().__contains__(key)
+        time.sleep(0.001)
+        return found
+
+
+def test_round_up_simulator_cache_threads(investment_transactions: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест для кэша моделей инвесткопилки - одновременные запросы из нескольких потоков с вытеснением"""
+    monkeypatch.setattr(investment, "MAX_SIMULATORS", 1)
+    monkeypatch.setattr(investment, "_simulators", SlowCache())
+    stores = [TransactionStore.from_records(investment_transactions) for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        simulators = list(executor.map(get_round_up_simulator, stores * 20))
+    assert len({id(simulator) for simulator in simulators}) >= len(stores)
+    assert len(investment._simulators) == 1
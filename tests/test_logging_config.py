@@ -0,0 +1,28 @@
+import logging
+from pathlib import Path
+
+from src.logging_config import LOGGER_NAME, ModuleFileHandler, configure_logging
+
+
+def test_configure_logging(tmp_path: Path) -> None:
+    """Тест для функции configure_logging - записи модулей попадают в свои файлы, повторный вызов не дублирует"""
+    logger = logging.getLogger(LOGGER_NAME)
+    level = logger.level
+    try:
+        configure_logging(str(tmp_path))
+        configure_logging(str(tmp_path))
+        handlers = [handler for handler in logger.handlers if isinstance(handler, ModuleFileHandler)]
+        assert len(handlers) == 1
+        logger.info("запись теста")
+        logging.getLogger(LOGGER_NAME).handle(
+            logging.LogRecord(LOGGER_NAME, logging.INFO, "/src/views.py", 1, "запись views", None, None)
+        )
+        assert "запись теста" in (tmp_path / "test_logging_config_logs.log").read_text(encoding="utf-8")
+        views_log = (tmp_path / "views_logs.log").read_text(encoding="utf-8")
+        assert "views.py INFO: запись views" in views_log
+        assert "запись теста" not in views_log
+    finally:
+        for handler in [handler for handler in logger.handlers if isinstance(handler, ModuleFileHandler)]:
+            logger.removeHandler(handler)
+            handler.close()
+        logger.setLevel(level)
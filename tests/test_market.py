@@ -0,0 +1,114 @@
+import os
+from typing import Iterator
+
+import pytest
+import requests
+
+from benchmarks.twelvedata_stub import StubServer, run_stub_server, stub_price
+from src.market import MarketDataClient, QuoteCache
+from src.utils import get_exchange_rate, get_stocks_rates
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubServer]:
+    """Фикстура, запускающая локальную заглушку API twelvedata"""
+    with run_stub_server() as server:
+        yield server
+
+
+def test_stock_prices_batched(stub_server: StubServer) -> None:
+    """Тест для клиента котировок - все акции запрашиваются одним пакетным запросом"""
+    with MarketDataClient(base_url=stub_server.base_url, api_key="test") as client:
+        result = client.stock_prices(["AAPL", "AMZN", "UNKNOWN"])
+    assert result == [
+        {"stock": "AAPL", "price": str(round(stub_price("AAPL"), 2))},
+        {"stock": "AMZN", "price": str(round(stub_price("AMZN"), 2))},
+        {"stock": "UNKNOWN", "price": "Данные отсутствуют"},
+    ]
+    assert stub_server.requests == [("price", ["AAPL", "AMZN", "UNKNOWN"])]
+
+
+def test_exchange_rates_concurrent(stub_server: StubServer) -> None:
+    """Тест для клиента курсов валют - пакеты по batch_size отправляются параллельно"""
+    currencies = ["USD", "EUR", "CNY", "UNKNOWN", "USD"]
+    with MarketDataClient(base_url=stub_server.base_url, batch_size=2) as client:
+        result = get_exchange_rate(currencies, "RUB", client=client)
+    assert [item["currency"] for item in result] == currencies
+    assert result[0] == {"currency": "USD", "rate": round(stub_price("USD/RUB") / 100, 4)}
+    assert result[3] == {"currency": "UNKNOWN", "rate": "Данные отсутствуют"}
+    assert sorted(symbols for _, symbols in stub_server.requests) == [
+        ["CNY/RUB", "UNKNOWN/RUB"],
+        ["USD/RUB", "EUR/RUB"],
+    ]
+
+
+def test_single_symbol(stub_server: StubServer) -> None:
+    """Тест для клиента котировок - ответ на запрос одного символа не вложен по символам"""
+    with MarketDataClient(base_url=stub_server.base_url) as client:
+        assert get_stocks_rates(["MSFT"], client=client) == [
+            {"stock": "MSFT", "price": str(round(stub_price("MSFT"), 2))}
+        ]
+        assert client.stock_prices([]) == []
+    assert len(stub_server.requests) == 1
+
+
+def test_http_error(stub_server: StubServer) -> None:
+    """Тест для клиента котировок - ошибка HTTP пробрасывается, как в get_stocks_rates"""
+    with MarketDataClient(base_url=f"{stub_server.base_url}/missing") as client:
+        with pytest.raises(requests.HTTPError):
+            client.stock_prices(["AAPL"])
+
+
+class FakeClock:
+    """Управляемые часы для проверки времени жизни записей кэша"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_quote_cache_ttl_and_eviction() -> None:
+    """Тест для кэша котировок - свежие, устаревшие и просроченные записи, вытеснение по размеру"""
+    clock = FakeClock()
+    cache = QuoteCache(ttl=10, stale_ttl=100, max_size=2, ttls={"BTC": 1}, clock=clock)
+    cache.store("price", "AAPL", {"price": "1"})
+    cache.store("price", "BTC", {"price": "2"})
+    clock.now += 5
+    assert cache.lookup("price", "AAPL") == ({"price": "1"}, "fresh")
+    assert cache.lookup("price", "BTC") == ({"price": "2"}, "stale")
+    cache.store("price", "MSFT", {"price": "3"})
+    assert len(cache) == 2
+    assert cache.lookup("price", "AAPL") == (None, None)
+    clock.now += 200
+    assert cache.lookup("price", "MSFT") == (None, None)
+
+
+def test_quote_cache_persisted(tmp_path: str) -> None:
+    """Тест для кэша котировок - сохранение на диск и чтение при создании, поврежденный файл"""
+    path = os.path.join(tmp_path, "quotes.json")
+    cache = QuoteCache(path=path)
+    cache.store("exchange_rate", "USD/RUB", {"rate": 81.7})
+    cache.save()
+    assert QuoteCache(path=path).lookup("exchange_rate", "USD/RUB") == ({"rate": 81.7}, "fresh")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("{")
+    assert len(QuoteCache(path=path)) == 0
+
+
+def test_client_cache_stale_while_revalidate(stub_server: StubServer) -> None:
+    """Тест для клиента котировок с кэшем - свежие значения без запросов, устаревшие отдаются
+    сразу и обновляются в фоне, ошибки API не кэшируются"""
+    clock = FakeClock()
+    cache = QuoteCache(ttl=10, stale_ttl=100, clock=clock)
+    with MarketDataClient(base_url=stub_server.base_url, cache=cache) as client:
+        first = client.stock_prices(["AAPL", "UNKNOWN"])
+        assert client.stock_prices(["AAPL", "UNKNOWN"]) == first
+        assert stub_server.requests == [("price", ["AAPL", "UNKNOWN"]), ("price", ["UNKNOWN"])]
+        cache.store("price", "AAPL", {"price": "1.0"})
+        clock.now += 20
+        assert client.stock_prices(["AAPL"]) == [{"stock": "AAPL", "price": "1.0"}]
+        client.wait_for_refresh()
+        assert client.stock_prices(["AAPL"]) == first[:1]
+    assert stub_server.requests[2:] == [("price", ["AAPL"])]
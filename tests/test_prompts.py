@@ -0,0 +1,21 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from src.prompts import parse_act_datetime, prompt_act_datetime
+
+
+def test_parse_act_datetime() -> None:
+    """Тест для функции parse_act_datetime"""
+    assert parse_act_datetime("15.01.2018 23:10:00") == datetime(2018, 1, 15, 23)
+    with pytest.raises(ValueError):
+        parse_act_datetime("15.01.2018")
+
+
+def test_prompt_act_datetime(capsys: pytest.CaptureFixture[str]) -> None:
+    """Тест для функции prompt_act_datetime - повторный запрос при неверном формате"""
+    with patch("builtins.input", side_effect=["32.01.2018 10:00:00", "15.01.2018 10:00:00"]) as mock_input:
+        assert prompt_act_datetime() == datetime(2018, 1, 15, 10)
+    assert mock_input.call_count == 2
+    assert "Формат данных не соответствует запросу!" in capsys.readouterr().out
@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.records import Transaction, TransactionArrays, compact_transactions, to_serializable
+from src.services import search_by_phones, search_by_target
+from src.utils import filter_by_currency_month, get_cards_summary, get_top_transactions
+
+
+def test_transaction_mapping() -> None:
+    """Тест для компактной записи - доступ как к словарю, отсутствующие и дополнительные колонки"""
+    transaction = Transaction({"Номер карты": "*4556", "Сумма платежа": -10.0, "Комментарий": "обед"})
+    assert transaction["Номер карты"] == "*4556"
+    assert transaction.get("Кэшбэк", 0) == 0
+    assert list(transaction) == ["Номер карты", "Сумма платежа", "Комментарий"]
+    assert transaction == {"Номер карты": "*4556", "Сумма платежа": -10.0, "Комментарий": "обед"}
+    assert not hasattr(transaction, "__dict__")
+    with pytest.raises(KeyError):
+        transaction["Категория"]
+    with pytest.raises(TypeError):
+        to_serializable(object())
+
+
+def test_compact_transactions_outputs(get_transactions: list, get_transactions_2: list) -> None:
+    """Тест для компактных записей - функции utils и services возвращают те же результаты"""
+    compact = compact_transactions(get_transactions)
+    assert get_cards_summary(compact) == get_cards_summary(get_transactions)
+    assert filter_by_currency_month(compact, "15.01.2018") == filter_by_currency_month(get_transactions, "15.01.2018")
+    compact_2 = compact_transactions(pd.DataFrame(get_transactions_2))
+    assert get_top_transactions(compact_2) == get_top_transactions(get_transactions_2)
+    assert search_by_target(compact_2, "оплата") == search_by_target(get_transactions_2, "оплата")
+    assert search_by_phones(compact_2) == search_by_phones(get_transactions_2)
+
+
+def test_transaction_arrays(get_transactions: list) -> None:
+    """Тест для структуры массивов - коды строк, суммы в копейках и восстановление записей"""
+    transactions = get_transactions + [{"Дата операции": "16.01.2018 10:00:00", "Сумма платежа": np.nan}]
+    arrays = TransactionArrays.from_records(transactions)
+    assert len(arrays) == 6
+    assert arrays.kopecks["Сумма платежа"].dtype == np.int64
+    assert arrays.codes["Номер карты"].dtype == np.int32
+    assert arrays.nbytes > 0
+    assert json.dumps(arrays.records()) == json.dumps(pd.DataFrame(transactions).to_dict(orient="records"))
+    assert arrays.transaction(0) == transactions[0]
+    assert pd.isna(arrays.transaction(5)["Сумма платежа"])
@@ -1,10 +1,19 @@
+import json
 import os
 import tempfile
 from unittest.mock import patch
 import pandas as pd
 import pytest
 
-from src.reports import report_log, spending_by_category
+from src.report_writer import ReportWriter, get_report_writer, write_report
+from src.reports import (
+    category_spending_total,
+    get_report_period,
+    parse_report_date,
+    report_log,
+    spending_by_category,
+)
+from src.store import TransactionStore
 
 
 def test_report_log1() -> None:
@@ -87,13 +96,20 @@ def test_spending_by_category1(date_str: str) -> None:
     assert len(result) == 1
 
 
-def test_spending_by_category2(capsys) -> None:
-    """Тест для фильтрации данных по категории - ошибка в формате даты"""
-    with patch('builtins.input', return_value="01.03.2023"):
+def test_spending_by_category2() -> None:
+    """Тест для фильтрации данных по категории - ошибка в формате даты, ввод пользователя не запрашивается"""
+    with patch('builtins.input', return_value="01.03.2023") as mock_input, pytest.raises(ValueError):
         test_data = pd.DataFrame({"Дата операции": ["01.03.2023 12:00:00"], "Категория": ["Еда"], "Сумма": [1000]})
         spending_by_category(test_data, "Еда", "00.01.0001")
-        captured = capsys.readouterr()
-        assert "Неверный формат даты - 00.01.0001! Используйте формат ДД.ММ.ГГГГ"
+    mock_input.assert_not_called()
+
+
+def test_get_report_period(capsys: pytest.CaptureFixture) -> None:
+    """Тест для функции get_report_period - при ошибке в формате даты дата запрашивается повторно"""
+    with patch("builtins.input", return_value="01.03.2023"):
+        start_date, end_date = get_report_period("00.01.0001")
+    assert "Неверный формат даты - 00.01.0001! Используйте формат ДД.ММ.ГГГГ" in capsys.readouterr().out
+    assert (start_date, end_date) == (pd.Timestamp("2022-12-01"), pd.Timestamp("2023-03-01"))
 
 
 @pytest.mark.parametrize("date, category", [("31.03.2024", "Еда"), ("31/03/2023", "Транспорт")])
@@ -103,3 +119,105 @@ def test_spending_by_category3(date: str, category: str) -> None:
     test_data = pd.DataFrame({"Дата операции": ["01.03.2023 12:00:00"], "Категория": ["Еда"], "Сумма": [1000]})
     result = spending_by_category(test_data, category, date)
     assert len(result) == 0
+
+
+def test_spending_by_category_store() -> None:
+    """Тест для фильтрации данных по категории - передано хранилище транзакций"""
+    test_data = pd.DataFrame(
+        {
+            "Дата операции": [
+                "01.03.2023 12:00:00",
+                "31.03.2023 00:00:00",
+                "31.03.2023 00:00:01",
+                "01.03.2023 12:00:00",
+            ],
+            "Категория": ["Еда", "Еда", "Еда", "Транспорт"],
+            "Сумма платежа": [-1000.0, -50.0, -20.0, -100.0],
+        }
+    )
+    store = TransactionStore(test_data)
+    result = spending_by_category(store, "Еда", "31.03.2023")
+    expected = spending_by_category(test_data.copy(), "Еда", "31.03.2023")
+    assert result.to_dict(orient="records") == expected.to_dict(orient="records")
+    assert result["Сумма платежа"].sum() == -1050.0
+
+
+def test_spending_by_category_keeps_input() -> None:
+    """Тест для фильтрации данных по категории - переданный DataFrame не изменяется"""
+    test_data = pd.DataFrame({"Дата операции": ["01.03.2023 12:00:00"], "Категория": ["Еда"], "Сумма": [1000]})
+    spending_by_category(test_data, "Еда", "31.03.2023")
+    assert test_data["Дата операции"].tolist() == ["01.03.2023 12:00:00"]
+
+
+@pytest.mark.parametrize("date", ["31.03.2023", "31.03.2023 00:00:01", "01.04.2023", "28.02.2023", "01.01.2020"])
+def test_category_spending_total(date: str) -> None:
+    """Тест для расчета суммы платежей по категории - совпадает с суммой строк отчета"""
+    test_data = pd.DataFrame(
+        {
+            "Дата операции": [
+                "31.12.2022 00:00:00",
+                "01.01.2023 12:00:00",
+                "01.03.2023 12:00:00",
+                "31.03.2023 00:00:00",
+                "31.03.2023 00:00:01",
+                "01.03.2023 12:00:00",
+            ],
+            "Категория": ["Еда", "Еда", "Еда", "Еда", "Еда", "Транспорт"],
+            "Сумма платежа": [-7.0, -3.33, -1000.0, -50.0, -20.0, -100.0],
+        }
+    )
+    store = TransactionStore(test_data)
+    expected = round(spending_by_category(test_data, "Еда", date)["Сумма платежа"].sum(), 2)
+    assert category_spending_total(store, "Еда", date) == expected
+
+
+def test_report_log_per_call_and_background(tmp_path: str) -> None:
+    """тест для декоратора - имя файла для отдельного вызова, формат JSON Lines и фоновая запись"""
+    data_frame = pd.DataFrame({"Категория": ["Еда", "Еда"], "Сумма платежа": [-1.5, float("nan")]})
+
+    @report_log(filename=os.path.join(tmp_path, "default.json"))
+    def make_report() -> pd.DataFrame:
+        return data_frame
+
+    @report_log(filename=os.path.join(tmp_path, "background.jsonl"), background=True)
+    def make_report_background() -> pd.DataFrame:
+        return data_frame
+
+    make_report()
+    make_report(report_filename=os.path.join(tmp_path, "other.jsonl"))
+    make_report_background()
+    get_report_writer().flush()
+    with open(os.path.join(tmp_path, "default.json"), "r", encoding="utf-8") as file:
+        assert file.read() == json.dumps(data_frame.to_dict(orient="records"), ensure_ascii=False, indent=4)
+    for name in ("other.jsonl", "background.jsonl"):
+        with open(os.path.join(tmp_path, name), "r", encoding="utf-8") as file:
+            assert [json.loads(line)["Сумма платежа"] for line in file][0] == -1.5
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_write_report_atomic(tmp_path: str) -> None:
+    """тест для записи отчета - при ошибке существующий файл не изменяется, временных файлов не остается"""
+    file_path = os.path.join(tmp_path, "report.json")
+    write_report(pd.DataFrame({"a": [1]}), file_path)
+    with pytest.raises(TypeError):
+        write_report(pd.DataFrame({"a": [object()]}), file_path)
+    with open(file_path, "r", encoding="utf-8") as file:
+        assert json.load(file) == [{"a": 1}]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    # права как у файла, созданного open(..., "w"), а не 0600 временного файла mkstemp
+    plain_path = os.path.join(tmp_path, "plain.json")
+    open(plain_path, "w").close()
+    assert os.stat(file_path).st_mode & 0o777 == os.stat(plain_path).st_mode & 0o777
+    writer = ReportWriter(max_queue=1)
+    writer.submit(pd.DataFrame({"a": [object()]}), file_path)
+    writer.close()
+    assert len(writer.errors) == 1
+
+
+def test_parse_report_date() -> None:
+    """Тест для функции parse_report_date - ввод пользователя не запрашивается"""
+    assert parse_report_date("31.03.2023") == pd.Timestamp("2023-03-31")
+    assert isinstance(parse_report_date(None), pd.Timestamp)
+    with patch("builtins.input") as mock_input, pytest.raises(ValueError):
+        parse_report_date("32.03.2023")
+    mock_input.assert_not_called()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.search import PhoneIndex, SearchIndex, normalize_phone, parse_search_query
+
+
+@pytest.fixture
+def search_index() -> SearchIndex:
+    """Фикстура, возвращающая индекс по описаниям и категориям"""
+    frame = pd.DataFrame(
+        {
+            "Описание": ["Яндекс Такси", "Колхоз", "Такси", "Перевод  Колхоз", None, "Колхоз (1+1)"],
+            "Категория": ["Транспорт", "Супермаркеты", "Транспорт", "Переводы", "Колхоз", "Супермаркеты"],
+        }
+    )
+    return SearchIndex.from_frame(frame)
+
+
+@pytest.mark.parametrize(
+    "keywords, operator, expected",
+    [
+        (["такси"], "and", [0, 2]),
+        (["яндекс такси"], "and", [0]),
+        (["такси яндекс"], "and", []),
+        (["Перевод Колхоз"], "and", []),
+        (["колхоз"], "and", [1, 3, 4, 5]),
+        (["(1+1)"], "and", [5]),
+        (["колхоз", "переводы"], "and", [3]),
+        (["колхоз", "такси"], "or", [0, 1, 2, 3, 4, 5]),
+        ([], "and", []),
+    ],
+)
+def test_search_index(search_index: SearchIndex, keywords: list, operator: str, expected: list) -> None:
+    """Тест для инвертированного индекса - слова, фразы, спецсимволы и операторы И/ИЛИ"""
+    assert search_index.search(keywords, operator).tolist() == expected
+
+
+def test_search_index_operator(search_index: SearchIndex) -> None:
+    """Тест для инвертированного индекса - неизвестный оператор"""
+    with pytest.raises(ValueError):
+        search_index.search(["такси"], "xor")
+    assert search_index.keyword_rows("самолет").dtype == np.intp
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("Яндекс Такси", (["Яндекс Такси"], "and")),
+        ("кафе ИЛИ такси", (["кафе", "такси"], "or")),
+        ("перевод И Колхоз", (["перевод", "Колхоз"], "and")),
+    ],
+)
+def test_parse_search_query(query: str, expected: tuple) -> None:
+    """Тест для разбора строки запроса на ключевые слова и оператор"""
+    assert parse_search_query(query) == expected
+
+
+@pytest.mark.parametrize(
+    "phone, expected",
+    [
+        ("+7 921 111-22-33", "+79211112233"),
+        ("8(921)1112233", "+79211112233"),
+        ("9211112233", "+79211112233"),
+        ("123", None),
+    ],
+)
+def test_normalize_phone(phone: str, expected: str) -> None:
+    """Тест для приведения номера телефона к формату E.164"""
+    assert normalize_phone(phone) == expected
+
+
+def test_phone_index() -> None:
+    """Тест для индекса телефонов - производная колонка, строки с номерами и поиск по номеру"""
+    descriptions = pd.Series(["МТС +7 921 111-22-33", None, "8-999-555-77-00 и 8 921 111 22 33", "89995557700000", 5])
+    phone_index = PhoneIndex(descriptions)
+    assert phone_index.phones.isna().tolist() == [False, True, False, True, True]
+    assert phone_index.phones[2] == "+79995557700"
+    assert phone_index.rows.tolist() == [0, 2]
+    assert phone_index.lookup("89211112233").tolist() == [0, 2]
+    assert phone_index.lookup("не номер").tolist() == []
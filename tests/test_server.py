@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import requests
+
+from src.server import run_app_server
+
+
+@pytest.fixture
+def operations_file(tmp_path: Path, get_transactions_2: list) -> str:
+    """Фикстура, возвращающая путь к небольшому xlsx-файлу с операциями"""
+    file_path = tmp_path / "operations.xlsx"
+    pd.DataFrame(get_transactions_2).assign(**{"Кэшбэк": 1.0}).to_excel(file_path, index=False)
+    return str(file_path)
+
+
+def test_app_server_endpoints(operations_file: str) -> None:
+    """Тест для HTTP-сервера - адреса приложения, коды ответов и запрос в теле POST"""
+    settings = {"user_currencies": [], "user_main_currency": "RUB", "user_stocks": []}
+    with run_app_server(port=0, file_path=operations_file, settings=settings) as server:
+        health = requests.get(f"{server.base_url}/health")
+        dashboard = requests.get(f"{server.base_url}/dashboard", params={"datetime": "15.01.2018 12:00:00"})
+        search = requests.get(f"{server.base_url}/search", params={"keywords": ["оплата", "отеля"]})
+        report = requests.post(
+            server.base_url, json={"type": "report", "category": "Путешествия", "date": "01.02.2018"}
+        )
+        missing = requests.get(f"{server.base_url}/dashboard")
+        unknown = requests.get(f"{server.base_url}/unknown")
+        invalid = requests.post(server.base_url, data="не json")
+    assert health.json() == {"status": "ok", "transactions": 3}
+    assert [card["last_digits"] for card in dashboard.json()["result"]["cards"]] == ["4556", "5441"]
+    assert dashboard.json()["result"]["stock_prices"] == []
+    assert [row["Описание"] for row in search.json()["result"]] == ["Оплата отеля"]
+    assert report.json()["result"]["total"] == -87068.0
+    assert (missing.status_code, missing.json()["error"]) == (400, "не задано поле datetime")
+    assert unknown.status_code == 404
+    assert invalid.status_code == 400
+
+
+def test_app_server_reload(operations_file: str, get_transactions_2: list) -> None:
+    """Тест для HTTP-сервера - хранилище перечитывается только после изменения файла"""
+    with run_app_server(port=0, file_path=operations_file, settings={}) as server:
+        store = server.current_store()
+        assert server.current_store() is store
+        pd.DataFrame(get_transactions_2[:2]).to_excel(operations_file, index=False)
+        os.utime(operations_file, (1, 1))
+        health = requests.get(f"{server.base_url}/health")
+        assert server.current_store() is not store
+    assert health.json()["transactions"] == 2
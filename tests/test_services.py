@@ -3,7 +3,8 @@ from unittest.mock import patch
 
 import pytest
 
-from src.services import search_by_phones, search_by_target
+from src.services import search_by_phone_number, search_by_phones, search_by_target
+from src.store import TransactionStore
 
 
 @pytest.mark.parametrize(
@@ -32,11 +33,8 @@ from src.services import search_by_phones, search_by_target
 )
 def test_search_by_target(transactions: list, expected: list) -> None:
     """тесты для поиска под ключевому слову"""
-    with (
-        patch("src.services.make_transactions", return_value=transactions),
-    ):
-        result = json.loads(search_by_target(transactions, "Колхоз"))
-        assert result == expected
+    result = json.loads(search_by_target(transactions, "Колхоз"))
+    assert result == expected
 
 
 @pytest.mark.parametrize(
@@ -57,6 +55,58 @@ def test_search_by_target(transactions: list, expected: list) -> None:
 )
 def test_search_by_phones(transactions: list, expected: list) -> None:
     """тесты для поиска транзакций с номерами телефонов в описании"""
-    with patch("src.services.make_transactions", side_effect=transactions):
-        result = json.loads(search_by_phones(transactions))
-        assert result == expected
+    result = json.loads(search_by_phones(transactions))
+    assert result == expected
+
+
+def test_search_store(get_transactions_2: list) -> None:
+    """тесты для поиска по ключевому слову и номерам телефонов - передано хранилище транзакций"""
+    get_transactions_2[0]["Описание"] = "Перевод +7 921 111-22-33"
+    store = TransactionStore.from_records(get_transactions_2)
+    assert search_by_target(store, "оплата") == search_by_target(get_transactions_2, "оплата")
+    assert json.loads(search_by_target(store, "Колхоз")) == {"Результаты поиска": "Ничего не нашлось"}
+    assert search_by_phones(store) == search_by_phones(get_transactions_2)
+
+
+def test_search_by_target_keywords(get_transactions_2: list) -> None:
+    """тесты для поиска по нескольким ключевым словам и по строке со спецсимволами регулярных выражений"""
+    store = TransactionStore.from_records(get_transactions_2)
+    for transactions in (get_transactions_2, store):
+        assert len(json.loads(search_by_target(transactions, ["оплата", "отеля"], "and"))) == 1
+        assert len(json.loads(search_by_target(transactions, ["отеля", "Супермаркеты"], "or"))) == 2
+        assert json.loads(search_by_target(transactions, "(")) == {"Результаты поиска": "Ничего не нашлось"}
+    with pytest.raises(ValueError):
+        search_by_target(store, "отеля", "xor")
+
+
+def test_search_by_phones_empty() -> None:
+    """тест для поиска по номерам телефонов - пустой список не подменяется транзакциями из файла"""
+    with patch("src.utils.make_transactions") as mock_make_transactions:
+        assert json.loads(search_by_phones([])) == {"Результаты поиска": "Ничего не нашлось"}
+    mock_make_transactions.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "phone, expected_count",
+    [("+7 921 111-22-33", 2), ("89211112233", 2), ("8 (999) 555-77-00", 1), ("+7 000 000-00-00", 0)],
+)
+def test_search_by_phone_number(phone: str, expected_count: int) -> None:
+    """тесты для поиска транзакций по конкретному номеру телефона в любом формате записи"""
+    transactions = [
+        {"Описание": "МТС +7 921 111-22-33"},
+        {"Описание": "Перевод 8(921)111-22-33 и +7 999 555-77-00"},
+        {"Описание": "Перевод 89211112233000"},
+    ]
+    for source in (transactions, TransactionStore.from_records(transactions)):
+        result = json.loads(search_by_phone_number(source, phone))
+        if expected_count:
+            assert len(result) == expected_count
+        else:
+            assert result == {"Результаты поиска": "Ничего не нашлось"}
+
+
+def test_search_by_phone_number_invalid() -> None:
+    """тест для поиска по номеру телефона - строка не является номером"""
+    assert json.loads(search_by_phone_number([{"Описание": "МТС +7 921 111-22-33"}], "12-34")) == {
+        "Результаты поиска": "Неверный формат номера телефона"
+    }
@@ -0,0 +1,98 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.reports import category_spending_total, spending_by_category
+from src.services import search_by_phone_number, search_by_phones, search_by_target
+from src.sqlite_store import SqliteStore, get_sqlite_store
+from src.store import TransactionStore
+from src.utils import filter_by_currency_month, get_cards_summary, get_top_transactions
+from src.views import build_dashboard
+
+
+@pytest.fixture
+def sqlite_transactions(get_transactions_2: list) -> list:
+    """Фикстура, возвращающая транзакции с номером телефона, пропусками и одинаковыми суммами"""
+    return get_transactions_2 + [
+        {
+            "Дата операции": "20.01.2018 10:00:00",
+            "Номер карты": np.nan,
+            "Сумма платежа": -1000.0,
+            "Категория": "Мобильная связь",
+            "Описание": "МТС +7 921 111-22-33",
+        },
+        {
+            "Дата операции": "01.02.2018 09:00:00",
+            "Номер карты": "*5441",
+            "Сумма платежа": np.nan,
+            "Категория": np.nan,
+            "Описание": "Перевод на Ozon.ru",
+        },
+    ]
+
+
+@pytest.fixture
+def sqlite_store(sqlite_transactions: list, tmp_path: Path) -> SqliteStore:
+    """Фикстура, возвращающая хранилище SQLite с транзакциями sqlite_transactions"""
+    return SqliteStore.from_frame(pd.DataFrame(sqlite_transactions), str(tmp_path / "operations.sqlite"))
+
+
+def test_sqlite_store_records(sqlite_store: SqliteStore, sqlite_transactions: list) -> None:
+    """Тест для хранилища SQLite - записи в исходном виде (пропуски - NaN) и отбор по периоду"""
+    assert len(sqlite_store) == 5
+    assert json.dumps(sqlite_store.records(), default=str) == json.dumps(sqlite_transactions, default=str)
+    # строки возвращаются в порядке файла
+    assert sqlite_store.take([2, 0]) == [sqlite_transactions[0], sqlite_transactions[2]]
+    january = sqlite_store.period(datetime(2018, 1, 10, 12, 41, 24), datetime(2018, 1, 15, 8, 15, 55))
+    assert len(january) == 2
+    assert len(sqlite_store.period(datetime(2018, 1, 15, 8, 15, 55), None)) == 3
+    assert len(sqlite_store.period(None, datetime(2018, 1, 15, 8, 15, 55))) == 2
+    assert len(sqlite_store) == 5
+
+
+def test_sqlite_store_matches_pandas(sqlite_store: SqliteStore, sqlite_transactions: list) -> None:
+    """Тест для хранилища SQLite - результаты функций совпадают с результатами для TransactionStore"""
+    store = TransactionStore.from_records(sqlite_transactions)
+    for left, right in ((store, sqlite_store), (sqlite_transactions, sqlite_store)):
+        assert get_top_transactions(left, 3) == get_top_transactions(right, 3)
+        assert get_cards_summary(left, with_count=True) == get_cards_summary(right, with_count=True)
+        for start, stop in ((datetime(2018, 1, 12), datetime(2018, 1, 21)), (datetime(2018, 1, 15), None)):
+            assert get_cards_summary(left, start=start, stop=stop) == get_cards_summary(right, start=start, stop=stop)
+        assert json.dumps(filter_by_currency_month(left, "20.01.2018"), default=str) == json.dumps(
+            filter_by_currency_month(right, "20.01.2018"), default=str
+        )
+        for keywords, operator in (("оплата", "and"), (["перевод", "связь"], "or"), ("ozon.ru", "and")):
+            assert search_by_target(left, keywords, operator) == search_by_target(right, keywords, operator)
+        assert search_by_phones(left) == search_by_phones(right)
+        assert search_by_phone_number(left, "89211112233") == search_by_phone_number(right, "89211112233")
+    dashboard = build_dashboard(datetime(2018, 1, 20, 12), sqlite_store)
+    assert dashboard["cards"] == build_dashboard(datetime(2018, 1, 20, 12), store)["cards"]
+
+
+def test_sqlite_store_reports(sqlite_store: SqliteStore, sqlite_transactions: list) -> None:
+    """Тест для отчета по категории на хранилище SQLite - строки и сумма за три месяца"""
+    store = TransactionStore.from_records(sqlite_transactions)
+    expected = spending_by_category.__wrapped__(store, "Путешествия", "01.03.2018")
+    result = spending_by_category.__wrapped__(sqlite_store, "Путешествия", "01.03.2018")
+    pd.testing.assert_frame_equal(result, expected, check_index_type=False)
+    assert category_spending_total(sqlite_store, "Путешествия", "01.03.2018") == -87068.0
+    assert category_spending_total(sqlite_store, "Путешествия", "01.06.2018") == 0.0
+
+
+def test_get_sqlite_store(tmp_path: Path) -> None:
+    """Тест для хранилища SQLite текущего сеанса - импорт файла один раз и повторно при изменении"""
+    file_path = str(tmp_path / "operations.xlsx")
+    pd.DataFrame({"Дата операции": ["10.01.2018 12:41:24"], "Сумма платежа": [-1.0]}).to_excel(file_path, index=False)
+    store = get_sqlite_store(file_path)
+    assert get_sqlite_store(file_path) is store
+    assert SqliteStore.stored_version(store.db_path) == store.version
+    pd.DataFrame({"Дата операции": ["10.01.2018 12:41:24"] * 2, "Сумма платежа": [-1.0, -2.0]}).to_excel(
+        file_path, index=False
+    )
+    reloaded = get_sqlite_store(file_path)
+    assert reloaded is not store
+    assert len(reloaded) == 2
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    """Функция выполняет код в отдельном процессе python из корня проекта"""
+    return subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+
+
+def test_import_main_is_lazy() -> None:
+    """Тест импорта main.py - pandas, numpy, requests и openpyxl не загружаются до первого использования"""
+    result = run_python(
+        "import sys, main; print(sorted({'pandas', 'numpy', 'requests', 'openpyxl'} & set(sys.modules)))"
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_import_has_no_side_effects() -> None:
+    """Тест импорта модулей src - нет вывода, чтения данных и настройки журнала"""
+    result = run_python(
+        "import logging, sys\n"
+        "import src.api, src.server, src.services, src.streaming\n"
+        "handlers = logging.getLogger('services_logger').handlers\n"
+        "print(len(handlers), type(handlers[0]).__name__, 'openpyxl' in sys.modules)"
+    )
+    assert result.stdout == "1 NullHandler False\n"
+    assert result.stderr == ""
+
+
+def test_load_store_missing_file(tmp_path: str) -> None:
+    """Тест загрузки хранилища в main.py - при отсутствии файла с операциями возвращается None,
+    исключение не передается в main"""
+    result = run_python(
+        "import src.store, main\n"
+        f"src.store.DEFAULT_FILE_PATH = {os.path.join(str(tmp_path), 'operations.xlsx')!r}\n"
+        "print(main.load_store_in_background().result())"
+    )
+    assert result.stdout.strip() == "None"
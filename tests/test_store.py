@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.store import DateIndex, TransactionStore, get_store, parse_fixed_width_dates, parse_operation_dates
+
+
+def test_parse_operation_dates() -> None:
+    """Тест для разбора колонки с датами - формат выгрузки, формат dayfirst и пропуски"""
+    result = parse_operation_dates(["10.01.2018 12:41:24", "2018-01-12", np.nan, "мусор"])
+    assert result[0] == np.datetime64("2018-01-10T12:41:24")
+    assert result[1] == np.datetime64("2018-01-12T00:00:00")
+    assert np.isnat(result[2]) and np.isnat(result[3])
+
+
+def test_transaction_store_from_records(get_transactions_2: list) -> None:
+    """Тест для хранилища транзакций - типизированные колонки и возврат записей в исходном виде"""
+    store = TransactionStore.from_records(get_transactions_2)
+    assert len(store) == 3
+    assert isinstance(store.frame["Категория"].dtype, pd.CategoricalDtype)
+    assert isinstance(store.frame["Номер карты"].dtype, pd.CategoricalDtype)
+    assert store.records() == get_transactions_2
+    assert store.take([2, 0]) == [get_transactions_2[2], get_transactions_2[0]]
+    assert store.take_frame([1])["Категория"].dtype == object
+
+
+def test_transaction_store_between(get_transactions_2: list) -> None:
+    """Тест для хранилища транзакций - отбор строк по полуинтервалу дат"""
+    store = TransactionStore.from_records(get_transactions_2)
+    positions = store.between(np.datetime64("2018-01-10T12:41:24"), np.datetime64("2018-01-15T08:15:55"))
+    assert positions.tolist() == [0, 1]
+
+
+def test_get_store(tmp_path: Path) -> None:
+    """Тест для хранилища текущего сеанса - повторная загрузка только при изменении файла"""
+    file_path = str(tmp_path / "operations.xlsx")
+    pd.DataFrame({"Дата операции": ["10.01.2018 12:41:24"], "Сумма платежа": [-1.0]}).to_excel(file_path, index=False)
+    store = get_store(file_path)
+    assert get_store(file_path) is store
+    pd.DataFrame({"Дата операции": ["10.01.2018 12:41:24"] * 2, "Сумма платежа": [-1.0, -2.0]}).to_excel(
+        file_path, index=False
+    )
+    reloaded = get_store(file_path)
+    assert reloaded is not store
+    assert len(reloaded) == 2
+
+
+def test_parse_fixed_width_dates() -> None:
+    """Тест для разбора дат фиксированного формата - норма и значения, требующие общего разбора"""
+    result = parse_fixed_width_dates(["29.02.2020 23:59:59", "01.01.2018 00:00:00"])
+    assert result is not None
+    assert list(result) == [np.datetime64("2020-02-29T23:59:59"), np.datetime64("2018-01-01T00:00:00")]
+    assert parse_fixed_width_dates(["30.02.2020 10:00:00"]) is None
+    assert parse_fixed_width_dates(["1.1.2018 10:00:00"]) is None
+    assert parse_fixed_width_dates(["01.01.2018 10:00:00 "]) is None
+    assert parse_fixed_width_dates(["01.01.2018"]) is None
+
+
+def test_date_index() -> None:
+    """Тест для индекса дат - диапазоны, пустой диапазон и пропущенные даты"""
+    dates = np.array(["2018-01-15", "NaT", "2018-01-10", "2018-01-12", "2018-01-10"], dtype="datetime64[ns]")
+    index = DateIndex(dates)
+    assert index.positions(np.datetime64("2018-01-10"), np.datetime64("2018-01-13")).tolist() == [2, 3, 4]
+    assert index.positions(np.datetime64("2018-01-01"), np.datetime64("2019-01-01")).tolist() == [0, 2, 3, 4]
+    assert index.positions(np.datetime64("2018-01-13"), np.datetime64("2018-01-11")).tolist() == []
+    assert index.range_slice(np.datetime64("2018-01-11"), np.datetime64("2018-01-16")) == slice(2, 4)
+
+
+def test_transaction_store_append(get_transactions_2: list) -> None:
+    """Тест для метода append - новые строки, индекс дат, версии месяцев и индексы, дополненные на месте"""
+    store = TransactionStore.from_records(get_transactions_2)
+    january, february = store.month_version(2018, 1), store.month_version(2018, 2)
+    search_index, phone_index, cube = store.search_index, store.phone_index, store.category_cube
+    positions = store.append(
+        [
+            {
+                "Дата операции": "01.02.2018 10:00:00",
+                "Номер карты": "*7197",
+                "Сумма платежа": -10.0,
+                "Категория": "Кафе",
+            },
+            {"Дата операции": "11.01.2018 09:00:00", "Сумма платежа": -5.0, "Описание": "МТС +79211112233"},
+        ]
+    )
+    assert positions.tolist() == [3, 4]
+    assert len(store) == 5
+    assert store.column("Категория").dtype == "category"
+    assert store.between(np.datetime64("2018-02-01"), np.datetime64("2018-03-01")).tolist() == [3]
+    assert store.between(np.datetime64("2018-01-10"), np.datetime64("2018-01-12")).tolist() == [0, 4]
+    assert store.month_version(2018, 1) != january
+    assert store.month_version(2018, 2) != february
+    assert store.search_index is search_index and len(search_index.segments) == 2
+    assert store.search_index.search(["кафе"]).tolist() == [3]
+    assert store.phone_index is phone_index and phone_index.lookup("89211112233").tolist() == [4]
+    assert store.category_cube is cube
+    assert cube.total("Кафе", np.datetime64("2018-01-01"), np.datetime64("2018-03-01")) == (-1000, 1)
+    assert store.append([]).tolist() == []
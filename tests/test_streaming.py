@@ -0,0 +1,86 @@
+import os
+from typing import Iterator
+
+import pandas as pd
+import pytest
+
+from src.streaming import (
+    iter_operation_batches,
+    iter_transactions,
+    stream_filter_by_currency_month,
+    stream_search_by_phones,
+    stream_search_by_target,
+    stream_spending_by_category,
+)
+from src.utils import filter_by_currency_month
+
+
+@pytest.fixture(params=["xlsx", "csv"])
+def operations_file(request: pytest.FixtureRequest, tmp_path: str, get_transactions_2: list) -> str:
+    """Фикстура, сохраняющая транзакции в xlsx- или csv-файл"""
+    transactions = get_transactions_2 + [
+        {
+            "Дата операции": "20.01.2018 10:00:00",
+            "Сумма платежа": -300.0,
+            "Категория": "Мобильная связь",
+            "Описание": "МТС +7 921 111-22-33",
+        }
+    ]
+    file_path = os.path.join(tmp_path, f"operations.{request.param}")
+    frame = pd.DataFrame(transactions)
+    if request.param == "xlsx":
+        frame.to_excel(file_path, index=False)
+    else:
+        frame.to_csv(file_path, index=False)
+    return file_path
+
+
+def test_iter_operation_batches(operations_file: str) -> None:
+    """Тест для потокового чтения - пакеты по batch_size строк с типами, как у read_excel"""
+    batches = list(iter_operation_batches(operations_file, batch_size=3))
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert all(batch["Сумма платежа"].dtype == "float64" for batch in batches)
+    transactions = list(iter_transactions(batches))
+    assert transactions[3]["Описание"] == "МТС +7 921 111-22-33"
+    assert pd.isna(transactions[3]["Номер карты"])
+
+
+def test_stream_pipelines(operations_file: str, get_transactions_2: list) -> None:
+    """Тест для генераторных конвейеров по пакетам: месяц, поиск, телефоны, категория"""
+
+    def batches() -> Iterator[pd.DataFrame]:
+        return iter_operation_batches(operations_file, batch_size=2)
+
+    month = list(stream_filter_by_currency_month(batches(), "15.01.2018"))
+    assert [item["Сумма платежа"] for item in month] == [
+        item["Сумма платежа"] for item in filter_by_currency_month(get_transactions_2, "15.01.2018")
+    ]
+    assert [item["Описание"] for item in stream_search_by_target(batches(), "отеля")] == ["Оплата отеля"]
+    assert len(list(stream_search_by_phones(batches()))) == 1
+    assert list(stream_search_by_phones(batches(), "89990000000")) == []
+    report = list(stream_spending_by_category(batches(), "Мобильная связь", "01.02.2018"))
+    assert [item["Сумма платежа"] for item in report] == [-300.0]
+
+
+def test_iter_operation_batches_format(tmp_path: str) -> None:
+    """Тест для потокового чтения - неподдерживаемый формат файла"""
+    with pytest.raises(ValueError):
+        list(iter_operation_batches(os.path.join(tmp_path, "operations.json")))
+
+
+def test_iter_operation_batches_schema(tmp_path: str) -> None:
+    """Тест для потокового чтения - типы колонок одинаковы во всех пакетах, даже если в пакете
+    колонка пустая или содержит пропуски"""
+    frame = pd.DataFrame(
+        {
+            "Номер карты": [None, None, "*7197", "*5091"],
+            "Сумма платежа": [-10, -20, -30.5, None],
+            "Бонусы (включая кэшбэк)": [1, 2, 3, None],
+            "Баллы": [1, 2, 3, None],
+        }
+    )
+    file_path = os.path.join(tmp_path, "operations.csv")
+    frame.to_csv(file_path, index=False)
+    batches = list(iter_operation_batches(file_path, batch_size=2))
+    assert [list(batch.dtypes.astype(str)) for batch in batches] == [["object", "float64", "int64", "float64"]] * 2
+    assert batches[1]["Бонусы (включая кэшбэк)"].tolist() == [3, 0]
@@ -5,13 +5,16 @@ from unittest.mock import patch
 import pandas as pd
 import pytest
 
+from src.store import TransactionStore
 from src.utils import (
     filter_by_currency_month,
     filtered_by_card_number,
     get_card_info,
+    get_cards_summary,
     get_exchange_rate,
     get_stocks_rates,
     get_top_transactions,
+    get_top_transactions_by,
     make_transactions,
 )
 
@@ -111,6 +114,30 @@ def test_get_top_transactions(get_transactions_2: list) -> None:
     }
 
 
+@pytest.mark.parametrize("n, expected_amounts", [(2, [-87068.0, -1000.0]), (5, [-87068.0, -1000.0, -567.53]), (0, [])])
+def test_get_top_transactions_n(get_transactions_2: list, n: int, expected_amounts: list) -> None:
+    """Тест для функции, которая вычисляет ТОП-N транзакций - список, генератор и хранилище"""
+    store = TransactionStore.from_records(get_transactions_2)
+    for transactions in (get_transactions_2, iter(get_transactions_2), store):
+        result = get_top_transactions(transactions, n)
+        assert [item["amount"] for item in result["top_transactions"]] == expected_amounts
+
+
+def test_get_top_transactions_by(get_transactions_2: list) -> None:
+    """Тест для функции, которая вычисляет ТОП-N транзакций по каждой карте за один проход"""
+    result = get_top_transactions_by((transaction for transaction in get_transactions_2), "Номер карты", 1)
+    assert list(result) == ["*4556", "*5441"]
+    assert result["*4556"] == [
+        {"date": "12.01.2018", "amount": -87068.0, "category": "Путешествия", "description": "Оплата отеля"}
+    ]
+    assert [item["amount"] for item in result["*5441"]] == [-567.53]
+    assert list(get_top_transactions_by(get_transactions_2, "Категория", 5)) == [
+        "Переводы физическим лицам",
+        "Путешествия",
+        "Супермаркеты",
+    ]
+
+
 def test_filtered_by_card_number(get_transactions: list, get_expected: dict) -> None:
     """Тест для функции, которая группирует транзакции по номеру карты - норма"""
     result = filtered_by_card_number(get_transactions)
@@ -123,6 +150,27 @@ def test_get_card_info(get_transactions_1: list) -> None:
     assert result[0] == {"last_digits": "4556", "total_spent": 88068.0, "cashback": 880.0}
 
 
+def test_get_cards_summary(get_transactions: list) -> None:
+    """Тест для функции, формирующей сводку по картам за один проход - совпадает с двухшаговым расчетом"""
+    expected = get_card_info(filtered_by_card_number(get_transactions))
+    assert get_cards_summary(get_transactions) == expected
+    assert get_cards_summary(TransactionStore.from_records(get_transactions)) == expected
+    assert get_cards_summary(get_transactions, with_count=True) == [
+        {"last_digits": "4556", "total_spent": 88068.0, "cashback": 880.0, "transactions": 2},
+        {"last_digits": "5441", "total_spent": 10567.53, "cashback": 15.0, "transactions": 3},
+    ]
+
+
+def test_get_cards_summary_missing_card() -> None:
+    """Тест для функции, формирующей сводку по картам - транзакции без номера карты и пустой список"""
+    transactions = [{"Сумма платежа": -10.0, "Кэшбэк": float("nan")}, {"Номер карты": "*1112", "Сумма платежа": 5.0}]
+    assert get_cards_summary(transactions) == [
+        {"last_digits": "1112", "total_spent": -0.0, "cashback": 0.0},
+        {"last_digits": "---", "total_spent": 10.0, "cashback": 0.0},
+    ]
+    assert get_cards_summary([]) == []
+
+
 @patch("requests.get")
 def test_get_exchange_rate1(mock_get: Any) -> None:
     """Тест для функции, формирующей данные о курсах валют - норма"""
@@ -175,3 +223,25 @@ def test_get_stocks_rates2(mock_get: Any) -> None:
         ]
     ) == [{"stock": "AAPL", "price": "Данные отсутствуют"}]
     mock_get.assert_called_once()
+
+
+def test_filter_by_currency_month_store(get_transactions: list) -> None:
+    """тест для функции, получающей список транзакций за месяц - передано хранилище транзакций"""
+    store = TransactionStore.from_records(get_transactions)
+    assert filter_by_currency_month(store, "15.01.2018") == filter_by_currency_month(get_transactions, "15.01.2018")
+    assert filter_by_currency_month(store, "12.00.2018") == []
+
+
+@pytest.mark.parametrize(
+    "transactions, expected_count",
+    [
+        ([], 0),
+        ([{"Дата операции": "10.01.2018"}, {"Дата операции": "1.1.2018 00:00"}, {"Дата операции": "01.02.2018"}], 2),
+        ([{"Дата операции": "10.01.2018 12:41:24"}, {"Сумма платежа": 1.0}], 1),
+        ([{"Дата операции": "32.01.2018 12:41:24"}], 0),
+    ],
+)
+def test_filter_by_currency_month2(transactions: list, expected_count: int) -> None:
+    """тест для функции, получающей список транзакций за месяц - пустой список, даты без времени,
+    отсутствующая и неверная дата"""
+    assert len(filter_by_currency_month(transactions, "31.01.2018")) == expected_count
@@ -1,9 +1,11 @@
 import json
-from unittest.mock import mock_open, patch
+from datetime import datetime
+from unittest.mock import Mock, mock_open, patch
 
 import pytest
 
 import src.views
+from src.store import TransactionStore
 
 
 def test_main_views1(get_transactions_2: list) -> None:
@@ -20,9 +22,8 @@ def test_main_views1(get_transactions_2: list) -> None:
         patch("builtins.input") as mock_input,
         patch("src.views.make_transactions", return_value=get_transactions_2),
         patch("src.views.filter_by_currency_month", return_value=get_transactions_2),
-        patch("src.views.filtered_by_card_number", return_value=get_transactions_2),
         patch(
-            "src.views.get_card_info",
+            "src.views.get_cards_summary",
             return_value=[
                 {"last_digits": "4556", "total_spent": 88068.0, "cashback": 880.0},
             ],
@@ -106,3 +107,42 @@ def test_main_logging(get_transactions_2: list, capsys: pytest.CaptureFixture[st
     ):
         src.views.main_views()
         mock_logger.assert_any_call("Ответ сформирован")
+
+
+def test_main_views_store(get_transactions_2: list) -> None:
+    """Тест для функции main - передано хранилище транзакций, файл повторно не читается"""
+    test_settings = {"user_currencies": ["USD"], "user_main_currency": "RUB", "user_stocks": ["AAPL"]}
+    for transaction in get_transactions_2:
+        transaction["Кэшбэк"] = 1.0
+    store = TransactionStore.from_records(get_transactions_2)
+
+    with (
+        patch("builtins.input", return_value="15.01.2018 12:00:00"),
+        patch("src.views.make_transactions") as mock_make_transactions,
+        patch("builtins.open", mock_open(read_data=json.dumps(test_settings))),
+        patch("src.views.get_exchange_rate", return_value=[]),
+        patch("src.views.get_stocks_rates", return_value=[]),
+    ):
+        result = json.loads(src.views.main_views(store))
+    mock_make_transactions.assert_not_called()
+    assert [card["last_digits"] for card in result["cards"]] == ["4556", "5441"]
+    assert result["top_transactions"]["top_transactions"][0]["amount"] == -87068.0
+
+
+def test_build_dashboard(get_transactions_2: list) -> None:
+    """Тест для функции build_dashboard - данные без ввода пользователя, курсы только при настройках"""
+    store = TransactionStore.from_records(get_transactions_2)
+    settings = {"user_currencies": ["USD"], "user_main_currency": "RUB", "user_stocks": ["AAPL"]}
+    data = src.views.build_dashboard(datetime(2018, 1, 15, 18), store)
+    assert data["greeting"] == "Добрый вечер!"
+    assert list(data) == ["greeting", "cards", "top_transactions"]
+    assert src.views.build_dashboard(datetime(2022, 1, 15), store)["Ошибка"] == (
+        "Данные о транзакциях за период отсутствуют"
+    )
+    with (
+        patch("src.views.get_exchange_rate", return_value=[{"currency": "USD", "rate": 90.0}]) as mock_rates,
+        patch("src.views.get_stocks_rates", return_value=[]),
+    ):
+        data = src.views.build_dashboard(datetime(2018, 1, 15, 18), store, settings, market_client=Mock())
+    assert mock_rates.call_args.args == (["USD"], "RUB")
+    assert data["currency_rates"] == [{"currency": "USD", "rate": 90.0}]